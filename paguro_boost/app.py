@@ -9,10 +9,30 @@ import shutil
 import platform
 import time
 import gc
-import hashlib
 import stat
-from collections import defaultdict
+import sqlite3
+from .config import OPTIMIZATION_CONFIG, PERFORMANCE_CONFIG, SAFETY_CONFIG
+from .disk_scanner import (DiskScanner, ScanStage, DirectorySizeStage, FileTypeStage,
+                           OldFilesStage, DuplicateCandidateStage, LargestFilesStage,
+                           LargestLeafDirectoriesStage, AgeHistogramStage)
+from .measurement import measure_operation, memory_sampler, resource_sampler
 from .metrics import SystemMetrics
+from .pagecache import PageCacheAnalyzer, pagecache_supported
+from .cgroups import find_cgroup2_root, sweep_cgroups, reclaim as reclaim_cgroup
+from .processes import snapshot_processes, group_processes
+from .scan_index import ScanIndex
+from .duplicates import DuplicateFinder, deduplicate
+from .hash_cache import HashCache
+from .mounts import MountTable, PathTrie
+from .disk_sampler import DiskSampler
+from .scan_job import ScanJob
+from .throttle import Throttle
+from .cleanup import CleanupEngine, CleanupPlan, CleanupRule, PlanItem, PlannedFile, PLAN_UNLINK_RATE
+from .quarantine import Quarantine
+from .cache_catalog import CacheCatalog
+from .log_analyzer import LogAnalyzer, vacuum_candidates, vacuum_size_target
+from .exceptions import DiskOptimizationError, ScanCancelledError
+from .disk_watcher import DiskWatcher, inotify_supported
 
 class SystemOptimizer:
     def __init__(self):
@@ -38,6 +58,12 @@ class SystemOptimizer:
         initial_metrics = self.metrics.collect_current_metrics()
         if initial_metrics:
             self.metrics.add_metrics_to_history(initial_metrics)
+        
+        self._gatilho_pressao = None
+        self._indice_disco = None
+        self._cache_hash = None
+        self._quarentena = None
+        self._observador_disco = None
     
     def verificar_gerenciador_pacotes(self) -> bool:
         """Verifica se há um gerenciador de pacotes disponível."""
@@ -134,32 +160,320 @@ class SystemOptimizer:
     
     def _limpar_temporarios_windows(self) -> bool:
         """Limpa arquivos temporários do Windows."""
-        comandos = [
-            ('del /q /s %temp%\\* 2>nul', 'Limpeza temp do usuário'),
-            ('del /q /s %windir%\\Temp\\* 2>nul', 'Limpeza temp do Windows')
-        ]
-        
-        sucesso = True
-        for comando, desc in comandos:
-            if not self._executar_comando(comando, desc):
-                sucesso = False
-        
-        return sucesso
+        return self._limpar_por_regras('temporarios')
     
     def _limpar_temporarios_linux(self) -> bool:
         """Limpa arquivos temporários do Linux."""
-        comandos = [
-            ('sudo rm -rf /tmp/* 2>/dev/null', 'Limpeza /tmp'),
-            ('sudo rm -rf /var/tmp/* 2>/dev/null', 'Limpeza /var/tmp'),
-            ('rm -rf ~/.cache/* 2>/dev/null', 'Limpeza cache do usuário')
-        ]
+        sucesso = self._limpar_por_regras('temporarios')
+        return self._limpar_caches() and sucesso
+    
+    # Rotinas de limpeza da otimização completa, na ordem em que são planejadas
+    ROTINAS_PLANO = ['temporarios', 'temporarios_avancada', 'arquivos_antigos', 'prefetch']
+    
+    def _regras_limpeza(self) -> Dict[str, List[CleanupRule]]:
+        """
+        Regras declarativas de limpeza, por rotina.
         
-        sucesso = True
-        for comando, desc in comandos:
-            if not self._executar_comando(comando, desc):
-                sucesso = False
+        Classe de risco e custo de regeneração orientam a escolha de
+        candidatos em liberar_espaco (temporários primeiro, dados do usuário
+        por último).
+        """
+        home = os.path.expanduser("~")
+        dias_antigos = OPTIMIZATION_CONFIG['disk'].get('days_threshold', 30)
+        downloads_antigos = CleanupRule('Arquivos antigos em Downloads', os.path.join(home, 'Downloads'),
+                                        min_age_days=dias_antigos, risk='user')
         
-        return sucesso
+        if self.is_windows:
+            temp_usuario = os.path.expandvars('%TEMP%')
+            temp_windows = os.path.expandvars('%WINDIR%\\Temp')
+            return {
+                'temporarios': [
+                    CleanupRule('Limpeza temp do usuário', temp_usuario, risk='temporary', regeneration_cost=0),
+                    CleanupRule('Limpeza temp do Windows', temp_windows, risk='temporary', regeneration_cost=0)
+                ],
+                'temporarios_avancada': [
+                    CleanupRule('Arquivos .tmp', temp_usuario, ('*.tmp',), risk='temporary', regeneration_cost=0),
+                    CleanupRule('Logs temporários', temp_usuario, ('*.log',), risk='log', regeneration_cost=0),
+                    CleanupRule('Temp do Windows', temp_windows, risk='temporary', regeneration_cost=0),
+                    CleanupRule('Temp do usuário', os.path.expandvars('%USERPROFILE%\\AppData\\Local\\Temp'),
+                                risk='temporary', regeneration_cost=0)
+                ],
+                'cache_usuario': [],
+                'arquivos_antigos': [downloads_antigos],
+                'prefetch': [CleanupRule('Limpeza do Prefetch', os.path.expandvars('%WINDIR%\\Prefetch'),
+                                         regeneration_cost=0.5)]
+            }
+        
+        thumbnails = CleanupRule('Cache de thumbnails', os.path.join(home, '.cache', 'thumbnails'),
+                                 remove_empty_dirs=True, regeneration_cost=0.2)
+        return {
+            'temporarios': [
+                CleanupRule('Limpeza /tmp', '/tmp', remove_empty_dirs=True,
+                            risk='temporary', regeneration_cost=0),
+                CleanupRule('Limpeza /var/tmp', '/var/tmp', remove_empty_dirs=True,
+                            risk='temporary', regeneration_cost=0)
+            ],
+            'temporarios_avancada': [
+                CleanupRule('Arquivos antigos em /tmp', '/tmp', min_age_days=7, age_field='atime',
+                            risk='temporary', regeneration_cost=0),
+                CleanupRule('Arquivos antigos em /var/tmp', '/var/tmp', min_age_days=7, age_field='atime',
+                            risk='temporary', regeneration_cost=0),
+                thumbnails
+            ],
+            'cache_usuario': [
+                CleanupRule('Limpeza cache do usuário', os.path.join(home, '.cache'), remove_empty_dirs=True)
+            ],
+            'arquivos_antigos': [downloads_antigos],
+            'prefetch': [
+                CleanupRule('Limpeza thumbnails', os.path.join(home, '.thumbnails'), remove_empty_dirs=True,
+                            regeneration_cost=0.2),
+                thumbnails
+            ]
+        }
+    
+    def executar_limpeza(self, rotina: str, simular: bool = False) -> List[Dict]:
+        """
+        Executa as regras de limpeza de uma rotina com o motor nativo.
+        
+        Respeita SAFETY_CONFIG (diretórios excluídos e tamanho máximo de
+        arquivo) e o modo background. Retorna, por regra, arquivos e bytes
+        liberados, itens pulados e falhas; com simular, nada é removido.
+        """
+        resultados = self._criar_motor_limpeza(simular).run(self._regras_limpeza().get(rotina, []))
+        self._registrar_limpeza(resultados)
+        return resultados
+    
+    def _criar_motor_limpeza(self, simular: bool = False) -> CleanupEngine:
+        """Motor de limpeza com as proteções de SAFETY_CONFIG, o modo background e a quarentena."""
+        quarentena = None
+        if OPTIMIZATION_CONFIG['disk'].get('cleanup_quarantine', False):
+            quarentena = self._obter_quarentena()
+        return CleanupEngine(PERFORMANCE_CONFIG['max_threads'],
+                             exclusions=PathTrie(SAFETY_CONFIG['excluded_directories']),
+                             max_file_size=SAFETY_CONFIG['max_file_size_mb'] * 1024 * 1024,
+                             throttle=self._criar_throttle(),
+                             dry_run=simular,
+                             quarantine=quarentena,
+                             index=self._obter_indice_disco() if quarentena else None)
+    
+    def _obter_quarentena(self) -> Quarantine:
+        """Abre (uma vez) a quarentena e inicia a purga em segundo plano."""
+        if self._quarentena is None:
+            carencia = OPTIMIZATION_CONFIG['disk'].get('quarantine_grace_hours', 24) * 3600
+            self._quarentena = Quarantine(grace_seconds=carencia, throttle=self._criar_throttle())
+            self._quarentena.start_purger(interval=min(carencia, 3600) or 60)
+        return self._quarentena
+    
+    def listar_quarentena(self) -> List[Dict]:
+        """Lotes de limpeza em quarentena (itens, bytes, data), do mais recente ao mais antigo."""
+        return self._obter_quarentena().batches()
+    
+    def restaurar_quarentena(self, lote: Optional[str] = None) -> Dict:
+        """Desfaz uma limpeza em quarentena (o lote mais recente, por padrão)."""
+        resultado = self._obter_quarentena().restore(lote)
+        self.logger.info(f"Quarentena {resultado['batch']}: {resultado['restored']} itens restaurados, "
+                         f"{resultado['conflicts']} conflitos, {resultado['failures']} falhas")
+        return resultado
+    
+    def purgar_quarentena(self, imediato: bool = False) -> Dict:
+        """Apaga o que passou da carência (ou tudo, com imediato)."""
+        resultado = self._obter_quarentena().purge(grace_seconds=0 if imediato else None)
+        self.logger.info(f"Quarentena: {resultado['items']} itens apagados, "
+                         f"{resultado['bytes'] / (1024**2):.1f}MB liberados")
+        return resultado
+    
+    def _registrar_limpeza(self, resultados: List[Dict]) -> None:
+        """Registra no log o relatório por regra do motor de limpeza."""
+        for r in resultados:
+            self.logger.info(f"{r['rule']} - {r['files']} arquivos, {r['freed'] / (1024**2):.1f}MB liberados")
+            if r['skipped']:
+                self.logger.info(f"{r['rule']} - {r['skipped']} arquivos acima do tamanho máximo mantidos")
+            if r['changed']:
+                self.logger.info(f"{r['rule']} - {r['changed']} arquivos modificados desde o plano mantidos")
+            if r['failures']:
+                exemplo = r['errors'][0] if r['errors'] else {}
+                self.logger.warning(f"{r['rule']} - {r['failures']} falhas "
+                                    f"(ex.: {exemplo.get('path')}: {exemplo.get('error')})")
+    
+    def _comandos_limpeza(self) -> List[Tuple[CleanupRule, str]]:
+        """Limpezas feitas por comandos do sistema, com a regra que estima o que removem."""
+        if self.is_windows:
+            return []
+        comandos = []
+        if shutil.which('apt'):
+            comandos.append((CleanupRule('Limpeza cache APT', '/var/cache/apt/archives', ('*.deb',)),
+                             'sudo apt clean 2>/dev/null'))
+        return comandos
+    
+    def planejar_limpeza(self, rotinas: Optional[List[str]] = None) -> CleanupPlan:
+        """
+        Avalia as regras de limpeza contra o índice de varredura sem remover nada.
+        
+        O índice é atualizado antes (diretórios inalterados são reaproveitados).
+        Sem rotinas, cobre todas as limpezas da otimização completa, inclusive
+        logs do journal e cache de pacotes. O plano traz, por item, arquivos,
+        bytes e duração estimada, e pode ser executado depois com
+        executar_plano_limpeza.
+        """
+        regras = self._regras_plano(rotinas)
+        comandos = self._comandos_limpeza() if rotinas is None else []
+        catalogo = self._criar_catalogo_caches() if rotinas is None else None
+        regras_caches = [CleanupRule(local.name, local.path) for local in catalogo.locations] if catalogo else []
+        indice = self._indice_limpeza(regras + regras_caches + [regra for regra, _ in comandos])
+        
+        motor = self._criar_motor_limpeza()
+        plano = motor.plan(regras, indice, comandos)
+        if catalogo is not None:
+            # Caches são podados até o limite (LRU), não esvaziados
+            vistos = {arquivo.path for item in plano.items for arquivo in item.files}
+            plano.items[len(regras):len(regras)] = catalogo.prune_items(motor, vistos)
+        if rotinas is None and not self.is_windows:
+            item = self._planejar_vacuum_journal()
+            if item is not None:
+                plano.items.append(item)
+        self._registrar_plano(plano)
+        return plano
+    
+    def _planejar_vacuum_journal(self) -> Optional[PlanItem]:
+        """Item de plano do vacuum do journal: arquivos arquivados que saem para atingir o alvo."""
+        analise = self.analisar_logs()
+        alvo = analise['journal_vacuum_alvo']
+        if alvo is None:
+            return None
+        removidos = analise['journal_vacuum_remocoes']
+        diretorio = os.path.dirname(os.path.dirname(removidos[0].path)) if removidos else '/var/log/journal'
+        return PlanItem(CleanupRule('Limpeza logs do sistema', diretorio, ('*.journal', '*.journal~'), risk='log'),
+                        [PlannedFile(e.path, e.size, e.allocated, e.mtime, e.nlink, e.atime) for e in removidos],
+                        command=self._comando_vacuum(alvo),
+                        estimated_seconds=len(removidos) / PLAN_UNLINK_RATE)
+    
+    def _criar_catalogo_caches(self) -> CacheCatalog:
+        """Catálogo dos caches conhecidos com os limites de cache_caps_mb."""
+        limites = OPTIMIZATION_CONFIG['disk'].get('cache_caps_mb', {})
+        return CacheCatalog(self._obter_indice_disco(),
+                            caps={chave: mb * 1024 * 1024 if mb is not None else None
+                                  for chave, mb in limites.items()})
+    
+    def analisar_caches(self) -> List[Dict]:
+        """Tamanho de cada cache conhecido (pip, npm, navegadores, XDG...) pelo índice de disco."""
+        catalogo = self._criar_catalogo_caches()
+        self._indice_limpeza([CleanupRule(local.name, local.path) for local in catalogo.locations])
+        return [{
+            'nome': cache['name'],
+            'caminho': cache['path'],
+            'tipo': cache['kind'],
+            'tamanho_mb': cache['size'] / (1024**2),
+            'alocado_mb': cache['allocated'] / (1024**2),
+            'arquivos': cache['files'],
+            'ultimo_uso': cache['last_used'],
+            'limite_mb': cache['cap'] / (1024**2) if cache['cap'] is not None else None,
+            'excesso_mb': cache['excess'] / (1024**2)
+        } for cache in catalogo.sizes()]
+    
+    def podar_caches(self, simular: bool = False) -> List[Dict]:
+        """
+        Reduz cada cache ao seu limite removendo as entradas usadas há mais tempo.
+        
+        Preserva a parte quente de cada cache, ao contrário de esvaziar
+        ~/.cache inteiro. Com simular, apenas registra o plano.
+        """
+        catalogo = self._criar_catalogo_caches()
+        # Atualiza no índice as raízes dos caches, que o catálogo consulta
+        self._indice_limpeza([CleanupRule(local.name, local.path) for local in catalogo.locations])
+        motor = self._criar_motor_limpeza()
+        plano = CleanupPlan(catalogo.prune_items(motor))
+        self._registrar_plano(plano)
+        return [] if simular else self.executar_plano_limpeza(plano)
+    
+    def _limpar_caches(self) -> bool:
+        """Poda os caches conhecidos; falhas por arquivo são registradas, não fatais."""
+        try:
+            self.podar_caches()
+            return True
+        except Exception as e:
+            self.logger.error(f"Erro na poda de caches: {e}")
+            return False
+    
+    def _regras_plano(self, rotinas: Optional[List[str]] = None) -> List[CleanupRule]:
+        """Regras das rotinas pedidas (todas as da otimização completa, por padrão)."""
+        regras_por_rotina = self._regras_limpeza()
+        return [regra for rotina in (rotinas or self.ROTINAS_PLANO)
+                for regra in regras_por_rotina.get(rotina, [])]
+    
+    def _indice_limpeza(self, regras: List[CleanupRule]) -> ScanIndex:
+        """Índice de disco atualizado (incrementalmente) sob as raízes das regras."""
+        indice = self._obter_indice_disco()
+        if indice is None:
+            raise DiskOptimizationError("Planejamento de limpeza requer o índice de disco (use_scan_index)")
+        for _ in self._criar_scanner_disco().scan([CleanupEngine._root(regra) for regra in regras]):
+            pass
+        return indice
+    
+    def liberar_espaco(self, gigabytes: float, simular: bool = False,
+                       rotinas: Optional[List[str]] = None) -> Dict:
+        """
+        Libera uma quantidade de espaço escolhendo os candidatos mais baratos.
+        
+        Os arquivos das regras de limpeza são agrupados em unidades (filhos
+        diretos de cada raiz), ordenados por custo por byte (risco, custo de
+        regeneração e uso recente) e escolhidos de forma gulosa a partir do
+        índice, parando assim que a meta é atingida. Com simular, apenas
+        retorna o plano.
+        """
+        meta = int(gigabytes * 1024**3)
+        # Para atingir a meta, o cache do usuário inteiro é candidato (ordenado por custo)
+        regras = self._regras_plano(rotinas or self.ROTINAS_PLANO + ['cache_usuario'])
+        plano = self._criar_motor_limpeza().plan_goal(regras, self._indice_limpeza(regras), meta)
+        self._registrar_plano(plano)
+        if plano.shortfall:
+            self.logger.warning(f"Candidatos insuficientes: faltam {plano.shortfall / (1024**3):.2f}GB "
+                                f"para a meta de {gigabytes:.2f}GB")
+        
+        resultados = [] if simular else self.executar_plano_limpeza(plano)
+        return {'plano': plano, 'resultados': resultados}
+    
+    def _limpar_por_plano(self, plano: CleanupPlan) -> bool:
+        """Executa um plano; falhas de comando contam, arquivos com falha são só registrados."""
+        resultados = self.executar_plano_limpeza(plano)
+        return all(r.get('success', True) for r in resultados)
+    
+    def _registrar_plano(self, plano: CleanupPlan) -> None:
+        """Registra no log o plano de limpeza item a item."""
+        resumo = plano.summary()
+        self.logger.info("=== Plano de limpeza (nada foi removido) ===")
+        if resumo['goal'] is not None:
+            self.logger.info(f"Meta: liberar {resumo['goal'] / (1024**3):.2f}GB")
+        for item in resumo['items']:
+            origem = f" via '{item['command']}'" if item['command'] else ''
+            self.logger.info(f"{item['rule']}{origem}: {item['files']} arquivos, "
+                             f"{item['bytes'] / (1024**2):.1f}MB, ~{item['estimated_seconds']:.1f}s")
+        self.logger.info(f"Total: {resumo['files']} arquivos, {resumo['freed'] / (1024**2):.1f}MB "
+                         f"a liberar, ~{resumo['estimated_seconds']:.1f}s")
+    
+    def executar_plano_limpeza(self, plano: CleanupPlan) -> List[Dict]:
+        """
+        Executa um plano exatamente como calculado.
+        
+        Só os arquivos do plano são removidos; os modificados desde o
+        planejamento (mtime ou tamanho diferentes) são mantidos. Itens de
+        comando (journal, cache de pacotes) executam o comando.
+        """
+        resultados = self._criar_motor_limpeza().execute(plano)
+        self._registrar_limpeza(resultados)
+        for item in plano.items:
+            if item.command is not None:
+                sucesso = self._executar_comando_sudo_opcional(item.command, item.rule.name)
+                resultados.append({'rule': item.rule.name, 'command': item.command, 'success': sucesso})
+        return resultados
+    
+    def _limpar_por_regras(self, rotina: str) -> bool:
+        """Executa uma rotina de limpeza; falhas por arquivo são registradas, não fatais."""
+        try:
+            self.executar_limpeza(rotina)
+            return True
+        except Exception as e:
+            self.logger.error(f"Erro na limpeza ({rotina}): {e}")
+            return False
 
     def limpar_cache_sistema(self) -> bool:
         """Limpa o cache do sistema."""
@@ -187,18 +501,94 @@ class SystemOptimizer:
     
     def _limpar_cache_linux(self) -> bool:
         """Limpa caches do sistema Linux."""
-        comandos = [
-            ('sudo apt clean 2>/dev/null', 'Limpeza cache APT'),
-            ('sudo apt autoremove -y 2>/dev/null', 'Remoção pacotes órfãos'),
-            ('sudo journalctl --vacuum-time=7d 2>/dev/null', 'Limpeza logs do sistema')
-        ]
-        
-        sucesso = True
-        for comando, desc in comandos:
-            if not self._executar_comando_sudo_opcional(comando, desc):
-                sucesso = False
+        sucesso = self._executar_comando_sudo_opcional('sudo apt clean 2>/dev/null', 'Limpeza cache APT')
+        sucesso = self._remover_pacotes_orfaos() and sucesso
+        return self._limpar_logs() and sucesso
+    
+    def _remover_pacotes_orfaos(self) -> bool:
+        """Remove pacotes instalados como dependência que não são mais necessários."""
+        return self._executar_comando_sudo_opcional('sudo apt autoremove -y 2>/dev/null', 'Remoção pacotes órfãos')
+    
+    def _limpar_sistema_fora_do_plano(self) -> bool:
+        """
+        Etapas de limpeza do sistema que um plano não cobre.
         
-        return sucesso
+        Cache do Windows Update (Windows) ou pacotes órfãos (Linux), além dos
+        caches de DNS/Explorer ou do page cache e do índice locate.
+        """
+        if self.is_windows:
+            sucesso = self._limpar_cache_windows_update()
+        else:
+            sucesso = self._remover_pacotes_orfaos()
+        return self._otimizar_caches_sistema() and sucesso
+    
+    def analisar_logs(self) -> Dict:
+        """
+        Tamanho do journal e de /var/log por classe de arquivo.
+        
+        Inclui os logs rotacionados sem compressão e o alvo de
+        --vacuum-size calculado pela meta de espaço livre (None se o
+        sistema de arquivos do journal já está dentro da meta).
+        """
+        analise = LogAnalyzer(self._criar_scanner_disco()).analyze()
+        journal = analise['journal']
+        alvo = None
+        if journal['entries']:
+            config_disco = OPTIMIZATION_CONFIG['disk']
+            uso = shutil.disk_usage(os.path.dirname(journal['entries'][0].path))
+            alvo = vacuum_size_target(journal['allocated'], uso.free, uso.total,
+                                      config_disco.get('log_target_free_percent', 15),
+                                      config_disco.get('journal_min_mb', 64) * 1024 * 1024)
+        classes = analise['classes']
+        return {
+            'journal_mb': journal['allocated'] / (1024**2),
+            'journal_arquivos': journal['files'],
+            'journal_arquivados_mb': journal['archived_allocated'] / (1024**2),
+            'journal_vacuum_alvo': alvo,
+            'journal_vacuum_remocoes': vacuum_candidates(journal['entries'], alvo) if alvo is not None else [],
+            'logs_ativos_mb': classes['active']['allocated'] / (1024**2),
+            'rotacionados_mb': classes['rotated']['allocated'] / (1024**2),
+            'comprimidos_mb': classes['compressed']['allocated'] / (1024**2),
+            'rotacionados_sem_compressao': [e.path for e in analise['rotated_uncompressed']],
+            'maiores': [{'arquivo': e.path, 'tamanho_mb': e.allocated / (1024**2)} for e in analise['largest']]
+        }
+    
+    def comprimir_logs(self, arquivos: Optional[List[str]] = None) -> Dict:
+        """Comprime no lugar os logs rotacionados sem compressão e informa os bytes economizados."""
+        metodo = OPTIMIZATION_CONFIG['disk'].get('log_compression', 'gzip')
+        if arquivos is None:
+            arquivos = self.analisar_logs()['rotacionados_sem_compressao']
+        if not metodo or not arquivos:
+            return {'files': 0, 'before': 0, 'after': 0, 'saved': 0, 'failures': 0, 'busy': 0, 'errors': []}
+        resultado = LogAnalyzer.compress(arquivos, metodo, max_workers=PERFORMANCE_CONFIG['max_threads'],
+                                         throttle=self._criar_throttle())
+        self.logger.info(f"Compressão de logs ({metodo}): {resultado['files']} arquivos, "
+                         f"{resultado['saved'] / (1024**2):.1f}MB economizados")
+        if resultado['busy']:
+            self.logger.info(f"Compressão de logs: {resultado['busy']} arquivos ainda em uso mantidos")
+        if resultado['failures']:
+            exemplo = resultado['errors'][0]
+            self.logger.warning(f"Compressão de logs: {resultado['failures']} falhas "
+                                f"(ex.: {exemplo['path']}: {exemplo['error']})")
+        return resultado
+    
+    @staticmethod
+    def _comando_vacuum(alvo: int) -> str:
+        return f'sudo journalctl --vacuum-size={max(1, alvo // (1024 * 1024))}M 2>/dev/null'
+    
+    def _limpar_logs(self) -> bool:
+        """Comprime logs rotacionados e reduz o journal só o necessário para a meta de espaço livre."""
+        try:
+            analise = self.analisar_logs()
+            self.comprimir_logs(analise['rotacionados_sem_compressao'])
+            alvo = analise['journal_vacuum_alvo']
+            if alvo is None:
+                self.logger.info(f"Journal ({analise['journal_mb']:.1f}MB) dentro da meta de espaço livre")
+                return True
+            return self._executar_comando_sudo_opcional(self._comando_vacuum(alvo), 'Limpeza logs do sistema')
+        except Exception as e:
+            self.logger.error(f"Erro na limpeza de logs: {e}")
+            return False
 
     def verificar_virus(self) -> bool:
         """Executa verificação de vírus."""
@@ -399,14 +789,57 @@ class SystemOptimizer:
                 
         return sucesso_geral
 
+    def medir_efeito_operacao(self, operacao, nome: str, amostrador=resource_sampler) -> Dict:
+        """
+        Mede o efeito de uma operação com N amostras antes e depois.
+        
+        O resultado (mediana da variação + intervalo de confiança por métrica)
+        é registrado como evento 'optimization' no histórico de métricas.
+        """
+        config_medicao = OPTIMIZATION_CONFIG['monitoring']
+        medicao = measure_operation(
+            operacao, amostrador,
+            samples=config_medicao['measurement_samples'],
+            interval=config_medicao['measurement_interval'],
+            confidence=config_medicao['measurement_confidence']
+        )
+        
+        self.metrics.add_event('optimization', nome, {
+            'success': bool(medicao['result']) and medicao['error'] is None,
+            'error': str(medicao['error']) if medicao['error'] else None,
+            'duration': medicao['duration'],
+            'effects': medicao['effects']
+        })
+        
+        if medicao['error'] is not None:
+            raise medicao['error']
+        return medicao
+    
+    def _formatar_efeito(self, efeito: Dict, escala: float = 1.0, unidade: str = "") -> str:
+        """Formata variação mediana e intervalo de confiança para o log."""
+        nivel = int(efeito['confidence'] * 100)
+        marca = "" if efeito['significant'] else " (não significativo)"
+        return (f"{efeito['delta'] / escala:+.1f}{unidade} "
+                f"[IC{nivel}%: {efeito['ci_low'] / escala:+.1f}{unidade} .. "
+                f"{efeito['ci_high'] / escala:+.1f}{unidade}]{marca}")
+    
     def otimizar_memoria_ram(self) -> bool:
         """Executa otimização avançada da memória RAM."""
         self.logger.info("Iniciando otimização avançada de RAM...")
         
-        # Medição inicial
-        mem_inicial = psutil.virtual_memory()
-        self.logger.info(f"RAM inicial: {mem_inicial.percent:.1f}% ({mem_inicial.used // (1024**3):.1f}GB usada)")
+        medicao = self.medir_efeito_operacao(self._executar_otimizacao_memoria,
+                                             "Otimização de RAM", memory_sampler)
         
+        efeito = medicao['effects'].get('memory_used')
+        if efeito:
+            self.logger.info(f"RAM usada (mediana): {efeito['before_median'] / (1024**3):.2f}GB -> "
+                             f"{efeito['after_median'] / (1024**3):.2f}GB")
+            self.logger.info(f"Variação de memória usada: {self._formatar_efeito(efeito, 1024**2, 'MB')}")
+        
+        return medicao['result']
+    
+    def _executar_otimizacao_memoria(self) -> bool:
+        """Executa as etapas da otimização de RAM (sem medição)."""
         sucesso = True
         
         # 1. Garbage collection do Python
@@ -427,15 +860,31 @@ class SystemOptimizer:
         else:
             sucesso &= self._otimizar_memoria_linux()
         
-        # Medição final
-        time.sleep(2)  # Aguardar efeito das otimizações
-        mem_final = psutil.virtual_memory()
-        liberada = (mem_inicial.used - mem_final.used) // (1024**2)  # MB
+        return sucesso
+    
+    def medir_pressao_memoria(self) -> Optional[float]:
+        """Retorna a % do tempo com tarefas paradas por memória (PSI 'some'), se disponível."""
+        pressao = self.metrics.get_pressure('otimizador').get('memory', {}).get('some')
+        if not pressao:
+            return None
+        return pressao['rate'] if pressao.get('rate') is not None else pressao.get('avg10', 0.0)
+    
+    def otimizar_memoria_sob_pressao(self, limite: Optional[float] = None) -> bool:
+        """Executa a otimização de RAM somente se houver stall de memória acima do limite."""
+        if limite is None:
+            limite = OPTIMIZATION_CONFIG['ram']['pressure_threshold']
         
-        self.logger.info(f"RAM final: {mem_final.percent:.1f}% ({mem_final.used // (1024**3):.1f}GB usada)")
-        self.logger.info(f"Memória liberada: {liberada:.0f}MB")
+        stall = self.medir_pressao_memoria()
+        if stall is None:
+            self.logger.info("PSI indisponível - executando otimização de RAM sem verificação de pressão")
+            return self.otimizar_memoria_ram()
         
-        return sucesso
+        if stall < limite:
+            self.logger.info(f"Pressão de memória baixa ({stall:.2f}% < {limite:.2f}%) - otimização de RAM desnecessária")
+            return True
+        
+        self.logger.info(f"Pressão de memória alta ({stall:.2f}% >= {limite:.2f}%) - otimizando RAM")
+        return self.otimizar_memoria_ram()
     
     def _limpar_cache_dns(self) -> bool:
         """Limpa o cache DNS para liberar memória."""
@@ -552,43 +1001,117 @@ class SystemOptimizer:
     
     def _otimizar_memoria_linux(self) -> bool:
         """Otimizações específicas de memória para Linux."""
-        comandos = [
-            # Limpar page cache, dentries e inodes
-            ('echo 1 | sudo tee /proc/sys/vm/drop_caches 2>/dev/null', 'Limpeza page cache'),
-            ('echo 2 | sudo tee /proc/sys/vm/drop_caches 2>/dev/null', 'Limpeza dentries/inodes'),
-            ('echo 3 | sudo tee /proc/sys/vm/drop_caches 2>/dev/null', 'Limpeza cache completa'),
-            # Compactar memória
-            ('echo 1 | sudo tee /proc/sys/vm/compact_memory 2>/dev/null', 'Compactação de memória')
-        ]
-        
+        # Recuperação direcionada aos cgroups configurados (hosts systemd/containers)
         sucesso = True
-        for comando, desc in comandos:
-            if not self._executar_comando_sudo_opcional(comando, desc):
+        for alvo in OPTIMIZATION_CONFIG['ram'].get('reclaim_cgroups', []):
+            if not self.recuperar_memoria_cgroup(alvo['cgroup'], alvo['bytes_mb']):
                 sucesso = False
         
+        # Liberar apenas arquivos frios/grandes do page cache (evita tempestade de I/O do drop_caches)
+        if not self.liberar_page_cache_seletivo():
+            sucesso = False
+        
+        # Compactar memória
+        if not self._executar_comando_sudo_opcional(
+                'echo 1 | sudo tee /proc/sys/vm/compact_memory 2>/dev/null', 'Compactação de memória'):
+            sucesso = False
+        
         return sucesso
     
+    def analisar_cgroups_memoria(self, profundidade: int = 4) -> Dict:
+        """Reporta memória (current/anon/file/slab) e pressão por cgroup v2."""
+        raiz = find_cgroup2_root()
+        if not raiz:
+            self.logger.info("cgroup v2 não disponível neste sistema")
+            return {}
+        
+        try:
+            cgroups = []
+            for cg in sweep_cgroups(raiz, max_depth=profundidade):
+                cgroups.append({
+                    'cgroup': cg['name'],
+                    'memoria_mb': cg['current'] / (1024**2),
+                    'limite_mb': cg['max'] / (1024**2) if cg['max'] else None,
+                    'anon_mb': cg['anon'] / (1024**2),
+                    'file_mb': cg['file'] / (1024**2),
+                    'slab_mb': cg['slab'] / (1024**2),
+                    'pressao_some_avg10': cg['pressure'].get('some', {}).get('avg10', 0.0),
+                    'pressao_full_avg10': cg['pressure'].get('full', {}).get('avg10', 0.0)
+                })
+            return {
+                'raiz': raiz,
+                'total_cgroups': len(cgroups),
+                'cgroups': cgroups
+            }
+        except Exception as e:
+            self.logger.error(f"Erro na análise de cgroups: {e}")
+            return {}
+    
+    def recuperar_memoria_cgroup(self, cgroup: str, megabytes: float) -> Dict:
+        """Recupera memória de um cgroup específico via memory.reclaim (meta em MB)."""
+        try:
+            resultado = reclaim_cgroup(cgroup, int(megabytes * 1024**2))
+            liberado_mb = resultado['reclaimed'] / (1024**2)
+            status = "completa" if resultado['complete'] else "parcial"
+            self.logger.info(f"Reclaim {cgroup}: {liberado_mb:.1f}MB de {megabytes:.0f}MB ({status})")
+            return {
+                'cgroup': cgroup,
+                'meta_mb': megabytes,
+                'liberado_mb': liberado_mb,
+                'completo': resultado['complete']
+            }
+        except (OSError, IOError) as e:
+            self.logger.warning(f"Reclaim do cgroup {cgroup} falhou: {e}")
+            return {}
+    
+    def liberar_page_cache_seletivo(self, diretorios: Optional[List[str]] = None) -> Dict:
+        """Libera do page cache apenas arquivos frios ou grandes, com relatório por arquivo."""
+        if not pagecache_supported():
+            self.logger.info("Liberação seletiva de page cache indisponível nesta plataforma")
+            return {}
+        
+        config_ram = OPTIMIZATION_CONFIG['ram']
+        if diretorios is None:
+            diretorios = [os.path.expanduser(d) for d in config_ram['page_cache_dirs']]
+        
+        try:
+            analisador = PageCacheAnalyzer(
+                cold_seconds=config_ram['page_cache_cold_minutes'] * 60,
+                large_bytes=config_ram['page_cache_large_mb'] * 1024**2,
+                min_cached_bytes=config_ram['page_cache_min_mb'] * 1024**2
+            )
+            relatorio = analisador.evict(diretorios)
+            
+            arquivos = [{
+                'arquivo': f['path'],
+                'em_cache_mb': f['cached_before'] / (1024**2),
+                'liberado_mb': f['reclaimed'] / (1024**2)
+            } for f in relatorio['files']]
+            arquivos.sort(key=lambda a: a['liberado_mb'], reverse=True)
+            total_mb = relatorio['reclaimed'] / (1024**2)
+            
+            for arq in arquivos[:10]:
+                self.logger.info(f"  Page cache: {arq['arquivo']} -> {arq['liberado_mb']:.1f}MB liberados")
+            self.logger.info(f"Page cache seletivo: {total_mb:.1f}MB liberados de {len(arquivos)} arquivos")
+            
+            return {
+                'arquivos': arquivos,
+                'total_arquivos': len(arquivos),
+                'total_liberado_mb': total_mb
+            }
+        except Exception as e:
+            self.logger.error(f"Erro na liberação seletiva de page cache: {e}")
+            return {}
+    
     def analisar_uso_memoria_detalhado(self) -> Dict:
-        """Fornece análise detalhada do uso de memória."""
+        """Fornece análise detalhada do uso de memória, agrupada por aplicação."""
         try:
             mem = psutil.virtual_memory()
             swap = psutil.swap_memory()
             
-            # Análise por processo
-            processos_memoria = []
-            for proc in psutil.process_iter(['pid', 'name', 'memory_percent', 'memory_info']):
-                try:
-                    if proc.info['memory_percent'] > 1.0:  # Mais de 1% da RAM
-                        processos_memoria.append({
-                            'name': proc.info['name'],
-                            'pid': proc.info['pid'],
-                            'memory_percent': proc.info['memory_percent'],
-                            'memory_mb': proc.info['memory_info'].rss // (1024 * 1024)
-                        })
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    continue
-            
-            processos_memoria.sort(key=lambda x: x['memory_percent'], reverse=True)
+            # Snapshot único dos processos, agregado por aplicação (árvore/cgroup/executável)
+            snapshot = snapshot_processes()
+            aplicacoes = group_processes(snapshot, mem.total)
             
             analise = {
                 'memoria_total_gb': mem.total // (1024**3),
@@ -597,8 +1120,9 @@ class SystemOptimizer:
                 'percentual_uso': mem.percent,
                 'swap_total_gb': swap.total // (1024**3) if swap.total > 0 else 0,
                 'swap_usado_gb': swap.used // (1024**3) if swap.used > 0 else 0,
-                'processos_top_memoria': processos_memoria[:10],
-                'recomendacoes': self._gerar_recomendacoes_memoria(mem, processos_memoria)
+                'total_processos': len(snapshot),
+                'processos_top_memoria': aplicacoes[:10],
+                'recomendacoes': self._gerar_recomendacoes_memoria(mem, aplicacoes, swap)
             }
             
             return analise
@@ -607,8 +1131,8 @@ class SystemOptimizer:
             self.logger.error(f"Erro na análise de memória: {e}")
             return {}
     
-    def _gerar_recomendacoes_memoria(self, mem, processos) -> List[str]:
-        """Gera recomendações baseadas no uso de memória."""
+    def _gerar_recomendacoes_memoria(self, mem, aplicacoes, swap=None) -> List[str]:
+        """Gera recomendações baseadas no uso de memória por aplicação."""
         recomendacoes = []
         
         if mem.percent > 85:
@@ -616,28 +1140,94 @@ class SystemOptimizer:
         elif mem.percent > 70:
             recomendacoes.append("⚠️ Uso alto de memória (>70%). Considere otimização.")
         
-        # Analisar processos
-        navegadores = sum(1 for p in processos if any(nav in p['name'].lower() 
-                         for nav in ['chrome', 'firefox', 'edge', 'opera']))
-        if navegadores > 3:
-            recomendacoes.append(f"🌐 {navegadores} processos de navegador ativos. Feche abas desnecessárias.")
+        # Analisar aplicações (grupos de processos)
+        navegadores = [a for a in aplicacoes if any(nav in a['name'].lower()
+                       for nav in ['chrome', 'chromium', 'firefox', 'edge', 'opera', 'brave'])]
+        if navegadores:
+            memoria_nav = sum(a['memory_mb'] for a in navegadores)
+            processos_nav = sum(a['processos'] for a in navegadores)
+            if processos_nav > 3 or memoria_nav > 1024:
+                recomendacoes.append(f"🌐 Navegadores usando {memoria_nav}MB em {processos_nav} processos. "
+                                     f"Feche abas desnecessárias.")
+        
+        if aplicacoes and aplicacoes[0]['memory_percent'] > 25:
+            maior = aplicacoes[0]
+            recomendacoes.append(f"📦 {maior['name']} ocupa {maior['memory_percent']:.1f}% da RAM "
+                                 f"({maior['memory_mb']}MB em {maior['processos']} processos).")
         
         # Verificar swap
-        swap = psutil.swap_memory()
+        if swap is None:
+            swap = psutil.swap_memory()
         if swap.used > 0:
             recomendacoes.append(f"💾 Usando {swap.used//(1024**2)}MB de swap. Adicione mais RAM se possível.")
         
         return recomendacoes
     
-    def iniciar_monitoramento_continuo(self, interval: int = 30) -> bool:
-        """Inicia monitoramento contínuo de métricas."""
+    def iniciar_monitoramento_continuo(self, interval: int = 30,
+                                       otimizacao_automatica: Optional[bool] = None) -> bool:
+        """Inicia monitoramento contínuo de métricas, com otimização de RAM disparada por PSI."""
+        config_ram = OPTIMIZATION_CONFIG['ram']
+        if otimizacao_automatica is None:
+            otimizacao_automatica = config_ram.get('auto_optimize_on_pressure', False)
+        
+        if otimizacao_automatica and self._gatilho_pressao is None and self.metrics.pressure_available():
+            self._gatilho_pressao = self.metrics.register_pressure_trigger(
+                'memory', config_ram['pressure_threshold'], self._on_pressao_memoria,
+                kind='some', cooldown=config_ram['pressure_cooldown_seconds']
+            )
+            self.logger.info(f"Gatilho PSI registrado: memória > {config_ram['pressure_threshold']}%")
+        
+        if OPTIMIZATION_CONFIG['disk'].get('live_index', False):
+            self.iniciar_monitoramento_disco()
+        
         self.logger.info(f"Iniciando monitoramento contínuo (intervalo: {interval}s)")
         return self.metrics.start_monitoring(interval)
     
+    def _on_pressao_memoria(self, valores: Dict) -> None:
+        """Callback do gatilho PSI de memória."""
+        stall = valores['rate'] if valores.get('rate') is not None else valores.get('avg10', 0.0)
+        self.logger.warning(f"Stall de memória em {stall:.2f}% - executando otimização de RAM automática")
+        self.otimizar_memoria_ram()
+    
     def parar_monitoramento_continuo(self):
         """Para o monitoramento contínuo."""
         self.logger.info("Parando monitoramento contínuo")
         self.metrics.stop_monitoring()
+        if self._gatilho_pressao is not None:
+            self.metrics.remove_pressure_trigger(self._gatilho_pressao)
+            self._gatilho_pressao = None
+        self.parar_monitoramento_disco()
+    
+    def iniciar_monitoramento_disco(self) -> bool:
+        """Mantém o índice de disco atualizado via inotify (apenas Linux)."""
+        if self._observador_disco is not None:
+            return True
+        if self.is_windows or not inotify_supported():
+            self.logger.info("Monitoramento de disco ao vivo indisponível nesta plataforma")
+            return False
+        indice = self._obter_indice_disco()
+        if indice is None:
+            return False
+        
+        config_disco = OPTIMIZATION_CONFIG['disk']
+        observador = DiskWatcher(indice,
+                                 debounce=config_disco.get('watch_debounce_seconds', 2.0),
+                                 watch_fraction=config_disco.get('watch_fraction', 0.5))
+        if not observador.start():
+            self.logger.warning("Falha ao iniciar inotify para o índice de disco")
+            return False
+        
+        self._observador_disco = observador
+        self.logger.info(f"Observando {observador.watch_count} diretórios via inotify"
+                         + (f" ({observador.unwatched} acima do limite de watches)"
+                            if observador.unwatched else ""))
+        return True
+    
+    def parar_monitoramento_disco(self):
+        """Para a atualização ao vivo do índice de disco."""
+        if self._observador_disco is not None:
+            self._observador_disco.stop()
+            self._observador_disco = None
     
     def gerar_relatorio_performance(self, horas: int = 24) -> Dict:
         """Gera relatório detalhado de performance."""
@@ -1058,8 +1648,13 @@ class SystemOptimizer:
         else:
             return f"{segundos_rest}s"
     
-    def analisar_uso_disco_detalhado(self, caminho: str = None) -> Dict:
-        """Analisa uso detalhado do disco."""
+    def analisar_uso_disco_detalhado(self, caminho: str = None, job: Optional[ScanJob] = None) -> Dict:
+        """
+        Analisa uso detalhado do disco com uma única varredura alimentando todas as análises.
+        
+        Com um ScanJob, a varredura reporta progresso nele e pode ser cancelada
+        (ScanCancelledError é propagada para o job).
+        """
         if not caminho:
             caminho = 'C:\\' if self.is_windows else '/'
         
@@ -1069,17 +1664,21 @@ class SystemOptimizer:
             # Informações básicas do disco
             disk_usage = psutil.disk_usage(caminho)
             
-            # Análise de diretórios grandes
-            diretorios_grandes = self._analisar_diretorios_grandes(caminho)
-            
-            # Análise de tipos de arquivo
-            tipos_arquivo = self._analisar_tipos_arquivo(caminho)
-            
-            # Análise de arquivos antigos
-            arquivos_antigos = self._analisar_arquivos_antigos(caminho)
-            
-            # Análise de arquivos duplicados (sample)
-            duplicados_sample = self._analisar_duplicados_sample(caminho)
+            # Uma única varredura alimenta os quatro estágios de análise
+            estagios = self._criar_estagios_disco(caminho)
+            inicio = time.time()
+            self._varrer_disco(list(estagios.values()), job)
+            self.logger.info(f"Varredura de disco concluída em {time.time() - inicio:.1f}s")
+            if job is not None:
+                job.token.raise_if_cancelled()
+            
+            diretorios_grandes = self._resultado_diretorios_grandes(estagios['diretorios_grandes'])
+            tipos_arquivo = self._resultado_tipos_arquivo(estagios['tipos_arquivo'])
+            arquivos_antigos = self._resultado_arquivos_antigos(estagios['arquivos_antigos'])
+            duplicados_sample = self._resultado_duplicados(estagios['duplicados'], job)
+            maiores_arquivos = self._resultado_maiores_arquivos(estagios['maiores_arquivos'])
+            maiores_diretorios = self._resultado_maiores_diretorios(estagios['maiores_diretorios'])
+            distribuicao_idade = self._resultado_distribuicao_idade(estagios['distribuicao_idade'])
             
             return {
                 'caminho': caminho,
@@ -1091,262 +1690,353 @@ class SystemOptimizer:
                 'tipos_arquivo': tipos_arquivo,
                 'arquivos_antigos': arquivos_antigos,
                 'duplicados_sample': duplicados_sample,
+                'maiores_arquivos': maiores_arquivos,
+                'maiores_diretorios_folha': maiores_diretorios,
+                'distribuicao_idade': distribuicao_idade,
                 'recomendacoes': self._gerar_recomendacoes_disco(disk_usage, diretorios_grandes, arquivos_antigos)
             }
             
+        except ScanCancelledError:
+            self.logger.info("Análise de disco cancelada")
+            raise
         except Exception as e:
             self.logger.error(f"Erro na análise de disco: {e}")
             return {}
     
-    def _analisar_diretorios_grandes(self, caminho: str, limite_gb: float = 1.0) -> List[Dict]:
-        """Analisa diretórios que ocupam muito espaço."""
-        diretorios_grandes = []
-        limite_bytes = limite_gb * 1024**3
-        
-        try:
-            # Diretórios comuns para verificar
-            diretorios_verificar = []
-            
-            if self.is_windows:
-                diretorios_verificar = [
+    def iniciar_analise_disco(self, caminho: str = None, timeout: Optional[float] = None) -> ScanJob:
+        """Inicia a análise detalhada de disco em segundo plano, com progresso e cancelamento."""
+        if timeout is None:
+            timeout = OPTIMIZATION_CONFIG['disk'].get('scan_timeout_seconds')
+        return ScanJob(lambda job: self.analisar_uso_disco_detalhado(caminho, job), timeout).start()
+    
+    def _escopos_analise_disco(self, caminho: str) -> Dict[str, List[str]]:
+        """Diretórios considerados por cada análise de disco."""
+        if self.is_windows:
+            usuario = os.environ.get('USERNAME', 'User')
+            return {
+                'diretorios_grandes': [
                     os.path.join(caminho, 'Users'),
                     os.path.join(caminho, 'Program Files'),
                     os.path.join(caminho, 'Program Files (x86)'),
                     os.path.join(caminho, 'Windows'),
                     os.path.join(caminho, 'ProgramData')
-                ]
-            else:
-                diretorios_verificar = [
-                    '/home', '/usr', '/var', '/opt', '/tmp'
-                ]
-            
-            for diretorio in diretorios_verificar:
-                if os.path.exists(diretorio):
-                    try:
-                        tamanho = self._calcular_tamanho_diretorio(diretorio)
-                        if tamanho > limite_bytes:
-                            diretorios_grandes.append({
-                                'caminho': diretorio,
-                                'tamanho_gb': tamanho / (1024**3),
-                                'tamanho_mb': tamanho / (1024**2)
-                            })
-                    except (PermissionError, OSError):
-                        continue
-            
-            # Ordenar por tamanho
-            diretorios_grandes.sort(key=lambda x: x['tamanho_gb'], reverse=True)
-            return diretorios_grandes[:10]  # Top 10
-            
+                ],
+                'tipos_arquivo': [
+                    f"C:\\Users\\{usuario}\\Desktop",
+                    f"C:\\Users\\{usuario}\\Documents",
+                    f"C:\\Users\\{usuario}\\Downloads"
+                ],
+                'arquivos_antigos': [
+                    os.path.expandvars('%TEMP%'),
+                    os.path.expandvars('%WINDIR%\\Temp'),
+                    os.path.expandvars('%USERPROFILE%\\Downloads')
+                ],
+                'duplicados': [f"C:\\Users\\{usuario}\\Documents"]
+            }
+        
+        home = os.path.expanduser("~")
+        return {
+            'diretorios_grandes': ['/home', '/usr', '/var', '/opt', '/tmp'],
+            'tipos_arquivo': [
+                os.path.join(home, "Desktop"),
+                os.path.join(home, "Documents"),
+                os.path.join(home, "Downloads")
+            ],
+            'arquivos_antigos': ['/tmp', '/var/tmp', os.path.join(home, 'Downloads')],
+            'duplicados': [os.path.join(home, "Documents")]
+        }
+    
+    def _criar_estagios_disco(self, caminho: str, dias_antigos: int = 365) -> Dict[str, ScanStage]:
+        """Cria os estágios do pipeline de análise de disco."""
+        escopos = {nome: [d for d in dirs if os.path.isdir(d)]
+                   for nome, dirs in self._escopos_analise_disco(caminho).items()}
+        config_disco = OPTIMIZATION_CONFIG['disk']
+        top_arquivos = config_disco.get('top_files', 100)
+        top_diretorios = config_disco.get('top_leaf_directories', 50)
+        # Os maiores arquivos/diretórios são do host inteiro: a varredura parte de caminho
+        # (montagens e exclusões continuam sendo puladas pelo scanner)
+        raiz = [caminho] if os.path.isdir(caminho) else []
+        return {
+            'diretorios_grandes': DirectorySizeStage(escopos['diretorios_grandes']),
+            'tipos_arquivo': FileTypeStage(escopos['tipos_arquivo']),
+            'arquivos_antigos': OldFilesStage(time.time() - dias_antigos * 24 * 60 * 60,
+                                              escopos['arquivos_antigos']),
+            'duplicados': DuplicateCandidateStage(escopos['duplicados']),
+            'maiores_arquivos': LargestFilesStage(top_arquivos, raiz if top_arquivos else []),
+            'maiores_diretorios': LargestLeafDirectoriesStage(top_diretorios, raiz if top_diretorios else []),
+            'distribuicao_idade': AgeHistogramStage(escopos['diretorios_grandes'], time.time(),
+                                                    config_disco.get('age_buckets_days', [7, 30, 90, 365]))
+        }
+    
+    def _obter_indice_disco(self) -> Optional[ScanIndex]:
+        """Abre (uma vez) o índice persistente de varredura, se habilitado."""
+        if self._indice_disco is None and OPTIMIZATION_CONFIG['disk'].get('use_scan_index', True):
+            try:
+                self._indice_disco = ScanIndex()
+            except sqlite3.Error as e:
+                self.logger.warning(f"Índice de disco indisponível, varrendo sem cache: {e}")
+        return self._indice_disco
+    
+    def _obter_cache_hash(self) -> Optional[HashCache]:
+        """Abre (uma vez) o cache persistente de hashes de conteúdo, se habilitado."""
+        config_disco = OPTIMIZATION_CONFIG['disk']
+        if self._cache_hash is None and config_disco.get('hash_cache', True):
+            try:
+                self._cache_hash = HashCache(max_entries=config_disco.get('hash_cache_max_entries', 500000))
+            except sqlite3.Error as e:
+                self.logger.warning(f"Cache de hashes indisponível: {e}")
+        return self._cache_hash
+    
+    def _criar_scanner_disco(self, job: Optional[ScanJob] = None) -> DiskScanner:
+        """Scanner configurado com índice, exclusões, montagens ignoradas e o job (se houver)."""
+        config_disco = OPTIMIZATION_CONFIG['disk']
+        return DiskScanner(PERFORMANCE_CONFIG['max_threads'],
+                           index=self._obter_indice_disco(),
+                           exclusions=PathTrie(SAFETY_CONFIG['excluded_directories']),
+                           mounts=MountTable.load() if not self.is_windows else None,
+                           skip_pseudo=config_disco.get('skip_pseudo_filesystems', True),
+                           skip_network=config_disco.get('skip_network_filesystems', True),
+                           one_filesystem=config_disco.get('one_filesystem', False),
+                           token=job.token if job else None,
+                           progress=job.progress if job else None,
+                           throttle=self._criar_throttle(job))
+    
+    def _criar_throttle(self, job: Optional[ScanJob] = None) -> Optional[Throttle]:
+        """Limitador do modo background (None se o modo estiver desligado)."""
+        config_disco = OPTIMIZATION_CONFIG['disk']
+        if not config_disco.get('background_mode', False):
+            return None
+        return Throttle(bytes_per_second=config_disco.get('io_limit_bytes_per_second'),
+                        ops_per_second=config_disco.get('io_limit_ops_per_second'),
+                        metrics=self.metrics,
+                        max_load_per_cpu=config_disco.get('pause_load_per_cpu', 1.5),
+                        max_io_pressure=config_disco.get('pause_io_pressure', 20.0),
+                        sched_idle=config_disco.get('background_sched_idle', False),
+                        token=job.token if job else None)
+    
+    def _varrer_disco(self, estagios: List[ScanStage], job: Optional[ScanJob] = None) -> None:
+        """Executa uma varredura paralela única sobre as raízes de todos os estágios."""
+        raizes = [raiz for estagio in estagios for raiz in estagio.roots]
+        scanner = self._criar_scanner_disco(job)
+        if job is not None:
+            # Totais da varredura anterior dão a base do ETA
+            job.expect(raizes, scanner.index)
+        scanner.run(raizes, estagios)
+        if scanner.index is not None:
+            self.logger.info(f"Diretórios reaproveitados do índice: "
+                             f"{scanner.stats['cached']}/{scanner.stats['directories']}")
+        if scanner.stats['excluded'] or scanner.stats['skipped_mounts']:
+            self.logger.info(f"Varredura: {scanner.stats['excluded']} diretórios excluídos, "
+                             f"{scanner.stats['skipped_mounts']} montagens ignoradas, "
+                             f"{scanner.stats['devices']} dispositivos")
+    
+    def _resultado_maiores_arquivos(self, estagio: LargestFilesStage) -> List[Dict]:
+        """Formata os maiores arquivos encontrados na varredura."""
+        return [{
+            'arquivo': arq['path'],
+            'tamanho_mb': arq['size'] / (1024**2),
+            'alocado_mb': arq['allocated'] / (1024**2)
+        } for arq in estagio.result()]
+    
+    def _resultado_maiores_diretorios(self, estagio: LargestLeafDirectoriesStage) -> List[Dict]:
+        """Formata os maiores diretórios folha encontrados na varredura."""
+        return [{
+            'caminho': d['path'],
+            'arquivos': d['files'],
+            'tamanho_mb': d['size'] / (1024**2),
+            'alocado_mb': d['allocated'] / (1024**2)
+        } for d in estagio.result()]
+    
+    def _resultado_distribuicao_idade(self, estagio: AgeHistogramStage) -> Dict:
+        """Formata os histogramas de idade (MB e arquivos por faixa) de cada diretório."""
+        return {diretorio: {campo: {faixa: {'arquivos': v['count'], 'tamanho_mb': v['size'] / (1024**2)}
+                                    for faixa, v in faixas.items()}
+                            for campo, faixas in hist.items()}
+                for diretorio, hist in estagio.result().items()}
+    
+    def bytes_sem_uso(self, caminho: str, dias: int = 90, campo: str = 'mtime') -> Dict:
+        """
+        Consulta no índice quanto espaço sob um caminho não é modificado (mtime)
+        ou acessado (atime) há pelo menos N dias, sem nova varredura.
+        """
+        indice = self._obter_indice_disco()
+        if indice is None:
+            return {}
+        resultado = indice.bytes_older_than(caminho, dias, campo)
+        return {
+            'caminho': caminho,
+            'dias': dias,
+            'campo': campo,
+            'arquivos': resultado['files'],
+            'tamanho_mb': resultado['size'] / (1024**2)
+        }
+    
+    def _analisar_diretorios_grandes(self, caminho: str, limite_gb: float = 1.0) -> List[Dict]:
+        """Analisa diretórios que ocupam muito espaço."""
+        try:
+            estagio = self._criar_estagios_disco(caminho)['diretorios_grandes']
+            self._varrer_disco([estagio])
+            return self._resultado_diretorios_grandes(estagio, limite_gb)
         except Exception as e:
             self.logger.error(f"Erro ao analisar diretórios: {e}")
             return []
     
+    def _resultado_diretorios_grandes(self, estagio: DirectorySizeStage, limite_gb: float = 1.0) -> List[Dict]:
+        """Formata o resultado do estágio de diretórios grandes (tamanho alocado e aparente)."""
+        limite_bytes = limite_gb * 1024**3
+        diretorios_grandes = [{
+            'caminho': diretorio,
+            'tamanho_gb': tamanhos['allocated'] / (1024**3),
+            'tamanho_mb': tamanhos['allocated'] / (1024**2),
+            'tamanho_aparente_gb': tamanhos['apparent'] / (1024**3),
+            'tamanho_aparente_mb': tamanhos['apparent'] / (1024**2)
+        } for diretorio, tamanhos in estagio.result().items() if tamanhos['allocated'] > limite_bytes]
+        
+        # Ordenar por tamanho
+        diretorios_grandes.sort(key=lambda x: x['tamanho_gb'], reverse=True)
+        return diretorios_grandes[:10]  # Top 10
+    
     def _calcular_tamanho_diretorio(self, caminho: str) -> int:
-        """Calcula tamanho total de um diretório."""
-        tamanho_total = 0
-        
+        """Calcula o espaço alocado por um diretório (hardlinks contados uma vez)."""
         try:
-            for dirpath, dirnames, filenames in os.walk(caminho):
-                for filename in filenames:
-                    try:
-                        filepath = os.path.join(dirpath, filename)
-                        if os.path.exists(filepath):
-                            tamanho_total += os.path.getsize(filepath)
-                    except (OSError, PermissionError):
-                        continue
+            estagio = DirectorySizeStage([caminho])
+            self._varrer_disco([estagio])
+            return sum(t['allocated'] for t in estagio.result().values())
         except (OSError, PermissionError):
-            pass
-            
-        return tamanho_total
+            return 0
     
     def _analisar_tipos_arquivo(self, caminho: str) -> Dict:
         """Analisa distribuição por tipos de arquivo."""
-        tipos = defaultdict(lambda: {'count': 0, 'size': 0})
-        
         try:
-            # Sample de diretórios para não ser muito lento
-            diretorios_sample = []
-            
-            if self.is_windows:
-                usuario = os.environ.get('USERNAME', 'User')
-                diretorios_sample = [
-                    f"C:\\Users\\{usuario}\\Desktop",
-                    f"C:\\Users\\{usuario}\\Documents",
-                    f"C:\\Users\\{usuario}\\Downloads"
-                ]
-            else:
-                home = os.path.expanduser("~")
-                diretorios_sample = [
-                    os.path.join(home, "Desktop"),
-                    os.path.join(home, "Documents"),
-                    os.path.join(home, "Downloads")
-                ]
-            
-            for diretorio in diretorios_sample:
-                if os.path.exists(diretorio):
-                    for root, dirs, files in os.walk(diretorio):
-                        for file in files[:100]:  # Limitar a 100 arquivos por diretório
-                            try:
-                                filepath = os.path.join(root, file)
-                                if os.path.exists(filepath):
-                                    tamanho = os.path.getsize(filepath)
-                                    extensao = os.path.splitext(file)[1].lower()
-                                    if not extensao:
-                                        extensao = '[sem extensão]'
-                                    
-                                    tipos[extensao]['count'] += 1
-                                    tipos[extensao]['size'] += tamanho
-                            except (OSError, PermissionError):
-                                continue
-                        break  # Não recursivo para sample
-            
-            # Converter para formato mais legível
-            resultado = {}
-            for ext, data in tipos.items():
-                resultado[ext] = {
-                    'arquivos': data['count'],
-                    'tamanho_mb': data['size'] / (1024**2)
-                }
-            
-            return dict(sorted(resultado.items(), key=lambda x: x[1]['tamanho_mb'], reverse=True)[:15])
-            
+            estagio = self._criar_estagios_disco(caminho)['tipos_arquivo']
+            self._varrer_disco([estagio])
+            return self._resultado_tipos_arquivo(estagio)
         except Exception as e:
             self.logger.error(f"Erro ao analisar tipos de arquivo: {e}")
             return {}
     
-    def _analisar_arquivos_antigos(self, caminho: str, dias: int = 365) -> Dict:
-        """Analisa arquivos antigos que podem ser removidos."""
-        import time
-        
-        arquivos_antigos = []
-        tamanho_total = 0
-        cutoff_time = time.time() - (dias * 24 * 60 * 60)
+    def _resultado_tipos_arquivo(self, estagio: FileTypeStage) -> Dict:
+        """Formata o resultado do estágio de tipos de arquivo."""
+        resultado = {}
+        for ext, data in estagio.result().items():
+            resultado[ext or '[sem extensão]'] = {
+                'arquivos': data['count'],
+                'tamanho_mb': data['size'] / (1024**2)
+            }
         
+        return dict(sorted(resultado.items(), key=lambda x: x[1]['tamanho_mb'], reverse=True)[:15])
+    
+    def _amostrar_disco(self, raizes: List[str], orcamento_segundos: Optional[float] = None) -> Dict:
+        """Executa o estimador por amostragem sobre as raízes."""
+        if orcamento_segundos is None:
+            orcamento_segundos = OPTIMIZATION_CONFIG['disk'].get('sample_time_budget_seconds', 2.0)
+        sampler = DiskSampler(self._criar_scanner_disco(), time_budget=orcamento_segundos)
+        estimativa = sampler.estimate(raizes)
+        self.logger.info(f"Amostragem de disco: {estimativa['probes']} sondas, "
+                         f"{estimativa['directories_listed']} diretórios em {estimativa['elapsed']:.1f}s")
+        return estimativa
+    
+    def estimar_uso_disco(self, caminho: Optional[str] = None,
+                          orcamento_segundos: Optional[float] = None) -> Dict:
+        """
+        Estimativa rápida e aproximada do uso de disco sob um caminho.
+        
+        Retorna o total e os bytes por extensão e por diretório (raiz e filhos
+        imediatos) com intervalo de confiança; use analisar_uso_disco_detalhado
+        para números exatos.
+        """
+        if caminho is None:
+            caminho = 'C:\\' if self.is_windows else '/'
         try:
-            # Diretórios para verificar arquivos antigos
-            diretorios_temp = []
-            
-            if self.is_windows:
-                diretorios_temp = [
-                    os.path.expandvars('%TEMP%'),
-                    os.path.expandvars('%WINDIR%\\Temp'),
-                    os.path.expandvars('%USERPROFILE%\\Downloads')
-                ]
-            else:
-                diretorios_temp = [
-                    '/tmp',
-                    '/var/tmp',
-                    os.path.expanduser('~/Downloads')
-                ]
-            
-            for diretorio in diretorios_temp:
-                if os.path.exists(diretorio):
-                    for root, dirs, files in os.walk(diretorio):
-                        for file in files:
-                            try:
-                                filepath = os.path.join(root, file)
-                                if os.path.exists(filepath):
-                                    stat_info = os.stat(filepath)
-                                    if stat_info.st_mtime < cutoff_time:
-                                        tamanho = stat_info.st_size
-                                        arquivos_antigos.append({
-                                            'arquivo': filepath,
-                                            'tamanho_mb': tamanho / (1024**2),
-                                            'dias_antigo': int((time.time() - stat_info.st_mtime) / (24 * 60 * 60))
-                                        })
-                                        tamanho_total += tamanho
-                                        
-                                        if len(arquivos_antigos) >= 50:  # Limitar sample
-                                            break
-                            except (OSError, PermissionError):
-                                continue
-                        if len(arquivos_antigos) >= 50:
-                            break
-                    if len(arquivos_antigos) >= 50:
-                        break
-            
+            estimativa = self._amostrar_disco([caminho], orcamento_segundos)
+        except Exception as e:
+            self.logger.error(f"Erro na estimativa de uso de disco: {e}")
+            return {}
+        
+        def em_mb(data: Dict) -> Dict:
             return {
-                'total_arquivos': len(arquivos_antigos),
-                'tamanho_total_mb': tamanho_total / (1024**2),
-                'sample_arquivos': sorted(arquivos_antigos, key=lambda x: x['tamanho_mb'], reverse=True)[:10]
+                'tamanho_mb': data['size'] / (1024**2),
+                'intervalo_mb': (data['low'] / (1024**2), data['high'] / (1024**2))
             }
-            
+        
+        return {
+            'caminho': caminho,
+            'total': em_mb(estimativa['total']),
+            'tipos_arquivo': {ext or '[sem extensão]': dict(em_mb(data), arquivos=int(round(data['count'])))
+                              for ext, data in list(estimativa['extensions'].items())[:15]},
+            'diretorios': {d: em_mb(data) for d, data in list(estimativa['directories'].items())[:20]},
+            'sondas': estimativa['probes'],
+            'diretorios_listados': estimativa['directories_listed'],
+            'tempo_segundos': estimativa['elapsed']
+        }
+    
+    def _analisar_arquivos_antigos(self, caminho: str, dias: int = 365) -> Dict:
+        """Analisa arquivos antigos que podem ser removidos."""
+        try:
+            estagio = self._criar_estagios_disco(caminho, dias)['arquivos_antigos']
+            self._varrer_disco([estagio])
+            return self._resultado_arquivos_antigos(estagio)
         except Exception as e:
             self.logger.error(f"Erro ao analisar arquivos antigos: {e}")
             return {}
     
+    def _resultado_arquivos_antigos(self, estagio: OldFilesStage) -> Dict:
+        """Formata o resultado do estágio de arquivos antigos."""
+        resultado = estagio.result()
+        agora = time.time()
+        return {
+            'total_arquivos': resultado['count'],
+            'tamanho_total_mb': resultado['size'] / (1024**2),
+            'sample_arquivos': [{
+                'arquivo': arq['path'],
+                'tamanho_mb': arq['size'] / (1024**2),
+                'dias_antigo': int((agora - arq['mtime']) / (24 * 60 * 60))
+            } for arq in resultado['sample']]
+        }
+    
     def _analisar_duplicados_sample(self, caminho: str) -> Dict:
-        """Analisa sample de arquivos duplicados."""
-        hashes = defaultdict(list)
-        duplicados = []
-        tamanho_duplicado = 0
-        
+        """Analisa arquivos duplicados (todos os candidatos do escopo, sem amostragem)."""
         try:
-            # Sample em diretório de usuário
-            if self.is_windows:
-                usuario = os.environ.get('USERNAME', 'User')
-                sample_dir = f"C:\\Users\\{usuario}\\Documents"
-            else:
-                sample_dir = os.path.expanduser("~/Documents")
-            
-            if os.path.exists(sample_dir):
-                arquivos_verificados = 0
-                for root, dirs, files in os.walk(sample_dir):
-                    for file in files:
-                        if arquivos_verificados >= 100:  # Limitar para performance
-                            break
-                            
-                        filepath = os.path.join(root, file)
-                        try:
-                            if os.path.exists(filepath) and os.path.getsize(filepath) > 1024:  # > 1KB
-                                file_hash = self._calcular_hash_arquivo(filepath)
-                                if file_hash:
-                                    hashes[file_hash].append({
-                                        'caminho': filepath,
-                                        'tamanho': os.path.getsize(filepath)
-                                    })
-                                    arquivos_verificados += 1
-                        except (OSError, PermissionError):
-                            continue
-                    if arquivos_verificados >= 100:
-                        break
-                
-                # Encontrar duplicados
-                for file_hash, arquivos in hashes.items():
-                    if len(arquivos) > 1:
-                        tamanho = arquivos[0]['tamanho']
-                        espaco_desperdicado = tamanho * (len(arquivos) - 1)
-                        tamanho_duplicado += espaco_desperdicado
-                        
-                        duplicados.append({
-                            'arquivos': [arq['caminho'] for arq in arquivos],
-                            'tamanho_mb': tamanho / (1024**2),
-                            'copias': len(arquivos),
-                            'espaco_desperdicado_mb': espaco_desperdicado / (1024**2)
-                        })
-            
-            return {
-                'grupos_duplicados': len(duplicados),
-                'tamanho_desperdicado_mb': tamanho_duplicado / (1024**2),
-                'sample_duplicados': sorted(duplicados, key=lambda x: x['espaco_desperdicado_mb'], reverse=True)[:5]
-            }
-            
+            estagio = self._criar_estagios_disco(caminho)['duplicados']
+            self._varrer_disco([estagio])
+            return self._resultado_duplicados(estagio)
         except Exception as e:
             self.logger.error(f"Erro ao analisar duplicados: {e}")
             return {}
     
-    def _calcular_hash_arquivo(self, filepath: str) -> Optional[str]:
-        """Calcula hash MD5 de um arquivo."""
-        try:
-            hash_md5 = hashlib.md5()
-            with open(filepath, 'rb') as f:
-                # Ler apenas os primeiros 64KB para performance
-                chunk = f.read(65536)
-                if chunk:
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
-        except (OSError, PermissionError):
-            return None
+    def _resultado_duplicados(self, estagio: DuplicateCandidateStage, job: Optional[ScanJob] = None) -> Dict:
+        """
+        Confirma duplicados por hash (blocos inicial/final, depois conteúdo completo).
+        
+        Com um ScanJob, o hash reporta progresso nele e pode ser cancelado.
+        """
+        finder = DuplicateFinder(PERFORMANCE_CONFIG['max_threads'], cache=self._obter_cache_hash(),
+                                 direct_io=OPTIMIZATION_CONFIG['disk'].get('hash_direct_io', False),
+                                 throttle=self._criar_throttle(job),
+                                 token=job.token if job else None,
+                                 progress=job.progress if job else None)
+        grupos = finder.find(estagio.result())
+        self.logger.info(f"Duplicados: {finder.stats['candidates']} candidatos por tamanho, "
+                         f"{finder.stats['full_hashed']} com hash completo, "
+                         f"{finder.stats['cache_hits']} hashes do cache, {len(grupos)} grupos")
+        
+        duplicados = []
+        tamanho_duplicado = 0
+        for grupo in grupos:
+            espaco_desperdicado = grupo['size'] * (len(grupo['files']) - 1)
+            tamanho_duplicado += espaco_desperdicado
+            duplicados.append({
+                'arquivos': grupo['files'],
+                'tamanho_mb': grupo['size'] / (1024**2),
+                'copias': len(grupo['files']),
+                'espaco_desperdicado_mb': espaco_desperdicado / (1024**2)
+            })
+        
+        return {
+            'grupos_duplicados': len(duplicados),
+            'tamanho_desperdicado_mb': tamanho_duplicado / (1024**2),
+            'sample_duplicados': duplicados[:5]
+        }
     
     def _gerar_recomendacoes_disco(self, disk_usage, diretorios_grandes: List, arquivos_antigos: Dict) -> List[str]:
         """Gera recomendações para otimização de disco."""
@@ -1416,34 +2106,15 @@ class SystemOptimizer:
     
     def _limpeza_temporarios_avancada(self) -> bool:
         """Limpeza avançada de arquivos temporários."""
-        try:
-            if self.is_windows:
-                comandos = [
-                    ('del /q /s %temp%\\*.tmp 2>nul', 'Arquivos .tmp'),
-                    ('del /q /s %temp%\\*.log 2>nul', 'Logs temporários'),
-                    ('del /q /s %windir%\\Temp\\*.* 2>nul', 'Temp do Windows'),
-                    ('del /q /s "%USERPROFILE%\\AppData\\Local\\Temp\\*.*" 2>nul', 'Temp do usuário')
-                ]
-            else:
-                comandos = [
-                    ('find /tmp -type f -atime +7 -delete 2>/dev/null', 'Arquivos antigos em /tmp'),
-                    ('find /var/tmp -type f -atime +7 -delete 2>/dev/null', 'Arquivos antigos em /var/tmp'),
-                    ('rm -rf ~/.cache/thumbnails/* 2>/dev/null', 'Cache de thumbnails')
-                ]
-            
-            sucesso = True
-            for comando, desc in comandos:
-                if not self._executar_comando(comando, f'Limpeza: {desc}'):
-                    sucesso = False
-            
-            return sucesso
-            
-        except Exception as e:
-            self.logger.error(f"Erro na limpeza avançada: {e}")
-            return False
+        return self._limpar_por_regras('temporarios_avancada')
     
     def _limpeza_cache_avancada(self) -> bool:
         """Limpeza avançada de cache do sistema."""
+        sucesso = self._limpar_caches()
+        return self._otimizar_caches_sistema() and sucesso
+    
+    def _otimizar_caches_sistema(self) -> bool:
+        """Caches do sistema que não são arquivos de regras: DNS e Explorer, ou page cache e locate."""
         try:
             if self.is_windows:
                 comandos = [
@@ -1452,9 +2123,9 @@ class SystemOptimizer:
                     ('del /q /s "%APPDATA%\\Microsoft\\Windows\\Recent\\*.*" 2>nul', 'Arquivos recentes')
                 ]
             else:
+                # Cache do kernel: liberação seletiva em vez de drop_caches global
+                self.liberar_page_cache_seletivo()
                 comandos = [
-                    ('sync && echo 3 | sudo tee /proc/sys/vm/drop_caches 2>/dev/null', 'Cache do kernel'),
-                    ('rm -rf ~/.cache/* 2>/dev/null', 'Cache do usuário'),
                     ('sudo updatedb 2>/dev/null', 'Atualizar índice locate')
                 ]
             
@@ -1471,31 +2142,16 @@ class SystemOptimizer:
     
     def _limpar_arquivos_antigos(self) -> bool:
         """Remove arquivos antigos seguros."""
-        try:
-            self.logger.info("Removendo arquivos antigos...")
-            
-            if self.is_windows:
-                # Limpar Downloads antigos (>30 dias)
-                downloads = os.path.expanduser("~/Downloads")
-                if os.path.exists(downloads):
-                    comando = f'forfiles /p "{downloads}" /s /m *.* /d -30 /c "cmd /c del @path" 2>nul'
-                    self._executar_comando(comando, 'Arquivos antigos em Downloads')
-            else:
-                # Limpar arquivos antigos em diretórios seguros
-                home = os.path.expanduser("~")
-                downloads = os.path.join(home, "Downloads")
-                if os.path.exists(downloads):
-                    comando = f'find "{downloads}" -type f -mtime +30 -delete 2>/dev/null'
-                    self._executar_comando(comando, 'Arquivos antigos em Downloads')
-            
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Erro ao limpar arquivos antigos: {e}")
-            return False
+        self.logger.info("Removendo arquivos antigos...")
+        return self._limpar_por_regras('arquivos_antigos')
     
     def _remover_duplicados_seguros(self) -> bool:
         """Remove duplicados em diretórios seguros."""
+        modo = OPTIMIZATION_CONFIG['disk'].get('dedup_mode')
+        if modo:
+            resultado = self.deduplicar_arquivos(modo)
+            return bool(resultado)
+        
         self.logger.info("Análise de duplicados em diretórios seguros...")
         # Por segurança, apenas reportar duplicados, não remover automaticamente
         duplicados = self._analisar_duplicados_sample(".")
@@ -1507,6 +2163,31 @@ class SystemOptimizer:
         
         return True
     
+    def deduplicar_arquivos(self, modo: str = 'auto', caminho: str = None) -> Dict:
+        """
+        Substitui duplicados confirmados por hardlinks ou reflinks (btrfs/XFS).
+        
+        Cada arquivo é comparado byte a byte logo antes da troca, que é feita
+        de forma atômica (link temporário + rename).
+        """
+        try:
+            estagio = self._criar_estagios_disco(caminho or '/')['duplicados']
+            self._varrer_disco([estagio])
+            grupos = DuplicateFinder(PERFORMANCE_CONFIG['max_threads'],
+                                     cache=self._obter_cache_hash()).find(estagio.result())
+            
+            self.logger.info(f"Deduplicando {len(grupos)} grupos (modo: {modo})")
+            resultado = deduplicate(grupos, modo)
+            for arquivo in resultado['files']:
+                self.logger.info(f"[{arquivo['method']}] {arquivo['path']} -> {arquivo['keeper']}")
+            self.logger.info(f"Duplicados vinculados: {resultado['linked']}, mantidos: {resultado['kept']}, "
+                             f"espaço recuperado: {resultado['reclaimed'] / (1024**2):.1f}MB")
+            return resultado
+            
+        except Exception as e:
+            self.logger.error(f"Erro na deduplicação: {e}")
+            return {}
+    
     def _desfragmentar_disco(self) -> bool:
         """Executa desfragmentação no Windows."""
         try:
@@ -1562,60 +2243,74 @@ class SystemOptimizer:
     
     def limpar_prefetch(self) -> bool:
         """Limpa arquivos prefetch (Windows) ou equivalentes (Linux)."""
-        if self.is_windows:
-            return self._executar_comando(
-                'del /q /s %windir%\\Prefetch\\* 2>nul',
-                'Limpeza do Prefetch'
-            )
-        else:
-            # No Linux, limpar thumbnails e cache de ícones
-            return self._executar_comando(
-                'rm -rf ~/.thumbnails/* ~/.cache/thumbnails/* 2>/dev/null',
-                'Limpeza thumbnails e cache de ícones'
-            )
-    
-    def executar_otimizacao_completa(self) -> None:
-        """Executa todas as rotinas de otimização."""
+        # No Linux, thumbnails e cache de ícones
+        return self._limpar_por_regras('prefetch')
+    
+    def executar_otimizacao_completa(self, simular: bool = False,
+                                     plano: Optional[CleanupPlan] = None) -> Optional[CleanupPlan]:
+        """
+        Executa todas as rotinas de otimização.
+        
+        Com simular, apenas calcula e retorna o plano de limpeza, sem
+        alterar nada. Com um plano, as limpezas de arquivos, journal e cache
+        de pacotes são substituídas pela execução desse plano; as demais
+        etapas (pacotes órfãos, Windows Update, page cache, índices do
+        sistema) continuam sendo executadas.
+        """
+        if simular:
+            return self.planejar_limpeza()
+        
         if not self.verificar_gerenciador_pacotes():
             self.logger.error("Gerenciador de pacotes não disponível. Abortando otimização.")
-            return
+            return None
         
         self.logger.info("=== Iniciando otimização do sistema ===")
         
-        # Medições iniciais
-        self.logger.info("Medições antes da limpeza:")
-        cpu_inicial, mem_inicial, disco_inicial = self.medir_uso_recursos()
-        
-        # Executar limpezas
+        # Executar limpezas, cada uma medida com amostras antes e depois
         self.logger.info("Executando rotinas de limpeza e otimização:")
-        operacoes = [
-            (self.limpar_temporarios, "Limpeza de temporários"),
-            (self.limpar_cache_sistema, "Limpeza cache do sistema"),
-            (self.otimizar_memoria_ram, "Otimização avançada de RAM"),
-            (lambda: self.otimizar_disco_avancado(limpar_antigos=True), "Otimização avançada de disco"),
-            (self.atualizar_pacotes, "Atualização de pacotes"),
-            (self.verificar_integridade, "Verificação de integridade"),
-            (self.limpar_prefetch, "Limpeza de cache adicional"),
-            (self.verificar_virus, "Verificação de vírus")
-        ]
+        if plano is not None:
+            operacoes = [
+                (lambda: self._limpar_por_plano(plano), "Limpeza planejada"),
+                (self._limpar_sistema_fora_do_plano, "Limpeza cache do sistema"),
+                (self.otimizar_memoria_sob_pressao, "Otimização avançada de RAM"),
+                (self._otimizar_indices_sistema, "Otimização de índices do sistema"),
+                (self.atualizar_pacotes, "Atualização de pacotes"),
+                (self.verificar_integridade, "Verificação de integridade"),
+                (self.verificar_virus, "Verificação de vírus")
+            ]
+        else:
+            operacoes = [
+                (self.limpar_temporarios, "Limpeza de temporários"),
+                (self.limpar_cache_sistema, "Limpeza cache do sistema"),
+                (self.otimizar_memoria_sob_pressao, "Otimização avançada de RAM"),
+                (lambda: self.otimizar_disco_avancado(limpar_antigos=True), "Otimização avançada de disco"),
+                (self.atualizar_pacotes, "Atualização de pacotes"),
+                (self.verificar_integridade, "Verificação de integridade"),
+                (self.limpar_prefetch, "Limpeza de cache adicional"),
+                (self.verificar_virus, "Verificação de vírus")
+            ]
         
+        efeitos = []
         for operacao, nome in operacoes:
             try:
-                operacao()
+                medicao = self.medir_efeito_operacao(operacao, nome)
+                efeitos.append((nome, medicao['effects']))
             except Exception as e:
                 self.logger.error(f"Erro em {nome}: {e}")
         
-        # Medições finais
-        self.logger.info("Medições após a limpeza:")
-        cpu_final, mem_final, disco_final = self.medir_uso_recursos()
-        
-        # Relatório final
+        # Relatório final: variação mediana com intervalo de confiança por operação
         self.logger.info("=== Relatório de Otimização ===")
-        self.logger.info(f"Variação CPU: {cpu_inicial - cpu_final:.2f}%")
-        self.logger.info(f"Variação Memória: {mem_inicial - mem_final:.2f}%")
-        self.logger.info(f"Variação Disco: {disco_inicial - disco_final:.2f}%")
+        for nome, efeito in efeitos:
+            partes = []
+            if 'cpu_percent' in efeito:
+                partes.append(f"CPU {self._formatar_efeito(efeito['cpu_percent'], unidade='%')}")
+            if 'memory_used' in efeito:
+                partes.append(f"Memória {self._formatar_efeito(efeito['memory_used'], 1024**2, 'MB')}")
+            if 'disk_used' in efeito:
+                partes.append(f"Disco {self._formatar_efeito(efeito['disk_used'], 1024**2, 'MB')}")
+            self.logger.info(f"{nome}: {' | '.join(partes)}")
         self.logger.info("Recomendação: Reinicie o sistema para melhor desempenho.")
-
+        return plano
 
 if __name__ == "__main__":
     import argparse
@@ -1623,8 +2318,20 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Paguro Boost - Otimizador de Sistema')
     parser.add_argument('--cli', action='store_true', help='Executar em modo CLI (linha de comando)')
     parser.add_argument('--gui', action='store_true', help='Executar em modo GUI (interface gráfica)')
+    parser.add_argument('--simular', action='store_true',
+                        help='Apenas planejar a limpeza (nada é removido); com --plano, salva o plano')
+    parser.add_argument('--plano', metavar='ARQUIVO',
+                        help='Arquivo do plano de limpeza a salvar (--simular) ou a executar')
+    parser.add_argument('--liberar', metavar='GB', type=float,
+                        help='Liberar GB de espaço com os candidatos de menor custo (com --simular, só planeja)')
+    parser.add_argument('--restaurar', metavar='LOTE', nargs='?', const='',
+                        help='Restaurar uma limpeza em quarentena (a mais recente, sem LOTE)')
     args = parser.parse_args()
     
+    # Planejamento e execução de plano são operações de linha de comando
+    if args.simular or args.plano or args.liberar or args.restaurar is not None:
+        args.cli, args.gui = True, False
+    
     # Se nenhum argumento for especificado, usar GUI por padrão
     if not args.cli and not args.gui:
         args.gui = True
@@ -1644,7 +2351,21 @@ if __name__ == "__main__":
     if args.cli:
         try:
             optimizer = SystemOptimizer()
-            optimizer.executar_otimizacao_completa()
+            if args.restaurar is not None:
+                optimizer.restaurar_quarentena(args.restaurar or None)
+            elif args.liberar:
+                plano = optimizer.liberar_espaco(args.liberar, simular=args.simular)['plano']
+                if args.simular and args.plano:
+                    plano.save(args.plano)
+                    print(f"Plano salvo em {args.plano}")
+            elif args.simular:
+                plano = optimizer.executar_otimizacao_completa(simular=True)
+                if args.plano:
+                    plano.save(args.plano)
+                    print(f"Plano salvo em {args.plano}")
+            else:
+                plano = CleanupPlan.load(args.plano) if args.plano else None
+                optimizer.executar_otimizacao_completa(plano=plano)
         except KeyboardInterrupt:
             print("\nOperação cancelada pelo usuário.")
             sys.exit(1)
@@ -0,0 +1,196 @@
+"""
+Catálogo de diretórios de cache para o Paguro Boost
+
+Em vez de apagar ~/.cache inteiro (o que torna os próximos builds e a
+navegação lentos), cada cache conhecido — subdiretórios XDG, pip, npm/yarn,
+cargo, cache de build do Go, thumbnails, perfis de navegadores e IDEs — é
+medido pelo ScanIndex e podado até um limite de tamanho próprio, removendo
+primeiro as entradas usadas há mais tempo (LRU por atime/mtime). A parte
+quente de cada cache é preservada.
+"""
+
+import glob
+import os
+import platform
+import time
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+from .cleanup import CleanupEngine, CleanupRule, PlanItem, PlannedFile
+
+
+class CacheLocation(NamedTuple):
+    """Diretório de cache de uma aplicação."""
+    name: str
+    path: str
+    kind: str   # chave do limite de tamanho (ex.: 'pip', 'browser', 'xdg')
+
+
+def _env_path(environ: Mapping[str, str], name: str, default: str) -> str:
+    value = environ.get(name)
+    return os.path.expanduser(value) if value else default
+
+
+def known_caches(home: Optional[str] = None, environ: Optional[Mapping[str, str]] = None,
+                 windows: Optional[bool] = None) -> List[CacheLocation]:
+    """Caches conhecidos existentes; subdiretórios XDG restantes entram como 'xdg'."""
+    home = home or os.path.expanduser('~')
+    environ = os.environ if environ is None else environ
+    windows = platform.system() == 'Windows' if windows is None else windows
+
+    if windows:
+        local = environ.get('LOCALAPPDATA', os.path.join(home, 'AppData', 'Local'))
+        xdg = None
+        candidates = [
+            ('pip', _env_path(environ, 'PIP_CACHE_DIR', os.path.join(local, 'pip', 'Cache')), 'pip'),
+            ('npm', os.path.join(_env_path(environ, 'npm_config_cache', os.path.join(local, 'npm-cache')),
+                                 '_cacache'), 'npm'),
+            ('yarn', _env_path(environ, 'YARN_CACHE_FOLDER', os.path.join(local, 'Yarn', 'Cache')), 'yarn'),
+            ('go-build', _env_path(environ, 'GOCACHE', os.path.join(local, 'go-build')), 'go-build'),
+        ]
+        browsers = [
+            ('chrome', os.path.join(local, 'Google', 'Chrome', 'User Data', '*', 'Cache')),
+            ('edge', os.path.join(local, 'Microsoft', 'Edge', 'User Data', '*', 'Cache')),
+            ('firefox', os.path.join(local, 'Mozilla', 'Firefox', 'Profiles', '*', 'cache2')),
+        ]
+    else:
+        xdg = _env_path(environ, 'XDG_CACHE_HOME', os.path.join(home, '.cache'))
+        candidates = [
+            ('pip', _env_path(environ, 'PIP_CACHE_DIR', os.path.join(xdg, 'pip')), 'pip'),
+            ('npm', os.path.join(_env_path(environ, 'npm_config_cache', os.path.join(home, '.npm')),
+                                 '_cacache'), 'npm'),
+            ('yarn', _env_path(environ, 'YARN_CACHE_FOLDER', os.path.join(xdg, 'yarn')), 'yarn'),
+            ('yarn-berry', os.path.join(home, '.yarn', 'berry', 'cache'), 'yarn'),
+            ('go-build', _env_path(environ, 'GOCACHE', os.path.join(xdg, 'go-build')), 'go-build'),
+            ('thumbnails', os.path.join(xdg, 'thumbnails'), 'thumbnails'),
+            ('thumbnails-legado', os.path.join(home, '.thumbnails'), 'thumbnails'),
+            ('jetbrains', os.path.join(xdg, 'JetBrains'), 'ide'),
+        ]
+        browsers = [
+            ('firefox', os.path.join(xdg, 'mozilla', 'firefox', '*', 'cache2')),
+            ('chrome', os.path.join(xdg, 'google-chrome', '*', 'Cache')),
+            ('chromium', os.path.join(xdg, 'chromium', '*', 'Cache')),
+        ]
+    cargo = _env_path(environ, 'CARGO_HOME', os.path.join(home, '.cargo'))
+    candidates.append(('cargo', os.path.join(cargo, 'registry', 'cache'), 'cargo'))
+
+    for browser, pattern in browsers:
+        for path in sorted(glob.glob(pattern)):
+            profile = os.path.basename(os.path.dirname(path))
+            candidates.append((f'{browser}:{profile}', path, 'browser'))
+
+    locations = [CacheLocation(name, os.path.abspath(path), kind)
+                 for name, path, kind in candidates if os.path.isdir(path)]
+
+    # Demais subdiretórios do cache XDG, exceto os que contêm um cache já catalogado
+    if xdg and os.path.isdir(xdg):
+        known = [loc.path for loc in locations]
+        try:
+            names = sorted(os.listdir(xdg))
+        except OSError:
+            names = []
+        for name in names:
+            path = os.path.join(xdg, name)
+            if not os.path.isdir(path) or os.path.islink(path):
+                continue
+            if any(k == path or k.startswith(path + os.sep) for k in known):
+                continue
+            locations.append(CacheLocation(f'xdg:{name}', path, 'xdg'))
+    return locations
+
+
+class CacheCatalog:
+    """Tamanho de cada cache pelo índice e poda LRU até o limite configurado."""
+
+    def __init__(self, index, locations: Optional[Iterable[CacheLocation]] = None,
+                 caps: Optional[Mapping[str, Optional[int]]] = None):
+        self.index = index
+        self.locations = list(locations) if locations is not None else known_caches()
+        self.caps = dict(caps or {})
+
+    def cap_for(self, location: CacheLocation) -> Optional[int]:
+        """Limite em bytes (None = sem poda): por nome, por tipo ou 'default'."""
+        for key in (location.name, location.kind, 'default'):
+            if key in self.caps:
+                return self.caps[key]
+        return None
+
+    def sizes(self) -> List[Dict]:
+        """Tamanho aparente/alocado, arquivos, último uso e excesso de cada cache, do maior ao menor."""
+        report = []
+        for location in self.locations:
+            totals = self.index.subtree_totals(location.path)
+            files = self.index.files_under(location.path)
+            cap = self.cap_for(location)
+            report.append({
+                'name': location.name,
+                'path': location.path,
+                'kind': location.kind,
+                'size': totals['size'],
+                'allocated': totals['allocated'],
+                'files': totals['files'],
+                'last_used': max((max(f.mtime, f.atime) for f in files), default=None),
+                'cap': cap,
+                'excess': max(0, totals['allocated'] - cap) if cap is not None else 0,
+            })
+        report.sort(key=lambda r: r['allocated'], reverse=True)
+        return report
+
+    @staticmethod
+    def _live(files: List[PlannedFile]) -> List[PlannedFile]:
+        """
+        Candidatos com o atime atual: o índice reaproveita diretórios
+        inalterados e o atime guardado envelhece. Arquivos alterados ou
+        removidos desde a varredura saem da lista.
+        """
+        live = []
+        for planned in files:
+            try:
+                st = os.lstat(planned.path)
+            except OSError:
+                continue
+            if st.st_mtime == planned.mtime and st.st_size == planned.size:
+                live.append(planned._replace(atime=st.st_atime))
+        return live
+
+    def prune_items(self, engine: CleanupEngine, seen: Optional[set] = None,
+                    now: Optional[float] = None) -> List[PlanItem]:
+        """
+        Itens de plano que trazem cada cache de volta ao limite.
+
+        Os candidatos passam pelos filtros do motor (exclusões, tamanho
+        máximo, mesmo dispositivo) e são removidos do menos para o mais
+        recentemente usado (atime e mtime atuais) até o excesso acabar. A
+        regra de cada item só aceita arquivos sem uso desde o mais recente
+        escolhido, então o que for usado antes da execução é mantido.
+        """
+        now = now if now is not None else time.time()
+        seen = seen if seen is not None else set()
+        items = []
+        for location in self.locations:
+            cap = self.cap_for(location)
+            if cap is None:
+                continue
+            excess = self.index.subtree_totals(location.path)['allocated'] - cap
+            if excess <= 0:
+                continue
+            rule = CleanupRule(f'Cache {location.name}', location.path, remove_empty_dirs=True)
+            candidates = engine.plan_rule(rule, self.index, seen)
+            live = self._live(candidates.files)
+            live.sort(key=lambda f: max(f.mtime, f.atime))
+            chosen = []
+            for planned in live:
+                if excess <= 0:
+                    break
+                chosen.append(planned)
+                excess -= planned.reclaimable
+            # Os não escolhidos continuam disponíveis para outras regras do plano
+            seen.difference_update(f.path for f in candidates.files)
+            seen.update(f.path for f in chosen)
+            if chosen:
+                # Corte de recência: usado depois do mais recente escolhido, fica
+                newest = max(max(f.mtime, f.atime) for f in chosen)
+                rule = rule._replace(min_age_days=max(0.0, now - newest - 1) / 86400, age_field='atime')
+                per_file = candidates.estimated_seconds / len(candidates.files)
+                items.append(PlanItem(rule, sorted(chosen), candidates.skipped,
+                                      estimated_seconds=len(chosen) * per_file))
+        return items
@@ -0,0 +1,159 @@
+"""
+Contabilização e recuperação de memória por cgroup v2 para o Paguro Boost
+
+Em hosts systemd e containers a memória pertence a cgroups; este módulo
+lê memory.current / memory.stat / memory.pressure de cada slice/serviço e
+permite recuperação direcionada via memory.reclaim.
+"""
+
+import errno
+import os
+from typing import Dict, List, Optional
+
+from .metrics import parse_pressure
+
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+
+# Campos de memory.stat reportados
+_STAT_FIELDS = ('anon', 'file', 'slab', 'slab_reclaimable', 'slab_unreclaimable', 'shmem')
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, 'r') as f:
+            return f.read()
+    except (OSError, IOError):
+        return None
+
+
+def find_cgroup2_root() -> Optional[str]:
+    """Localiza o ponto de montagem da hierarquia cgroup v2 (unificada ou híbrida)."""
+    if os.path.exists(os.path.join(CGROUP_ROOT, 'cgroup.controllers')):
+        return CGROUP_ROOT
+    mountinfo = _read_text('/proc/self/mountinfo') or ''
+    for line in mountinfo.splitlines():
+        # ... <mount point> <opções> - <fstype> <origem> <opções>
+        pre, _, post = line.partition(' - ')
+        if post.split(' ', 1)[0] == 'cgroup2':
+            return pre.split()[4]
+    return None
+
+
+def read_memory_stat(path: str) -> Dict[str, int]:
+    """Lê os campos anon/file/slab de memory.stat."""
+    stats = {}
+    text = _read_text(os.path.join(path, 'memory.stat'))
+    if text:
+        for line in text.splitlines():
+            key, _, value = line.partition(' ')
+            if key in _STAT_FIELDS:
+                stats[key] = int(value)
+    if 'slab' not in stats and ('slab_reclaimable' in stats or 'slab_unreclaimable' in stats):
+        stats['slab'] = stats.get('slab_reclaimable', 0) + stats.get('slab_unreclaimable', 0)
+    return stats
+
+
+def read_cgroup(path: str, root: str) -> Optional[Dict]:
+    """Lê a contabilização de memória de um cgroup; None se o controlador memory não estiver ativo."""
+    current = _read_text(os.path.join(path, 'memory.current'))
+    if current is None:
+        return None
+    stats = read_memory_stat(path)
+    pressure_text = _read_text(os.path.join(path, 'memory.pressure'))
+    maximum = (_read_text(os.path.join(path, 'memory.max')) or 'max').strip()
+    relative = os.path.relpath(path, root)
+    return {
+        'path': path,
+        'name': '/' if relative == '.' else relative,
+        'current': int(current),
+        'max': None if maximum == 'max' else int(maximum),
+        'anon': stats.get('anon', 0),
+        'file': stats.get('file', 0),
+        'slab': stats.get('slab', 0),
+        'shmem': stats.get('shmem', 0),
+        'pressure': parse_pressure(pressure_text) if pressure_text else {},
+    }
+
+
+def sweep_cgroups(root: Optional[str] = None, max_depth: int = 4,
+                  min_bytes: int = 0) -> List[Dict]:
+    """
+    Percorre a hierarquia cgroup v2 e reporta memória por slice/serviço.
+
+    Lê apenas memory.current, memory.stat, memory.max e memory.pressure de
+    cada cgroup (arquivos virtuais pequenos), então é barato o suficiente
+    para rodar a cada tick do monitor.
+    """
+    if root is None:
+        root = find_cgroup2_root()
+    if not root:
+        return []
+
+    result = []
+    stack = [(root, 0)]
+    while stack:
+        path, depth = stack.pop()
+        info = read_cgroup(path, root)
+        if info is not None and info['current'] >= min_bytes:
+            info['depth'] = depth
+            result.append(info)
+        if depth >= max_depth:
+            continue
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry.path, depth + 1))
+        except OSError:
+            continue
+
+    result.sort(key=lambda c: c['current'], reverse=True)
+    return result
+
+
+def resolve_cgroup(name: str, root: Optional[str] = None) -> Optional[str]:
+    """Converte o nome relativo de um cgroup em caminho absoluto dentro da hierarquia."""
+    if root is None:
+        root = find_cgroup2_root()
+    if not root:
+        return None
+    path = os.path.realpath(os.path.join(root, name.lstrip('/')))
+    real_root = os.path.realpath(root)
+    if path != real_root and not path.startswith(real_root + os.sep):
+        return None
+    return path if os.path.isdir(path) else None
+
+
+def reclaim(name: str, target_bytes: int, root: Optional[str] = None) -> Dict:
+    """
+    Solicita ao kernel a recuperação de target_bytes do cgroup via memory.reclaim.
+
+    O kernel devolve EAGAIN quando não consegue recuperar toda a meta; nesse
+    caso o resultado parcial (medido por memory.current) é reportado.
+    """
+    path = resolve_cgroup(name, root)
+    if path is None:
+        raise FileNotFoundError(errno.ENOENT, 'cgroup não encontrado', name)
+
+    before = int(_read_text(os.path.join(path, 'memory.current')) or 0)
+    complete = True
+    fd = os.open(os.path.join(path, 'memory.reclaim'), os.O_WRONLY)
+    try:
+        os.write(fd, str(int(target_bytes)).encode())
+    except OSError as e:
+        if e.errno != errno.EAGAIN:
+            raise
+        complete = False
+    finally:
+        os.close(fd)
+    after = int(_read_text(os.path.join(path, 'memory.current')) or 0)
+
+    return {
+        'name': name,
+        'target': int(target_bytes),
+        'before': before,
+        'after': after,
+        'reclaimed': max(0, before - after),
+        'complete': complete,
+    }
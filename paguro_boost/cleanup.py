@@ -0,0 +1,798 @@
+"""
+Motor de limpeza nativo para o Paguro Boost
+
+Substitui os comandos rm -rf / find -delete por regras declarativas
+(diretório, padrões de nome, idade mínima, faixa de tamanho) executadas em
+Python: os.scandir sobre descritores de diretório e os.unlink(nome,
+dir_fd=...) no estilo unlinkat, em paralelo (uma tarefa por diretório).
+
+Cada diretório é aberto com O_NOFOLLOW relativo ao pai, então um link
+simbólico trocado durante a limpeza nunca leva a remoção para fora da
+árvore. Só arquivos regulares e links simbólicos são removidos; a limpeza
+não atravessa outros sistemas de arquivos nem diretórios excluídos e
+respeita o tamanho máximo de arquivo. Cada regra informa arquivos e bytes
+liberados, itens pulados e falhas.
+
+Um plano (CleanupPlan) avalia as regras contra o ScanIndex sem remover
+nada: lista os arquivos selecionados com o mtime e o tamanho vistos no
+índice e estima bytes e duração. Executado depois, o plano remove apenas
+esses arquivos, pulando os que foram modificados nesse intervalo ou que a
+regra, reaplicada ao estado atual (inclusive o atime), não seleciona mais.
+
+Com uma meta de bytes (plan_goal), as unidades candidatas (cada arquivo ou
+subdiretório direto da raiz de uma regra) são ordenadas por custo por byte
+liberado (classe de risco, custo de regeneração e uso recente) e escolhidas
+de forma gulosa até a meta ser atingida.
+
+Com uma Quarantine, os alvos são movidos (rename) em vez de apagados. Um
+diretório que a regra removeria por inteiro é movido de uma vez se não há
+exclusões abaixo dele e se, conferido no disco, todos os seus subdiretórios
+estão como no índice e no mesmo dispositivo e só contêm arquivos regulares
+(ou links) dentro do tamanho máximo; senão, é percorrido arquivo a arquivo.
+"""
+
+import errno
+import fnmatch
+import json
+import os
+import stat
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .disk_scanner import allocated_size
+from .mounts import PathTrie
+from .quarantine import QUARANTINE_DIRNAME
+
+
+# Falhas guardadas por regra (o total é sempre contado)
+MAX_REPORTED_ERRORS = 20
+
+# Descritores de diretório no estilo *at() (Linux, macOS); no Windows, caminhos
+_FD_SUPPORTED = (os.scandir in os.supports_fd and os.unlink in os.supports_dir_fd
+                 and os.open in os.supports_dir_fd and os.stat in os.supports_dir_fd)
+_DIR_FLAGS = (os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0) | getattr(os, 'O_NOFOLLOW', 0)
+              | getattr(os, 'O_CLOEXEC', 0))
+
+# Remoções por segundo assumidas na estimativa de duração de um plano
+PLAN_UNLINK_RATE = 5000.0
+
+# Peso de cada classe de risco no custo de remoção
+RISK_WEIGHTS = {'temporary': 1.0, 'cache': 2.0, 'log': 3.0, 'user': 10.0}
+# Dias sem uso em que o peso do uso recente cai à metade
+RECENCY_HALF_DAYS = 30.0
+# Custo fixo de cada arquivo, em bytes equivalentes (favorece arquivos grandes)
+FILE_OVERHEAD_BYTES = 64 * 1024
+
+# Diretório aberto: descritor (com dir_fd) ou caminho
+_Handle = Union[int, str]
+
+# Tarefas de diretório em execução ou na fila do pool, por trabalhador
+_TASKS_PER_WORKER = 2
+
+
+class _DirRef:
+    """Diretório aberto compartilhado: fechado quando a última referência é liberada."""
+
+    def __init__(self, handle: _Handle):
+        self.handle = handle
+        self._refs = 1
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            self._refs += 1
+
+    def release(self) -> None:
+        with self._lock:
+            self._refs -= 1
+            last = self._refs == 0
+        if last and isinstance(self.handle, int):
+            os.close(self.handle)
+
+
+class CleanupRule(NamedTuple):
+    """Regra declarativa de limpeza."""
+    name: str
+    path: str
+    patterns: Tuple[str, ...] = ('*',)   # fnmatch sobre o nome do arquivo
+    min_age_days: float = 0              # idade mínima pelo campo age_field
+    age_field: str = 'mtime'             # 'mtime' ou 'atime'
+    min_size: int = 0
+    max_size: Optional[int] = None
+    recursive: bool = True
+    remove_empty_dirs: bool = False      # remover subdiretórios que ficaram vazios
+    risk: str = 'cache'                  # classe de risco (RISK_WEIGHTS)
+    regeneration_cost: float = 1.0       # custo de recriar o conteúdo (0 = descartável)
+
+
+class RuleResult:
+    """Contabilidade de uma regra (atualizada pelas threads de trabalho)."""
+
+    def __init__(self, rule: CleanupRule):
+        self.rule = rule
+        self.files = 0
+        self.bytes = 0
+        self.freed = 0
+        self.directories = 0
+        self.skipped = 0
+        self.changed = 0
+        self.failures = 0
+        self.errors: List[Dict[str, str]] = []
+        self.elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def removed(self, st: os.stat_result) -> None:
+        with self._lock:
+            self.files += 1
+            self.bytes += st.st_size
+            # Blocos só são liberados quando era o último link
+            if st.st_nlink <= 1:
+                self.freed += allocated_size(st)
+
+    def skip(self) -> None:
+        with self._lock:
+            self.skipped += 1
+
+    def removed_tree(self, totals: Dict[str, int]) -> None:
+        with self._lock:
+            self.files += totals['files']
+            self.bytes += totals['size']
+            self.freed += totals['allocated']
+
+    def change(self) -> None:
+        with self._lock:
+            self.changed += 1
+
+    def fail(self, path: str, error: OSError) -> None:
+        with self._lock:
+            self.failures += 1
+            if len(self.errors) < MAX_REPORTED_ERRORS:
+                self.errors.append({'path': path, 'error': error.strerror or str(error)})
+
+    def as_dict(self) -> Dict:
+        return {
+            'rule': self.rule.name,
+            'path': self.rule.path,
+            'files': self.files,
+            'bytes': self.bytes,
+            'freed': self.freed,
+            'directories': self.directories,
+            'skipped': self.skipped,
+            'changed': self.changed,
+            'failures': self.failures,
+            'errors': list(self.errors),
+            'elapsed': self.elapsed,
+        }
+
+
+class PlannedFile(NamedTuple):
+    """Arquivo selecionado por um plano, com o estado visto no índice."""
+    path: str
+    size: int
+    allocated: int
+    mtime: float
+    nlink: int
+    atime: float = 0.0
+
+    @property
+    def reclaimable(self) -> int:
+        # Outros hardlinks mantêm os blocos ocupados
+        return self.allocated if self.nlink <= 1 else 0
+
+
+def removal_cost(rule: CleanupRule, files: List[PlannedFile], now: float) -> float:
+    """
+    Custo por byte liberado de remover um conjunto de arquivos (menor primeiro).
+
+    Combina a classe de risco e o custo de regeneração da regra com o uso
+    mais recente (mtime ou atime) do conjunto e um custo fixo por arquivo.
+    """
+    freed = sum(f.reclaimable for f in files)
+    if not freed:
+        return float('inf')
+    last_use = max(max(f.mtime, f.atime) for f in files)
+    idle_days = max(0.0, (now - last_use) / 86400)
+    recency = 1.0 / (1.0 + idle_days / RECENCY_HALF_DAYS)
+    weight = RISK_WEIGHTS.get(rule.risk, RISK_WEIGHTS['cache'])
+    return weight * (rule.regeneration_cost + recency) * (1.0 + FILE_OVERHEAD_BYTES * len(files) / freed)
+
+
+class PlanItem:
+    """Regra avaliada contra o índice; com command, a remoção é feita pelo comando."""
+
+    def __init__(self, rule: CleanupRule, files: List[PlannedFile], skipped: int = 0,
+                 command: Optional[str] = None, estimated_seconds: float = 0.0):
+        self.rule = rule
+        self.files = files
+        self.skipped = skipped
+        self.command = command
+        self.estimated_seconds = estimated_seconds
+
+    @property
+    def bytes(self) -> int:
+        return sum(f.size for f in self.files)
+
+    @property
+    def freed(self) -> int:
+        return sum(f.reclaimable for f in self.files)
+
+    def as_dict(self) -> Dict:
+        return {
+            'rule': self.rule.name,
+            'path': self.rule.path,
+            'command': self.command,
+            'files': len(self.files),
+            'bytes': self.bytes,
+            'freed': self.freed,
+            'skipped': self.skipped,
+            'estimated_seconds': self.estimated_seconds,
+        }
+
+
+class CleanupPlan:
+    """Plano de limpeza itemizado, que pode ser salvo e executado depois."""
+
+    def __init__(self, items: Optional[List[PlanItem]] = None, created: Optional[float] = None,
+                 goal: Optional[int] = None, shortfall: int = 0):
+        self.items = items or []
+        self.created = created if created is not None else time.time()
+        self.goal = goal            # meta de bytes (plan_goal)
+        self.shortfall = shortfall  # quanto faltou para a meta com os candidatos disponíveis
+
+    def summary(self) -> Dict:
+        items = [item.as_dict() for item in self.items]
+        return {
+            'created': self.created,
+            'goal': self.goal,
+            'shortfall': self.shortfall,
+            'items': items,
+            'files': sum(i['files'] for i in items),
+            'bytes': sum(i['bytes'] for i in items),
+            'freed': sum(i['freed'] for i in items),
+            'estimated_seconds': sum(i['estimated_seconds'] for i in items),
+        }
+
+    def save(self, path: str) -> None:
+        data = {'created': self.created, 'goal': self.goal, 'shortfall': self.shortfall, 'items': [{
+            'rule': item.rule._asdict(),
+            'files': [list(f) for f in item.files],
+            'skipped': item.skipped,
+            'command': item.command,
+            'estimated_seconds': item.estimated_seconds,
+        } for item in self.items]}
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'CleanupPlan':
+        with open(path) as f:
+            data = json.load(f)
+        items = []
+        for item in data['items']:
+            rule = dict(item['rule'], patterns=tuple(item['rule']['patterns']))
+            items.append(PlanItem(CleanupRule(**rule), [PlannedFile(*f) for f in item['files']],
+                                  item['skipped'], item['command'], item['estimated_seconds']))
+        return cls(items, data['created'], data.get('goal'), data.get('shortfall', 0))
+
+
+class CleanupEngine:
+    """Executa regras de limpeza em paralelo, com as proteções de SAFETY_CONFIG."""
+
+    def __init__(self, max_workers: int = 4, exclusions: Optional[PathTrie] = None,
+                 max_file_size: Optional[int] = None, throttle=None, dry_run: bool = False,
+                 quarantine=None, index=None):
+        self.max_workers = max(1, max_workers)
+        self.exclusions = exclusions
+        self.max_file_size = max_file_size
+        self.throttle = throttle
+        self.dry_run = dry_run
+        self.quarantine = quarantine
+        self.index = index  # ScanIndex: permite mover diretórios inteiros para a quarentena
+
+    # --- operações sobre diretórios (descritor ou caminho) ---
+
+    @staticmethod
+    def _open_child(parent: _Handle, name: str, path: str) -> _Handle:
+        if _FD_SUPPORTED:
+            return os.open(name, _DIR_FLAGS, dir_fd=parent)
+        return path
+
+    @staticmethod
+    def _close(handle: _Handle) -> None:
+        if isinstance(handle, int):
+            os.close(handle)
+
+    @staticmethod
+    def _unlink(parent: _Handle, name: str, path: str) -> None:
+        if isinstance(parent, int):
+            os.unlink(name, dir_fd=parent)
+        else:
+            os.unlink(path)
+
+    def _remove(self, parent: _Handle, name: str, path: str, st: os.stat_result,
+                area: Optional[str]) -> None:
+        if area is None:
+            self._unlink(parent, name, path)
+        else:
+            self.quarantine.move(parent, name, path, area, st.st_size,
+                                 allocated_size(st) if st.st_nlink <= 1 else 0)
+
+    @staticmethod
+    def _takes_everything(rule: CleanupRule) -> bool:
+        return (tuple(rule.patterns) == ('*',) and not rule.min_age_days and not rule.min_size
+                and rule.max_size is None and rule.recursive)
+
+    def _whole_tree(self, rule: CleanupRule, path: str, st: os.stat_result) -> Optional[Dict[str, int]]:
+        """
+        Totais do diretório (pelo índice) se ele pode ir inteiro para a quarentena.
+
+        Exige regra sem filtros, nenhuma exclusão sob o diretório e uma
+        subárvore que, conferida no disco, é a que está no índice e passaria
+        inteira pelas regras arquivo a arquivo.
+        """
+        if self.index is None or not self._takes_everything(rule):
+            return None
+        if self.exclusions and self.exclusions.intersects(path):
+            return None
+        indexed = self.index.subtree_directories(path)
+        if indexed.get(path) != st.st_mtime_ns or not self._tree_matches_index(path, st.st_dev, indexed):
+            return None
+        return self.index.subtree_totals(path)
+
+    def _tree_matches_index(self, path: str, dev: int, indexed: Dict[str, int]) -> bool:
+        """
+        Percorre a subárvore no disco: cada subdiretório com o mtime do índice
+        (nada criado ou removido desde a varredura) e no mesmo dispositivo, e
+        só arquivos regulares e links, dentro do tamanho máximo. Sockets,
+        FIFOs e dispositivos, que o índice não guarda, nunca são movidos.
+        """
+        stack = [path]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_symlink():
+                            continue
+                        if entry.is_dir(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            if entry.name == QUARANTINE_DIRNAME or st.st_dev != dev or \
+                                    indexed.get(entry.path) != st.st_mtime_ns:
+                                return False
+                            stack.append(entry.path)
+                        elif not entry.is_file(follow_symlinks=False):
+                            return False
+                        elif self.max_file_size is not None and \
+                                entry.stat(follow_symlinks=False).st_size > self.max_file_size:
+                            return False
+            except OSError:
+                return False
+        return True
+
+    @staticmethod
+    def _matches(rule: CleanupRule, name: str, size: int, timestamp: float, cutoff: float) -> bool:
+        if not any(fnmatch.fnmatch(name, pattern) for pattern in rule.patterns):
+            return False
+        if rule.min_age_days and timestamp >= cutoff:
+            return False
+        if size < rule.min_size or (rule.max_size is not None and size > rule.max_size):
+            return False
+        return True
+
+    @staticmethod
+    def _root(rule: CleanupRule) -> str:
+        return os.path.abspath(os.path.expanduser(os.path.expandvars(rule.path)))
+
+    def _process_child(self, rule: CleanupRule, result: RuleResult, parent: _DirRef, name: str,
+                       path: str, root_dev: int, cutoff: float,
+                       area: Optional[str] = None) -> List[Tuple[_DirRef, str, str]]:
+        """Abre o subdiretório a partir do pai (liberando a referência ao pai) e o limpa."""
+        try:
+            handle = self._open_child(parent.handle, name, path)
+        except OSError as e:
+            result.fail(path, e)
+            return []
+        finally:
+            parent.release()
+        return self._process(rule, result, _DirRef(handle), path, root_dev, cutoff, area)
+
+    def _process(self, rule: CleanupRule, result: RuleResult, directory: _DirRef, path: str,
+                 root_dev: int, cutoff: float, area: Optional[str] = None) -> List[Tuple[_DirRef, str, str]]:
+        """
+        Limpa um diretório; retorna os subdiretórios a percorrer.
+
+        Os subdiretórios não são abertos aqui: cada um guarda uma referência
+        ao diretório pai e é aberto pela própria tarefa, então só ficam
+        abertos os diretórios com filhos ainda pendentes.
+        """
+        handle = directory.handle
+        children: List[Tuple[_DirRef, str, str]] = []
+        try:
+            try:
+                with os.scandir(handle) as it:
+                    entries = list(it)
+            except OSError as e:
+                result.fail(path, e)
+                return children
+
+            for entry in entries:
+                full = os.path.join(path, entry.name)
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError as e:
+                    result.fail(full, e)
+                    continue
+
+                if stat.S_ISDIR(st.st_mode):
+                    if not rule.recursive or st.st_dev != root_dev or entry.name == QUARANTINE_DIRNAME or \
+                            (self.exclusions and self.exclusions.contains(full)):
+                        continue
+                    totals = self._whole_tree(rule, full, st) if self.quarantine is not None else None
+                    if totals is not None:
+                        if self.throttle is not None:
+                            self.throttle.wait(ops=1)
+                        try:
+                            if area is not None:
+                                self.quarantine.move(handle, entry.name, full, area,
+                                                     totals['size'], totals['allocated'])
+                            result.removed_tree(totals)
+                            continue
+                        except OSError:
+                            pass  # ex.: ponto de montagem abaixo; percorrer arquivo a arquivo
+                    directory.acquire()
+                    children.append((directory, entry.name, full))
+                    continue
+
+                # Sockets, FIFOs e dispositivos nunca são removidos
+                if not (stat.S_ISREG(st.st_mode) or stat.S_ISLNK(st.st_mode)):
+                    continue
+                if not self._matches(rule, entry.name, st.st_size,
+                                     getattr(st, 'st_' + rule.age_field), cutoff):
+                    continue
+                if self.max_file_size is not None and st.st_size > self.max_file_size:
+                    result.skip()
+                    continue
+                if self.throttle is not None:
+                    self.throttle.wait(ops=1)
+                if self.dry_run:
+                    result.removed(st)
+                    continue
+                try:
+                    self._remove(handle, entry.name, full, st, area)
+                    result.removed(st)
+                except FileNotFoundError:
+                    continue
+                except OSError as e:
+                    result.fail(full, e)
+        except BaseException:
+            # Cancelado no meio do diretório: os subdiretórios não serão percorridos
+            for parent, _, _ in children:
+                parent.release()
+            raise
+        finally:
+            directory.release()
+        return children
+
+    @staticmethod
+    def _release_children(future) -> None:
+        # Tarefa que terminou depois da interrupção: seus subdiretórios não serão percorridos
+        if not future.cancelled() and future.exception() is None:
+            for parent, _, _ in future.result():
+                parent.release()
+
+    def _remove_empty_dirs(self, result: RuleResult, directories: List[str]) -> None:
+        for path in sorted(directories, key=lambda p: p.count(os.sep), reverse=True):
+            if self.dry_run:
+                continue
+            try:
+                os.rmdir(path)
+                result.directories += 1
+            except OSError as e:
+                if e.errno not in (errno.ENOTEMPTY, errno.EEXIST, errno.ENOENT):
+                    result.fail(path, e)
+
+    def run_rule(self, rule: CleanupRule, pool: ThreadPoolExecutor) -> RuleResult:
+        result = RuleResult(rule)
+        start = time.monotonic()
+        root = self._root(rule)
+        if self.exclusions and self.exclusions.contains(root):
+            result.skip()
+            return result
+        try:
+            root_st = os.stat(root)
+            if not stat.S_ISDIR(root_st.st_mode):
+                return result
+            # A raiz da regra pode ser um link (ex.: ~/.cache); abaixo dela, nunca
+            handle: _Handle = os.open(root, _DIR_FLAGS & ~getattr(os, 'O_NOFOLLOW', 0)) \
+                if _FD_SUPPORTED else root
+        except FileNotFoundError:
+            return result
+        except OSError as e:
+            result.fail(root, e)
+            return result
+
+        try:
+            area = self.quarantine.area_for(root) if self.quarantine is not None and not self.dry_run else None
+        except OSError as e:
+            self._close(handle)
+            result.fail(root, e)
+            return result
+        cutoff = time.time() - rule.min_age_days * 86400
+        visited: List[str] = []
+        root_ref = _DirRef(handle)
+        tasks = {pool.submit(self._process, rule, result, root_ref, root, root_st.st_dev, cutoff, area): root_ref}
+        # Pilha de subdiretórios pendentes (pai, nome, caminho): em profundidade, os
+        # pais abertos ficam limitados à profundidade da árvore, não à largura
+        pending: List[Tuple[_DirRef, str, str]] = []
+        limit = self.max_workers * _TASKS_PER_WORKER
+        try:
+            while tasks or pending:
+                while pending and len(tasks) < limit:
+                    parent, name, path = pending.pop()
+                    tasks[pool.submit(self._process_child, rule, result, parent, name, path,
+                                      root_st.st_dev, cutoff, area)] = parent
+                done, _ = wait(tasks, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del tasks[future]
+                    for child in future.result():
+                        visited.append(child[2])
+                        pending.append(child)
+        finally:
+            # Interrupção: liberar as referências de tarefas que não chegaram a rodar
+            for future, ref in tasks.items():
+                if future.cancel():
+                    ref.release()
+                else:
+                    future.add_done_callback(self._release_children)
+            for parent, _, _ in pending:
+                parent.release()
+        if rule.remove_empty_dirs:
+            self._remove_empty_dirs(result, visited)
+        result.elapsed = time.monotonic() - start
+        return result
+
+    def run(self, rules: Iterable[CleanupRule]) -> List[Dict]:
+        """Executa as regras em sequência (cada uma em paralelo por diretório)."""
+        try:
+            with self._pool() as pool:
+                return [self.run_rule(rule, pool).as_dict() for rule in rules]
+        finally:
+            if self.quarantine is not None:
+                self.quarantine.flush()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        initializer = self.throttle.worker_init if self.throttle else None
+        return ThreadPoolExecutor(max_workers=self.max_workers, initializer=initializer)
+
+    # --- planejamento a partir do índice ---
+
+    def _unlink_rate(self) -> float:
+        rate = PLAN_UNLINK_RATE
+        if self.throttle is not None and self.throttle.ops is not None:
+            rate = min(rate, self.throttle.ops.rate)
+        return rate
+
+    def plan_rule(self, rule: CleanupRule, index, seen: Optional[set] = None,
+                  command: Optional[str] = None) -> PlanItem:
+        """Seleciona no índice os arquivos que a regra removeria (seen evita repetir arquivos)."""
+        seen = seen if seen is not None else set()
+        root = self._root(rule)
+        item = PlanItem(rule, [], command=command)
+        if self.exclusions and self.exclusions.contains(root):
+            return item
+        try:
+            root_dev = os.stat(root).st_dev
+        except OSError:
+            return item
+        cutoff = time.time() - rule.min_age_days * 86400
+        for entry in index.files_under(root):
+            if entry.path in seen or entry.dev != root_dev:
+                continue
+            if not rule.recursive and os.path.dirname(entry.path) != root:
+                continue
+            if self.exclusions and self.exclusions.contains(entry.path):
+                continue
+            atime = entry.atime
+            if rule.age_field == 'atime' and rule.min_age_days:
+                # O índice reaproveita diretórios inalterados: o atime guardado pode estar velho
+                try:
+                    atime = os.lstat(entry.path).st_atime
+                except OSError:
+                    continue
+            timestamp = atime if rule.age_field == 'atime' else entry.mtime
+            if not self._matches(rule, entry.name, entry.size, timestamp, cutoff):
+                continue
+            if self.max_file_size is not None and entry.size > self.max_file_size:
+                item.skipped += 1
+                continue
+            seen.add(entry.path)
+            item.files.append(PlannedFile(entry.path, entry.size, entry.allocated, entry.mtime,
+                                          entry.nlink, atime))
+        item.files.sort()
+        item.estimated_seconds = len(item.files) / self._unlink_rate()
+        return item
+
+    def plan(self, rules: Iterable[CleanupRule], index,
+             commands: Iterable[Tuple[CleanupRule, str]] = ()) -> CleanupPlan:
+        """Avalia regras (e comandos, estimados pela regra associada) sem remover nada."""
+        seen: set = set()
+        items = [self.plan_rule(rule, index, seen) for rule in rules]
+        items += [self.plan_rule(rule, index, seen, command) for rule, command in commands]
+        return CleanupPlan(items)
+
+    def plan_goal(self, rules: Iterable[CleanupRule], index, goal: int,
+                  now: Optional[float] = None) -> CleanupPlan:
+        """
+        Plano guloso que libera goal bytes com o menor custo.
+
+        Unidades (filhos diretos da raiz de cada regra) são tomadas em ordem
+        de custo por byte até a meta; na unidade que ultrapassaria a meta,
+        só entram os arquivos mais baratos necessários.
+        """
+        now = now if now is not None else time.time()
+        seen: set = set()
+        items = [self.plan_rule(rule, index, seen) for rule in rules]
+
+        candidates = []
+        for item in items:
+            root = self._root(item.rule)
+            units: Dict[str, List[PlannedFile]] = {}
+            for planned in item.files:
+                head = os.path.relpath(planned.path, root).split(os.sep, 1)[0]
+                units.setdefault(head, []).append(planned)
+            for files in units.values():
+                cost = removal_cost(item.rule, files, now)
+                if cost != float('inf'):
+                    candidates.append((cost, item, files))
+        candidates.sort(key=lambda c: c[0])
+
+        selected: Dict[int, List[PlannedFile]] = {id(item): [] for item in items}
+        remaining = goal
+        for _cost, item, files in candidates:
+            if remaining <= 0:
+                break
+            freed = sum(f.reclaimable for f in files)
+            if freed > remaining and len(files) > 1:
+                files = sorted(files, key=lambda f: removal_cost(item.rule, [f], now))
+                chosen = []
+                for planned in files:
+                    if remaining <= 0:
+                        break
+                    if planned.reclaimable:
+                        chosen.append(planned)
+                        remaining -= planned.reclaimable
+                files = chosen
+            else:
+                remaining -= freed
+            selected[id(item)].extend(files)
+
+        rate = self._unlink_rate()
+        plan_items = []
+        for item in items:
+            files = sorted(selected[id(item)])
+            if files:
+                plan_items.append(PlanItem(item.rule, files, item.skipped,
+                                           estimated_seconds=len(files) / rate))
+        return CleanupPlan(plan_items, goal=goal, shortfall=max(remaining, 0))
+
+    # --- execução de um plano ---
+
+    def _open_planned_dir(self, root: str, directory: str) -> _Handle:
+        """Abre directory a partir da raiz da regra, componente a componente, sem seguir links."""
+        if not _FD_SUPPORTED:
+            return directory
+        fd = os.open(root, _DIR_FLAGS & ~getattr(os, 'O_NOFOLLOW', 0))
+        try:
+            relative = os.path.relpath(directory, root)
+            for part in ([] if relative == os.curdir else relative.split(os.sep)):
+                if part in ('', os.curdir, os.pardir):
+                    raise OSError(errno.EINVAL, 'fora da raiz da regra', directory)
+                child = os.open(part, _DIR_FLAGS, dir_fd=fd)
+                os.close(fd)
+                fd = child
+        except BaseException:
+            os.close(fd)
+            raise
+        return fd
+
+    def _execute_directory(self, result: RuleResult, root: str, directory: str,
+                           files: List[PlannedFile], cutoff: float, area: Optional[str] = None) -> None:
+        rule = result.rule
+        try:
+            handle = self._open_planned_dir(root, directory)
+        except FileNotFoundError:
+            for _ in files:
+                result.change()
+            return
+        except OSError as e:
+            result.fail(directory, e)
+            return
+        try:
+            for planned in files:
+                name = os.path.basename(planned.path)
+                try:
+                    if isinstance(handle, int):
+                        st = os.stat(name, dir_fd=handle, follow_symlinks=False)
+                    else:
+                        st = os.lstat(planned.path)
+                except FileNotFoundError:
+                    result.change()
+                    continue
+                except OSError as e:
+                    result.fail(planned.path, e)
+                    continue
+                # Mesmas salvaguardas de run_rule: o plano salvo pode ser antigo ou adulterado
+                if (self.exclusions and self.exclusions.contains(planned.path)) or \
+                        (self.max_file_size is not None and st.st_size > self.max_file_size):
+                    result.skip()
+                    continue
+                # Modificado (ou trocado) desde o plano, ou não mais selecionado
+                # pela regra (ex.: lido de novo, com age_field='atime'): fica
+                if not (stat.S_ISREG(st.st_mode) or stat.S_ISLNK(st.st_mode)) or \
+                        st.st_mtime != planned.mtime or st.st_size != planned.size or \
+                        not self._matches(rule, name, st.st_size, getattr(st, 'st_' + rule.age_field), cutoff):
+                    result.change()
+                    continue
+                if self.throttle is not None:
+                    self.throttle.wait(ops=1)
+                if self.dry_run:
+                    result.removed(st)
+                    continue
+                try:
+                    self._remove(handle, name, planned.path, st, area)
+                    result.removed(st)
+                except FileNotFoundError:
+                    result.change()
+                except OSError as e:
+                    result.fail(planned.path, e)
+        finally:
+            self._close(handle)
+
+    def execute_item(self, item: PlanItem, pool: ThreadPoolExecutor) -> RuleResult:
+        result = RuleResult(item.rule)
+        start = time.monotonic()
+        root = self._root(item.rule)
+        by_directory: Dict[str, List[PlannedFile]] = {}
+        for planned in item.files:
+            # Só caminhos normalizados abaixo da raiz da regra (um plano salvo pode ter sido editado)
+            if os.path.normpath(planned.path) != planned.path or \
+                    not planned.path.startswith(root + os.sep) or \
+                    (not item.rule.recursive and os.path.dirname(planned.path) != root):
+                result.fail(planned.path, OSError(errno.EPERM, 'fora da raiz da regra', planned.path))
+                continue
+            by_directory.setdefault(os.path.dirname(planned.path), []).append(planned)
+        try:
+            area = self.quarantine.area_for(root) \
+                if self.quarantine is not None and not self.dry_run and item.files else None
+        except OSError as e:
+            result.fail(root, e)
+            return result
+        cutoff = time.time() - item.rule.min_age_days * 86400
+        futures = [pool.submit(self._execute_directory, result, root, directory, files, cutoff, area)
+                   for directory, files in by_directory.items()]
+        try:
+            for future in futures:
+                future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+        if item.rule.remove_empty_dirs:
+            # Diretórios que continham arquivos do plano e seus ancestrais até a raiz
+            directories = set()
+            for directory in by_directory:
+                while directory != root and directory.startswith(root + os.sep):
+                    directories.add(directory)
+                    directory = os.path.dirname(directory)
+            self._remove_empty_dirs(result, list(directories))
+        result.elapsed = time.monotonic() - start
+        return result
+
+    def execute(self, plan: CleanupPlan) -> List[Dict]:
+        """Remove os arquivos do plano (itens sem comando), pulando os modificados desde então."""
+        try:
+            with self._pool() as pool:
+                return [self.execute_item(item, pool).as_dict() for item in plan.items if item.command is None]
+        finally:
+            if self.quarantine is not None:
+                self.quarantine.flush()
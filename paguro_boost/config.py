@@ -38,6 +38,7 @@ for dir_path in [DEFAULT_LOG_DIR, DEFAULT_DATA_DIR, DEFAULT_CONFIG_DIR]:
 # File paths
 LOG_FILE = DEFAULT_LOG_DIR / "paguro_boost.log"
 METRICS_FILE = DEFAULT_DATA_DIR / "system_metrics.json"
+SCAN_INDEX_FILE = DEFAULT_DATA_DIR / "scan_index.db"
 CONFIG_FILE = DEFAULT_CONFIG_DIR / "settings.json"
 
 # GUI Configuration
@@ -67,6 +68,19 @@ OPTIMIZATION_CONFIG = {
         "optimize_working_sets": True,
         "clear_dns_cache": True,
         "analyze_processes": True,
+        # PSI: otimizar apenas quando tarefas ficam paradas por memória
+        "auto_optimize_on_pressure": True,
+        "pressure_threshold": 10.0,  # % do tempo com stall de memória (some)
+        "pressure_cooldown_seconds": 300,
+        # Page cache: liberar apenas arquivos frios ou grandes (nunca drop_caches global)
+        "page_cache_dirs": ["/var/log", "/var/cache", "/var/tmp", "/tmp",
+                            "~/.cache", "~/Downloads"],
+        "page_cache_cold_minutes": 60,
+        "page_cache_large_mb": 64,
+        "page_cache_min_mb": 1,
+        # cgroup v2: recuperação direcionada via memory.reclaim
+        # ex.: [{"cgroup": "system.slice/app.service", "bytes_mb": 256}]
+        "reclaim_cgroups": [],
     },
     "disk": {
         "clean_temp_files": True,
@@ -74,6 +88,53 @@ OPTIMIZATION_CONFIG = {
         "days_threshold": 30,
         "analyze_duplicates": True,
         "defragment_on_windows": False,  # Safe default
+        # Índice persistente: diretórios inalterados não são relidos
+        "use_scan_index": True,
+        # Fronteiras de montagem: não atravessar sistemas virtuais/de rede
+        "skip_pseudo_filesystems": True,
+        "skip_network_filesystems": True,
+        "one_filesystem": False,
+        # Rankings mantidos durante a varredura (heaps de tamanho fixo)
+        "top_files": 100,
+        "top_leaf_directories": 50,
+        # Faixas do histograma de idade (dias)
+        "age_buckets_days": [7, 30, 90, 365],
+        # Orçamento de tempo do estimador por amostragem (segundos)
+        "sample_time_budget_seconds": 2.0,
+        # Tempo máximo da análise de disco em segundo plano (None = sem limite)
+        "scan_timeout_seconds": None,
+        # Modo background: I/O idle e nice 19 (ou SCHED_IDLE) nas threads de trabalho
+        "background_mode": False,
+        "background_sched_idle": False,
+        "io_limit_bytes_per_second": None,
+        "io_limit_ops_per_second": None,
+        # Pausa enquanto o host estiver ocupado (carga por CPU e PSI de I/O 'some' avg10 %)
+        "pause_load_per_cpu": 1.5,
+        "pause_io_pressure": 20.0,
+        # inotify (Linux): manter o índice atualizado sem revarreduras completas
+        "live_index": False,
+        "watch_debounce_seconds": 2.0,
+        "watch_fraction": 0.5,  # fração de fs.inotify.max_user_watches
+        # Cache de hashes por (dev, inode, tamanho, mtime_ns), no banco do índice
+        "hash_cache": True,
+        "hash_cache_max_entries": 500000,
+        # Hash completo de arquivos grandes com O_DIRECT (sem passar pelo page cache)
+        "hash_direct_io": False,
+        # Deduplicação opt-in: None (apenas relatório), "hardlink", "reflink" ou "auto"
+        "dedup_mode": None,
+        # Limpeza com quarentena: mover (rename) em vez de apagar, com purga após a carência
+        "cleanup_quarantine": False,
+        "quarantine_grace_hours": 24,
+        # Limites (MB) da poda LRU de caches: por nome, tipo ou "default" (None = sem poda)
+        "cache_caps_mb": {
+            "pip": 1024, "npm": 1024, "yarn": 1024, "cargo": 2048, "go-build": 2048,
+            "thumbnails": 256, "browser": 512, "ide": 2048, "default": 512,
+        },
+        # Logs: compressão dos rotacionados ("gzip", "xz" ou None) e meta de espaço
+        # livre (%) que define o --vacuum-size do journal
+        "log_compression": "gzip",
+        "log_target_free_percent": 15,
+        "journal_min_mb": 64,
     },
     "startup": {
         "analyze_programs": True,
@@ -86,6 +147,10 @@ OPTIMIZATION_CONFIG = {
         "update_interval": 30,  # seconds
         "history_retention_days": 7,
         "max_samples": 1000,
+        # Medição antes/depois das otimizações (mediana + IC por bootstrap)
+        "measurement_samples": 5,
+        "measurement_interval": 0.5,  # seconds
+        "measurement_confidence": 0.95,
     },
 }
 
@@ -129,6 +194,7 @@ CONFIG: Dict[str, Any] = {
         "config_dir": str(DEFAULT_CONFIG_DIR),
         "log_file": str(LOG_FILE),
         "metrics_file": str(METRICS_FILE),
+        "scan_index_file": str(SCAN_INDEX_FILE),
         "config_file": str(CONFIG_FILE),
     },
     "system": {
@@ -0,0 +1,169 @@
+"""
+Estimativa de uso de disco por amostragem para o Paguro Boost
+
+Para visões interativas rápidas, em vez de percorrer a árvore inteira, faz
+descidas aleatórias da raiz até uma folha (estimador de Knuth): em cada
+diretório, um subdiretório é sorteado e o peso da sonda é multiplicado pelo
+número de subdiretórios. Os arquivos de cada diretório visitado contribuem
+com tamanho * peso, o que dá uma estimativa não enviesada do total da árvore.
+
+Sondas são repetidas até o orçamento de tempo acabar; a média das sondas é a
+estimativa e o erro padrão dá o intervalo de confiança. Listagens são
+reaproveitadas entre sondas (e do ScanIndex, quando o scanner tem um).
+A varredura completa continua disponível para números exatos.
+"""
+
+import math
+import os
+import random
+import time
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .disk_scanner import DiskScanner, minimal_roots
+
+
+# (extensão, tamanho) dos arquivos e subdiretórios a descer de um diretório
+_Listing = Tuple[List[Tuple[str, int]], List[str]]
+
+
+def z_score(confidence: float) -> float:
+    """
+    Quantil da normal padrão para um intervalo bilateral com a confiança dada
+    (bisseção sobre math.erf; statistics.NormalDist só existe a partir do 3.8).
+    """
+    if not 0 < confidence < 1:
+        raise ValueError(f"confiança deve estar entre 0 e 1: {confidence}")
+    low, high = 0.0, 40.0
+    for _ in range(100):
+        mid = (low + high) / 2
+        if math.erf(mid / math.sqrt(2)) < confidence:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+class _Accumulator:
+    """Somas e somas de quadrados por chave; chaves ausentes numa sonda valem zero."""
+
+    def __init__(self):
+        self.probes = 0
+        self._sums: Dict[Hashable, List[float]] = defaultdict(lambda: [0.0, 0.0])
+
+    def add(self, values: Dict[Hashable, float]) -> None:
+        self.probes += 1
+        for key, value in values.items():
+            acc = self._sums[key]
+            acc[0] += value
+            acc[1] += value * value
+
+    def keys(self) -> Iterable[Hashable]:
+        return self._sums.keys()
+
+    def interval(self, key: Hashable, z: float) -> Tuple[float, float, float]:
+        """(estimativa, limite inferior, limite superior) para a chave."""
+        n = self.probes
+        total, squares = self._sums.get(key, (0.0, 0.0))
+        mean = total / n if n else 0.0
+        if n < 2:
+            return mean, 0.0, math.inf if mean else 0.0
+        variance = max(0.0, (squares - total * total / n) / (n - 1))
+        margin = z * math.sqrt(variance / n)
+        return mean, max(0.0, mean - margin), mean + margin
+
+
+class DiskSampler:
+    """Estima bytes por extensão e por diretório com sondas aleatórias ponderadas."""
+
+    def __init__(self, scanner: Optional[DiskScanner] = None, time_budget: float = 2.0,
+                 confidence: float = 0.95, max_probes: int = 100000, seed: Optional[int] = None):
+        # O scanner fornece exclusões, montagens ignoradas e o índice
+        self.scanner = scanner or DiskScanner()
+        self.time_budget = time_budget
+        self.z = z_score(confidence)
+        self.max_probes = max_probes
+        self._random = random.Random(seed)
+        self._listings: Dict[str, Optional[_Listing]] = {}
+
+    def _listing(self, path: str) -> Optional[_Listing]:
+        if path in self._listings:
+            return self._listings[path]
+        try:
+            dev = os.lstat(path).st_dev
+        except OSError:
+            self._listings[path] = None
+            return None
+        entries = self.scanner._scan_directory(path, dev)[2]
+        files = [(os.path.splitext(e.name)[1].lower(), e.size) for e in entries if not e.is_dir]
+        subdirs = [e.path for e in entries if e.is_dir and not self.scanner._skip(e, dev)]
+        listing = self._listings[path] = (files, subdirs)
+        return listing
+
+    def _probe(self, roots: List[str]) -> Dict[Hashable, float]:
+        """Uma descida aleatória; retorna as contribuições ponderadas desta sonda."""
+        values: Dict[Hashable, float] = defaultdict(float)
+        weight = float(len(roots))
+        path = self._random.choice(roots)
+        owners = [path]
+        while True:
+            listing = self._listing(path)
+            if listing is None:
+                break
+            files, subdirs = listing
+            size = 0
+            for ext, file_size in files:
+                values[('ext_count', ext)] += weight
+                values[('ext_size', ext)] += weight * file_size
+                size += file_size
+            for owner in owners:
+                values[('dir', owner)] += weight * size
+            values['total'] += weight * size
+            if not subdirs:
+                break
+            weight *= len(subdirs)
+            path = self._random.choice(subdirs)
+            # Estimativas por diretório: cada raiz e seus filhos imediatos
+            if len(owners) == 1:
+                owners.append(path)
+        return values
+
+    def estimate(self, roots: Iterable[str]) -> Dict:
+        """
+        Estima o uso de disco sob as raízes dentro do orçamento de tempo.
+
+        Retorna {'total', 'extensions', 'directories', 'probes',
+        'directories_listed', 'elapsed'}; cada estimativa de bytes é
+        {'size', 'low', 'high'} com o intervalo de confiança configurado.
+        """
+        roots = [r for r in minimal_roots(roots) if os.path.isdir(r)]
+        acc = _Accumulator()
+        start = time.monotonic()
+        if roots:
+            while acc.probes < self.max_probes:
+                if self.scanner.token is not None:
+                    self.scanner.token.raise_if_cancelled()
+                acc.add(self._probe(roots))
+                if time.monotonic() - start >= self.time_budget:
+                    break
+        elapsed = time.monotonic() - start
+
+        def interval(key) -> Dict[str, float]:
+            size, low, high = acc.interval(key, self.z)
+            return {'size': size, 'low': low, 'high': high}
+
+        extensions = {}
+        directories = {}
+        for key in list(acc.keys()):
+            if isinstance(key, tuple) and key[0] == 'ext_size':
+                extensions[key[1]] = dict(interval(key), count=acc.interval(('ext_count', key[1]), self.z)[0])
+            elif isinstance(key, tuple) and key[0] == 'dir':
+                directories[key[1]] = interval(key)
+        return {
+            'total': interval('total'),
+            'extensions': dict(sorted(extensions.items(), key=lambda x: x[1]['size'], reverse=True)),
+            'directories': dict(sorted(directories.items(), key=lambda x: x[1]['size'], reverse=True)),
+            'probes': acc.probes,
+            'directories_listed': len(self._listings),
+            'elapsed': elapsed,
+        }
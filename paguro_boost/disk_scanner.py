@@ -0,0 +1,518 @@
+"""
+Varredura de disco em passada única para o Paguro Boost
+
+Um único percurso paralelo (os.scandir + pool de threads por diretório)
+produz um fluxo de entradas consumido por todas as análises de disco como
+estágios de um pipeline. Cada arquivo custa um único stat (DirEntry.stat).
+"""
+
+import heapq
+import os
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .exceptions import ScanCancelledError
+from .mounts import MountTable, PathTrie, is_rotational
+
+
+class ScanEntry(NamedTuple):
+    """Arquivo ou diretório encontrado pela varredura."""
+    path: str
+    name: str
+    is_dir: bool
+    size: int
+    mtime: float
+    atime: float
+    dev: int
+    ino: int
+    nlink: int
+    allocated: int  # bytes realmente alocados (st_blocks * 512)
+
+
+def allocated_size(st: os.stat_result) -> int:
+    """Espaço alocado em disco; sem st_blocks (Windows), o tamanho aparente."""
+    blocks = getattr(st, 'st_blocks', None)
+    return blocks * 512 if blocks is not None else st.st_size
+
+
+def _entry_from_stat(path: str, name: str, is_dir: bool, st: os.stat_result) -> ScanEntry:
+    if is_dir:
+        return ScanEntry(path, name, True, 0, st.st_mtime, st.st_atime,
+                         st.st_dev, st.st_ino, st.st_nlink, 0)
+    return ScanEntry(path, name, False, st.st_size, st.st_mtime, st.st_atime,
+                     st.st_dev, st.st_ino, st.st_nlink, allocated_size(st))
+
+
+class CancellationToken:
+    """Sinal de cancelamento cooperativo verificado pelos laços da varredura."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._event.is_set():
+            raise ScanCancelledError("varredura cancelada")
+
+
+class ScanProgress:
+    """Contadores da varredura em andamento (escritos só pela thread consumidora)."""
+
+    def __init__(self):
+        self.directories = 0
+        self.files = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        # Fase de hash dos candidatos a duplicados, depois da varredura
+        self.phase = 'scan'
+        self.hash_bytes = 0
+        self.hashed_bytes = 0
+        self.hash_started: Optional[float] = None
+
+    def start_hashing(self, nbytes: int) -> None:
+        """Entra (ou continua) na fase de hash, com mais nbytes a ler."""
+        if self.phase != 'hash':
+            self.phase = 'hash'
+            self.hash_started = time.monotonic()
+        self.hash_bytes += nbytes
+
+    def snapshot(self) -> Dict[str, float]:
+        now = time.monotonic()
+        elapsed = max(now - self.started, 1e-6)
+        return {
+            'directories': self.directories,
+            'files': self.files,
+            'bytes': self.bytes,
+            'elapsed': elapsed,
+            'files_per_second': self.files / elapsed,
+            'bytes_per_second': self.bytes / elapsed,
+            'phase': self.phase,
+            'hash_bytes': self.hash_bytes,
+            'hashed_bytes': self.hashed_bytes,
+            'hash_elapsed': now - self.hash_started if self.hash_started is not None else 0.0,
+        }
+
+
+def minimal_roots(paths: Iterable[str]) -> List[str]:
+    """Remove caminhos contidos em outros, para que nada seja percorrido duas vezes."""
+    roots: List[str] = []
+    for path in sorted({os.path.abspath(p) for p in paths}):
+        if not any(path == r or path.startswith(r.rstrip(os.sep) + os.sep) for r in roots):
+            roots.append(path)
+    return roots
+
+
+class DiskScanner:
+    """
+    Percorre árvores de diretórios em paralelo, um diretório por tarefa.
+
+    Com um índice (ScanIndex), diretórios com inode e mtime inalterados são
+    reaproveitados sem listagem; apenas os diretórios alterados são relidos.
+
+    Cada dispositivo (st_dev) tem seu próprio pool de workers; discos
+    rotacionais recebem um único worker para não competir por seeks.
+    Diretórios excluídos (PathTrie) e pontos de montagem em skip_mounts
+    (sistemas virtuais, de rede e bind mounts repetidos) não são percorridos;
+    com one_filesystem, nenhuma mudança de st_dev é atravessada.
+    """
+
+    def __init__(self, max_workers: int = 4, index=None, exclusions: Optional[PathTrie] = None,
+                 mounts: Optional[MountTable] = None, skip_pseudo: bool = True,
+                 skip_network: bool = True, one_filesystem: bool = False,
+                 token: Optional[CancellationToken] = None, progress: Optional[ScanProgress] = None,
+                 throttle=None):
+        self.max_workers = max(1, max_workers)
+        self.token = token
+        self.progress = progress
+        self.throttle = throttle
+        self.index = index
+        self.exclusions = exclusions
+        self.mounts = mounts
+        self.one_filesystem = one_filesystem
+        self.skip_mounts = mounts.skipped_mount_points(skip_pseudo, skip_network) if mounts else set()
+        self.stats = {'directories': 0, 'cached': 0, 'excluded': 0, 'skipped_mounts': 0, 'devices': 0}
+
+    @staticmethod
+    def _list_directory(path: str) -> Optional[Tuple[List[ScanEntry], List[str]]]:
+        """Lista um diretório (não recursivo) usando o stat em cache do DirEntry."""
+        entries: List[ScanEntry] = []
+        subdirs: List[str] = []
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            entries.append(_entry_from_stat(entry.path, entry.name, True,
+                                                            entry.stat(follow_symlinks=False)))
+                            subdirs.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            entries.append(_entry_from_stat(entry.path, entry.name, False,
+                                                            entry.stat(follow_symlinks=False)))
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return entries, subdirs
+
+    def _scan_directory(self, path: str, dev: int):
+        """Retorna (caminho, dispositivo, entradas, stat a gravar no índice ou None, veio do índice)."""
+        st = None
+        if self.token is not None and self.token.cancelled:
+            return path, dev, [], None, False
+        if self.index is not None:
+            try:
+                # stat antes da listagem: uma alteração durante a leitura invalida a entrada
+                st = os.lstat(path)
+            except OSError:
+                return path, dev, [], None, False
+            cached = self.index.lookup(path, st)
+            if cached is not None:
+                return path, dev, cached[0], None, True
+        if self.throttle is not None:
+            self.throttle.wait(ops=1)
+        listing = self._list_directory(path)
+        if listing is None:
+            return path, dev, [], None, False
+        if self.throttle is not None:
+            # Um stat por entrada listada
+            self.throttle.wait(ops=len(listing[0]))
+        return path, dev, listing[0], st, False
+
+    def _skip(self, entry: ScanEntry, parent_dev: Optional[int]) -> bool:
+        """Decide se um diretório não deve ser percorrido."""
+        if self.exclusions and self.exclusions.contains(entry.path):
+            self.stats['excluded'] += 1
+            return True
+        # Bind mounts podem manter o mesmo st_dev: consultar sempre a tabela
+        if entry.path in self.skip_mounts or \
+                (self.one_filesystem and parent_dev is not None and entry.dev != parent_dev):
+            self.stats['skipped_mounts'] += 1
+            return True
+        return False
+
+    def _pool_for(self, pools: Dict[int, ThreadPoolExecutor], dev: int) -> ThreadPoolExecutor:
+        pool = pools.get(dev)
+        if pool is None:
+            workers = 1 if self.mounts and is_rotational(dev) else self.max_workers
+            pool = pools[dev] = ThreadPoolExecutor(
+                max_workers=workers, initializer=self.throttle.worker_init if self.throttle else None)
+            self.stats['devices'] = len(pools)
+        return pool
+
+    def scan(self, roots: Iterable[str]) -> Iterator[ScanEntry]:
+        """Produz as entradas de todas as raízes; o consumo acontece na thread chamadora."""
+        roots = [r for r in minimal_roots(roots) if os.path.isdir(r)]
+        self.stats = {'directories': 0, 'cached': 0, 'excluded': 0, 'skipped_mounts': 0, 'devices': 0}
+        pools: Dict[int, ThreadPoolExecutor] = {}
+        pending = set()
+        try:
+            for root in roots:
+                try:
+                    entry = _entry_from_stat(root, os.path.basename(root) or root, True, os.lstat(root))
+                except OSError:
+                    continue
+                mount = self.mounts.mount_for(root) if self.mounts else None
+                if self._skip(entry, None) or (mount is not None and mount.mount_point in self.skip_mounts):
+                    continue
+                yield entry
+                pending.add(self._pool_for(pools, entry.dev).submit(self._scan_directory, root, entry.dev))
+
+            progress = self.progress
+            while pending:
+                # Espera limitada para que o cancelamento seja percebido mesmo em diretórios lentos
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                if self.token is not None:
+                    self.token.raise_if_cancelled()
+                for future in done:
+                    path, dev, entries, st, cached = future.result()
+                    self.stats['directories'] += 1
+                    self.stats['cached'] += cached
+                    if st is not None:
+                        self.index.store(path, st, entries)
+                    if progress is not None:
+                        progress.directories += 1
+                    for entry in entries:
+                        if entry.is_dir:
+                            if self._skip(entry, dev):
+                                continue
+                            pending.add(self._pool_for(pools, entry.dev).submit(
+                                self._scan_directory, entry.path, entry.dev))
+                        elif progress is not None:
+                            progress.files += 1
+                            progress.bytes += entry.size
+                        yield entry
+        finally:
+            # Consumidor interrompeu a varredura: descartar tarefas ainda não iniciadas
+            for future in pending:
+                future.cancel()
+            for pool in pools.values():
+                pool.shutdown(wait=True)
+            if self.index is not None:
+                self.index.commit()
+
+    def run(self, roots: Iterable[str], stages: Sequence['ScanStage']) -> Sequence['ScanStage']:
+        """Executa uma única varredura alimentando todos os estágios."""
+        for entry in self.scan(roots):
+            for stage in stages:
+                if stage.accepts(entry.path):
+                    stage.consume(entry)
+        return stages
+
+
+class ScanStage:
+    """Estágio de análise alimentado pelo fluxo de entradas da varredura."""
+
+    def __init__(self, scope: Optional[Iterable[str]] = None):
+        # Escopo: prefixos de caminho que o estágio considera (None = tudo)
+        self.scope = None
+        if scope is not None:
+            paths = [os.path.abspath(p).rstrip(os.sep) or os.sep for p in scope]
+            self.scope = (tuple(paths), tuple(p if p.endswith(os.sep) else p + os.sep for p in paths))
+
+    @property
+    def roots(self) -> List[str]:
+        """Diretórios que precisam ser percorridos para este estágio."""
+        return list(self.scope[0]) if self.scope else []
+
+    def accepts(self, path: str) -> bool:
+        if self.scope is None:
+            return True
+        exact, prefixes = self.scope
+        return path.startswith(prefixes) or path in exact
+
+    def consume(self, entry: ScanEntry) -> None:
+        raise NotImplementedError
+
+    def result(self):
+        raise NotImplementedError
+
+
+class DirectorySizeStage(ScanStage):
+    """
+    Soma o tamanho dos arquivos sob cada diretório do escopo.
+
+    Reporta o tamanho aparente (st_size) e o alocado (st_blocks * 512), que
+    reflete arquivos esparsos; arquivos com vários hardlinks contam uma vez.
+    """
+
+    def __init__(self, directories: Iterable[str]):
+        super().__init__(directories)
+        self.sizes: Dict[str, List[int]] = {d: [0, 0] for d in self.scope[0]}
+        self._prefixes = [(p, d) for d, p in zip(self.scope[0], self.scope[1])]
+        self._inodes = set()
+
+    def consume(self, entry: ScanEntry) -> None:
+        if entry.is_dir:
+            return
+        if entry.nlink > 1 and entry.ino:
+            key = (entry.dev, entry.ino)
+            if key in self._inodes:
+                return
+            self._inodes.add(key)
+        for prefix, directory in self._prefixes:
+            if entry.path.startswith(prefix):
+                sizes = self.sizes[directory]
+                sizes[0] += entry.size
+                sizes[1] += entry.allocated
+
+    def result(self) -> Dict[str, Dict[str, int]]:
+        return {d: {'apparent': a, 'allocated': b} for d, (a, b) in self.sizes.items()}
+
+
+class FileTypeStage(ScanStage):
+    """Distribuição de arquivos por extensão (quantidade e bytes)."""
+
+    def __init__(self, scope: Optional[Iterable[str]] = None):
+        super().__init__(scope)
+        self.types: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+
+    def consume(self, entry: ScanEntry) -> None:
+        if entry.is_dir:
+            return
+        ext = os.path.splitext(entry.name)[1].lower()
+        data = self.types[ext]
+        data[0] += 1
+        data[1] += entry.size
+
+    def result(self) -> Dict[str, Dict[str, int]]:
+        return {ext: {'count': c, 'size': s} for ext, (c, s) in self.types.items()}
+
+
+class OldFilesStage(ScanStage):
+    """Arquivos não modificados desde o corte, com amostra dos maiores."""
+
+    def __init__(self, cutoff: float, scope: Optional[Iterable[str]] = None, sample_size: int = 10):
+        super().__init__(scope)
+        self.cutoff = cutoff
+        self.sample_size = sample_size
+        self.count = 0
+        self.total_size = 0
+        self._sample: List[Tuple[int, str, float]] = []
+
+    def consume(self, entry: ScanEntry) -> None:
+        if entry.is_dir or entry.mtime >= self.cutoff:
+            return
+        self.count += 1
+        self.total_size += entry.size
+        item = (entry.size, entry.path, entry.mtime)
+        if len(self._sample) < self.sample_size:
+            heapq.heappush(self._sample, item)
+        elif item > self._sample[0]:
+            heapq.heapreplace(self._sample, item)
+
+    def result(self) -> Dict:
+        return {
+            'count': self.count,
+            'size': self.total_size,
+            'sample': [{'path': p, 'size': s, 'mtime': m}
+                       for s, p, m in sorted(self._sample, reverse=True)],
+        }
+
+
+class AgeHistogramStage(ScanStage):
+    """
+    Distribuição de arquivos por idade (mtime e atime) em cada diretório do escopo.
+
+    Faixas: até 7, 30, 90 e 365 dias e acima de 365 (bordas configuráveis).
+    """
+
+    def __init__(self, directories: Iterable[str], now: float,
+                 buckets_days: Sequence[int] = (7, 30, 90, 365)):
+        super().__init__(directories)
+        self.edges = [now - days * 86400 for days in buckets_days]
+        self.labels = [f"{d}d" for d in buckets_days] + [f">{buckets_days[-1]}d"]
+        self._prefixes = [(p, d) for d, p in zip(self.scope[0], self.scope[1])]
+        self.histograms = {d: {'mtime': [[0, 0] for _ in self.labels],
+                               'atime': [[0, 0] for _ in self.labels]} for d in self.scope[0]}
+
+    def _bucket(self, timestamp: float) -> int:
+        for i, edge in enumerate(self.edges):
+            if timestamp >= edge:
+                return i
+        return len(self.edges)
+
+    def consume(self, entry: ScanEntry) -> None:
+        if entry.is_dir:
+            return
+        for prefix, directory in self._prefixes:
+            if entry.path.startswith(prefix):
+                hist = self.histograms[directory]
+                for field, timestamp in (('mtime', entry.mtime), ('atime', entry.atime)):
+                    bucket = hist[field][self._bucket(timestamp)]
+                    bucket[0] += 1
+                    bucket[1] += entry.size
+                break
+
+    def result(self) -> Dict[str, Dict[str, Dict[str, Dict[str, int]]]]:
+        return {directory: {field: {label: {'count': c, 'size': s}
+                                    for label, (c, s) in zip(self.labels, buckets)}
+                            for field, buckets in hist.items()}
+                for directory, hist in self.histograms.items()}
+
+
+class DuplicateCandidateStage(ScanStage):
+    """Agrupa arquivos por tamanho exato; só grupos com 2+ arquivos podem ser duplicados."""
+
+    def __init__(self, scope: Optional[Iterable[str]] = None, min_size: int = 1024):
+        super().__init__(scope)
+        self.min_size = min_size
+        self.by_size: Dict[int, List[str]] = defaultdict(list)
+        self._inodes = set()
+
+    def consume(self, entry: ScanEntry) -> None:
+        if entry.is_dir or entry.size <= self.min_size:
+            return
+        # Hardlinks do mesmo inode não ocupam espaço extra: considerar apenas um caminho
+        if entry.nlink > 1 and entry.ino:
+            key = (entry.dev, entry.ino)
+            if key in self._inodes:
+                return
+            self._inodes.add(key)
+        self.by_size[entry.size].append(entry.path)
+
+    def result(self) -> Dict[int, List[str]]:
+        return {size: paths for size, paths in self.by_size.items() if len(paths) > 1}
+
+
+class _BoundedTop:
+    """Min-heap com os N maiores itens vistos (memória constante)."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._heap: List[Tuple] = []
+
+    def push(self, item: Tuple) -> None:
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+
+    def largest(self) -> List[Tuple]:
+        return sorted(self._heap, reverse=True)
+
+
+class LargestFilesStage(ScanStage):
+    """Os N maiores arquivos (por espaço alocado) de toda a varredura."""
+
+    def __init__(self, limit: int = 100, scope: Optional[Iterable[str]] = None):
+        super().__init__(scope)
+        self._top = _BoundedTop(limit)
+
+    def consume(self, entry: ScanEntry) -> None:
+        if not entry.is_dir:
+            self._top.push((entry.allocated, entry.size, entry.path, entry.mtime))
+
+    def result(self) -> List[Dict]:
+        return [{'path': p, 'size': s, 'allocated': a, 'mtime': m}
+                for a, s, p, m in self._top.largest()]
+
+
+class LargestLeafDirectoriesStage(ScanStage):
+    """
+    Os N maiores diretórios folha (sem subdiretórios), pelo conteúdo direto.
+
+    A varredura entrega as entradas de cada diretório em sequência, então
+    basta acumular o diretório corrente e fechá-lo quando o pai muda.
+    """
+
+    def __init__(self, limit: int = 50, scope: Optional[Iterable[str]] = None):
+        super().__init__(scope)
+        self._top = _BoundedTop(limit)
+        self._current: Optional[str] = None
+        self._leaf = True
+        self._files = 0
+        self._size = 0
+        self._allocated = 0
+
+    def _close(self) -> None:
+        if self._current is not None and self._leaf and self._files:
+            self._top.push((self._allocated, self._size, self._files, self._current))
+        self._current = None
+
+    def consume(self, entry: ScanEntry) -> None:
+        parent = os.path.dirname(entry.path)
+        if parent != self._current:
+            self._close()
+            self._current, self._leaf = parent, True
+            self._files = self._size = self._allocated = 0
+        if entry.is_dir:
+            self._leaf = False
+        else:
+            self._files += 1
+            self._size += entry.size
+            self._allocated += entry.allocated
+
+    def result(self) -> List[Dict]:
+        self._close()
+        return [{'path': p, 'size': s, 'allocated': a, 'files': f}
+                for a, s, f, p in self._top.largest()]
+
@@ -0,0 +1,241 @@
+"""
+Atualização ao vivo do índice de disco via inotify (Linux) para o Paguro Boost
+
+Observa os diretórios do índice de varredura com inotify (ctypes, sem
+dependências extras). Eventos são agrupados em uma janela de debounce;
+cada diretório afetado é relido e gravado no índice, que propaga os deltas
+de tamanho e quantidade de arquivos para os ancestrais. Em caso de estouro
+da fila do kernel (IN_Q_OVERFLOW), todos os diretórios do índice são
+relidos e regravados, sem reaproveitar listagens pelo mtime: arquivos
+alterados no lugar (ex.: logs com append) não mudam o mtime do diretório.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from .disk_scanner import DiskScanner
+
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+
+# Eventos que alteram tamanho ou quantidade de entradas de um diretório
+WATCH_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |
+              IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR | IN_DONT_FOLLOW)
+
+_EVENT = struct.Struct('iIII')
+MAX_USER_WATCHES_FILE = '/proc/sys/fs/inotify/max_user_watches'
+
+_libc = None
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+    _libc.inotify_init1.argtypes = (ctypes.c_int,)
+    _libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+    _libc.inotify_rm_watch.argtypes = (ctypes.c_int, ctypes.c_int)
+except (OSError, AttributeError, TypeError):
+    _libc = None
+
+
+def inotify_supported() -> bool:
+    """Indica se inotify está disponível nesta plataforma."""
+    return _libc is not None
+
+
+def max_user_watches() -> int:
+    """Limite de watches inotify por usuário (fs.inotify.max_user_watches)."""
+    try:
+        with open(MAX_USER_WATCHES_FILE, 'r') as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return 8192
+
+
+class DiskWatcher:
+    """Mantém o ScanIndex atualizado a partir de eventos inotify."""
+
+    def __init__(self, index, debounce: float = 2.0, watch_fraction: float = 0.5,
+                 max_watches: Optional[int] = None,
+                 on_update: Optional[Callable[[List[str]], None]] = None):
+        self.index = index
+        self.debounce = debounce
+        # Outros programas também usam watches: ocupar só uma fração do limite
+        limit = int(max_user_watches() * watch_fraction)
+        self.max_watches = min(limit, max_watches) if max_watches else limit
+        self.on_update = on_update
+        # Gravações do próprio índice não devem gerar novas atualizações
+        self._ignored = os.path.dirname(os.path.abspath(index.path))
+        self._fd = -1
+        self._watches: Dict[int, str] = {}
+        self._paths: Dict[str, int] = {}
+        self._dirty: Set[str] = set()
+        self._overflow = False
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.unwatched = 0
+
+    @property
+    def watch_count(self) -> int:
+        return len(self._watches)
+
+    def _add_watch(self, path: str) -> bool:
+        if path in self._paths:
+            return True
+        if len(self._watches) >= self.max_watches:
+            self.unwatched += 1
+            return False
+        wd = _libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                # Limite do kernel atingido antes da nossa cota
+                self.max_watches = len(self._watches)
+            self.unwatched += 1
+            return False
+        self._watches[wd] = path
+        self._paths[path] = wd
+        return True
+
+    def _forget_watch(self, wd: int) -> None:
+        path = self._watches.pop(wd, None)
+        if path is not None:
+            self._paths.pop(path, None)
+
+    def watch(self, directories: Iterable[str]) -> int:
+        """Adiciona watches aos diretórios (rasos primeiro), respeitando a cota."""
+        added = 0
+        for path in directories:
+            if self._add_watch(path):
+                added += 1
+        return added
+
+    def start(self) -> bool:
+        """Inicia o observador sobre todos os diretórios do índice."""
+        if _libc is None or self._running:
+            return False
+        self._fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            self._fd = -1
+            return False
+        self.watch(self.index.directories())
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self) -> None:
+        """Para o observador e libera os watches."""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        self._watches.clear()
+        self._paths.clear()
+
+    def _read_events(self) -> None:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            wd, mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                self._overflow = True
+                continue
+            path = self._watches.get(wd)
+            if path is None or path == self._ignored:
+                continue
+            if mask & IN_IGNORED:
+                self._forget_watch(wd)
+            elif mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                # O pai recebe IN_DELETE/IN_MOVED_FROM e remove a subárvore do índice
+                self._dirty.add(os.path.dirname(path))
+            else:
+                self._dirty.add(path)
+
+    def _loop(self) -> None:
+        first_event = None
+        last_event = None
+        while self._running:
+            ready, _, _ = select.select([self._fd], [], [], 0.5)
+            now = time.monotonic()
+            if ready:
+                self._read_events()
+                last_event = now
+                if first_event is None:
+                    first_event = now
+            if first_event is None:
+                continue
+            # Debounce: aplicar após um período sem eventos (ou no máximo 5 janelas)
+            if now - last_event >= self.debounce or now - first_event >= 5 * self.debounce:
+                self.flush()
+                first_event = last_event = None
+
+    def flush(self) -> List[str]:
+        """Aplica ao índice os diretórios acumulados; retorna os diretórios atualizados."""
+        dirty, self._dirty = self._dirty, set()
+        overflow, self._overflow = self._overflow, False
+        updated = []
+
+        if overflow:
+            # Eventos perdidos: reler cada diretório; um mtime igual não garante arquivos iguais
+            for path in self.index.directories():
+                if self._refresh_directory(path):
+                    updated.append(path)
+            dirty.difference_update(updated)
+            self.watch(self.index.directories())
+
+        for path in sorted(dirty, key=lambda p: p.count(os.sep)):
+            if self._refresh_directory(path):
+                updated.append(path)
+        self.index.commit()
+
+        if updated and self.on_update:
+            self.on_update(updated)
+        return updated
+
+    def _refresh_directory(self, path: str) -> bool:
+        """Relê um diretório, grava no índice e varre subdiretórios novos."""
+        try:
+            st = os.lstat(path)
+        except OSError:
+            # Diretório removido: o pai é relido e remove a subárvore
+            return False
+        listing = DiskScanner._list_directory(path)
+        if listing is None:
+            return False
+        entries, subdirs = listing
+        new_dirs = [d for d in subdirs if self.index.directory(d) is None]
+        self.index.store(path, st, entries)
+        if new_dirs:
+            self.index.commit()
+            scanned = [e.path for e in DiskScanner(index=self.index).scan(new_dirs) if e.is_dir]
+            self.index.commit()
+            self.watch(sorted(scanned, key=lambda p: p.count(os.sep)))
+        return True
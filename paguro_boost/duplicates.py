@@ -0,0 +1,327 @@
+"""
+Busca de arquivos duplicados em múltiplos estágios para o Paguro Boost
+
+1. Agrupamento por tamanho exato (feito pela varredura de disco)
+2. BLAKE2b do primeiro e do último bloco de cada candidato
+3. BLAKE2b do conteúdo completo apenas para quem sobreviveu ao estágio 2
+
+Os estágios de hash rodam em um pool de threads (hashlib libera o GIL em
+buffers grandes) e leem via BulkFile, sem expulsar dados quentes do page
+cache. Só arquivos com hash completo idêntico são reportados. Com um
+HashCache, digests de arquivos inalterados são reaproveitados.
+
+Opcionalmente, duplicados confirmados podem ser substituídos por hardlinks
+ou reflinks (FICLONE) do arquivo mantido.
+"""
+
+import errno
+import hashlib
+import os
+import stat
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import zip_longest
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from .disk_scanner import CancellationToken, ScanProgress
+from .fileio import BulkFile
+from .hash_cache import HashCache, HashKey, hash_key
+from .throttle import Throttle
+
+
+BLOCK_SIZE = 64 * 1024          # blocos inicial e final do estágio 2
+READ_BUFFER = 1024 * 1024       # buffer reaproveitado no hash completo
+DIGEST_SIZE = 32
+
+# (tamanho, caminho, chave do cache ou None)
+_Item = Tuple[int, str, Optional[HashKey]]
+
+
+def partial_digest(path: str, size: int, block_size: int = BLOCK_SIZE,
+                   throttle: Optional[Throttle] = None) -> Optional[bytes]:
+    """BLAKE2b do primeiro e do último bloco do arquivo."""
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    try:
+        with BulkFile(path, buffer_size=block_size) as f:
+            if throttle is not None:
+                throttle.wait(ops=1, nbytes=min(size, 2 * block_size))
+            for chunk in f.chunks(0, block_size):
+                h.update(chunk)
+            if size > block_size:
+                for chunk in f.chunks(max(block_size, size - block_size), block_size):
+                    h.update(chunk)
+    except OSError:
+        return None
+    return h.digest()
+
+
+def full_digest(path: str, buffer_size: int = READ_BUFFER, direct: bool = False,
+                throttle: Optional[Throttle] = None,
+                token: Optional[CancellationToken] = None) -> Optional[bytes]:
+    """BLAKE2b do conteúdo completo, lido em blocos alinhados sem poluir o page cache."""
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    try:
+        with BulkFile(path, direct=direct, buffer_size=buffer_size) as f:
+            for chunk in f.chunks():
+                if token is not None:
+                    token.raise_if_cancelled()
+                if throttle is not None:
+                    throttle.wait(ops=1, nbytes=len(chunk))
+                h.update(chunk)
+    except OSError:
+        return None
+    return h.digest()
+
+
+class DuplicateFinder:
+    """
+    Confirma duplicados entre grupos de arquivos com o mesmo tamanho.
+
+    Com token e progress (de um ScanJob), o hash pode ser cancelado e os
+    bytes lidos são reportados como fase 'hash' do progresso.
+    """
+
+    def __init__(self, max_workers: int = 4, block_size: int = BLOCK_SIZE,
+                 buffer_size: int = READ_BUFFER, cache: Optional[HashCache] = None,
+                 direct_io: bool = False, throttle: Optional[Throttle] = None,
+                 token: Optional[CancellationToken] = None, progress: Optional[ScanProgress] = None):
+        self.max_workers = max(1, max_workers)
+        self.block_size = block_size
+        self.buffer_size = buffer_size
+        self.cache = cache
+        self.direct_io = direct_io
+        self.throttle = throttle
+        self.token = token
+        self.progress = progress
+        self._cached: Dict[HashKey, Dict] = {}
+        self._computed: Dict[HashKey, Dict] = {}
+        self._lock = threading.Lock()
+        self.stats = {'candidates': 0, 'partial_hashed': 0, 'full_hashed': 0, 'cache_hits': 0}
+
+    @staticmethod
+    def _stat(item: _Item) -> Optional[_Item]:
+        """Atualiza a chave do cache; descarta arquivos alterados desde a varredura."""
+        try:
+            st = os.stat(item[1])
+        except OSError:
+            return None
+        if st.st_size != item[0]:
+            return None
+        return (item[0], item[1], hash_key(st))
+
+    def _digest(self, item: _Item, kind: str) -> Optional[bytes]:
+        if self.token is not None:
+            self.token.raise_if_cancelled()
+        key = item[2]
+        if key is not None:
+            cached = self._cached.get(key)
+            if cached is not None and cached[kind] is not None:
+                with self._lock:
+                    self.stats['cache_hits'] += 1
+                return cached[kind]
+        if kind == 'partial':
+            value = partial_digest(item[1], item[0], self.block_size, self.throttle)
+        else:
+            value = full_digest(item[1], self.buffer_size, self.direct_io, self.throttle, self.token)
+        with self._lock:
+            self.stats[kind + '_hashed'] += 1
+            if key is not None and value is not None:
+                self._computed.setdefault(key, {'partial': None, 'full': None})[kind] = value
+        return value
+
+    def _partial(self, item: _Item) -> Optional[bytes]:
+        return self._digest(item, 'partial')
+
+    def _full(self, item: _Item) -> Optional[bytes]:
+        return self._digest(item, 'full')
+
+    def _regroup(self, pool: ThreadPoolExecutor, groups: Iterable[List[_Item]], digest,
+                 cost) -> List[Tuple[bytes, List[_Item]]]:
+        """Subdivide cada grupo pelo digest; descarta grupos que ficaram com um arquivo."""
+        items = [item for group in groups for item in group]
+        progress = self.progress
+        if progress is not None:
+            progress.start_hashing(sum(cost(item[0]) for item in items))
+        by_digest: Dict[Tuple[int, bytes], List[_Item]] = defaultdict(list)
+        for item, value in zip(items, pool.map(digest, items)):
+            if self.token is not None:
+                self.token.raise_if_cancelled()
+            if progress is not None:
+                progress.hashed_bytes += cost(item[0])
+            if value is not None:
+                by_digest[(item[0], value)].append(item)
+        return [(key[1], group) for key, group in by_digest.items() if len(group) > 1]
+
+    def find(self, by_size: Dict[int, List[str]]) -> List[Dict]:
+        """
+        Retorna grupos de duplicados confirmados por hash completo.
+
+        by_size: tamanho -> caminhos (um caminho por inode).
+        """
+        groups = [[(size, path, None) for path in paths]
+                  for size, paths in by_size.items() if len(paths) > 1]
+        self.stats = {'candidates': sum(len(g) for g in groups), 'partial_hashed': 0,
+                      'full_hashed': 0, 'cache_hits': 0}
+        self._cached, self._computed = {}, {}
+
+        initializer = self.throttle.worker_init if self.throttle else None
+        with ThreadPoolExecutor(max_workers=self.max_workers, initializer=initializer) as pool:
+            if self.cache is not None:
+                groups = [[item for item in pool.map(self._stat, group) if item is not None]
+                          for group in groups]
+                groups = [g for g in groups if len(g) > 1]
+                self._cached = self.cache.lookup_many(
+                    (item[2] for group in groups for item in group), self.block_size)
+
+            partial = self._regroup(pool, groups, self._partial,
+                                    lambda size: min(size, 2 * self.block_size))
+
+            # Até dois blocos, os blocos inicial e final já cobrem o arquivo inteiro
+            covered = [(d, g) for d, g in partial if g[0][0] <= 2 * self.block_size]
+            pending = [g for _, g in partial if g[0][0] > 2 * self.block_size]
+            confirmed = covered + self._regroup(pool, pending, self._full, lambda size: size)
+
+        if self.cache is not None:
+            self.cache.store_many(self._computed, self.block_size)
+
+        result = [{
+            'size': group[0][0],
+            'digest': digest.hex(),
+            'files': sorted(item[1] for item in group),
+        } for digest, group in confirmed]
+        result.sort(key=lambda g: g['size'] * (len(g['files']) - 1), reverse=True)
+        return result
+
+
+# ioctl FICLONE (linux/fs.h): clona as extensões de um arquivo em outro (btrfs, XFS)
+FICLONE = 0x40049409
+
+DEDUP_MODES = ('hardlink', 'reflink', 'auto')
+
+
+def files_identical(a: str, b: str, buffer_size: int = READ_BUFFER) -> bool:
+    """Compara dois arquivos byte a byte."""
+    try:
+        with BulkFile(a, buffer_size=buffer_size) as fa, \
+                BulkFile(b, buffer_size=buffer_size, slot=1) as fb:
+            if fa.size != fb.size:
+                return False
+            for chunk_a, chunk_b in zip_longest(fa.chunks(), fb.chunks()):
+                if chunk_a is None or chunk_b is None or chunk_a != chunk_b:
+                    return False
+            return True
+    except OSError:
+        return False
+
+
+def _temp_name(path: str) -> str:
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.paguro-dedup-{os.getpid()}-{threading.get_ident()}")
+
+
+def _reflink_to(source: str, temp: str, original: os.stat_result) -> None:
+    """Cria temp como clone (reflink) de source, com os metadados do arquivo original."""
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, 'reflink indisponível nesta plataforma')
+    fd_src = os.open(source, os.O_RDONLY)
+    try:
+        fd_dst = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            fcntl.ioctl(fd_dst, FICLONE, fd_src)
+            try:
+                os.fchown(fd_dst, original.st_uid, original.st_gid)
+            except PermissionError:
+                pass
+            os.fchmod(fd_dst, stat.S_IMODE(original.st_mode))
+        finally:
+            os.close(fd_dst)
+        os.utime(temp, ns=(original.st_atime_ns, original.st_mtime_ns))
+    finally:
+        os.close(fd_src)
+
+
+def link_duplicate(keeper: str, duplicate: str, mode: str = 'auto') -> Optional[Dict]:
+    """
+    Substitui duplicate por um hardlink ou reflink de keeper.
+
+    O conteúdo é verificado byte a byte imediatamente antes da troca, que é
+    atômica: o link é criado com nome temporário e renomeado sobre o arquivo.
+    Hardlinks compartilham metadados, então só são usados quando dono, grupo
+    e permissões coincidem; reflinks recebem os metadados do arquivo original.
+    Retorna None se o arquivo foi mantido.
+    """
+    try:
+        st_keep = os.stat(keeper)
+        st_dup = os.lstat(duplicate)
+    except OSError:
+        return None
+    if not stat.S_ISREG(st_dup.st_mode) or st_keep.st_dev != st_dup.st_dev \
+            or st_keep.st_ino == st_dup.st_ino or st_keep.st_size != st_dup.st_size:
+        return None
+
+    same_metadata = (st_keep.st_uid, st_keep.st_gid, st_keep.st_mode) == \
+                    (st_dup.st_uid, st_dup.st_gid, st_dup.st_mode)
+    methods = {'hardlink': ['hardlink'], 'reflink': ['reflink'],
+               'auto': ['reflink', 'hardlink']}[mode]
+    if not same_metadata and 'hardlink' in methods:
+        methods.remove('hardlink')
+    if not methods or not files_identical(keeper, duplicate):
+        return None
+
+    temp = _temp_name(duplicate)
+    for method in methods:
+        try:
+            if method == 'hardlink':
+                os.link(keeper, temp)
+            else:
+                _reflink_to(keeper, temp, st_dup)
+        except OSError:
+            if os.path.lexists(temp):
+                os.unlink(temp)
+            continue
+
+        try:
+            # O duplicado não pode ter mudado durante a verificação
+            current = os.lstat(duplicate)
+            if (current.st_ino, current.st_size, current.st_mtime_ns) != \
+                    (st_dup.st_ino, st_dup.st_size, st_dup.st_mtime_ns):
+                os.unlink(temp)
+                return None
+            os.replace(temp, duplicate)
+        except OSError:
+            if os.path.lexists(temp):
+                os.unlink(temp)
+            return None
+
+        # Blocos só são liberados se o duplicado não tinha outros links
+        reclaimed = st_dup.st_blocks * 512 if st_dup.st_nlink == 1 else 0
+        return {'path': duplicate, 'keeper': keeper, 'method': method, 'reclaimed': reclaimed}
+    return None
+
+
+def deduplicate(groups: List[Dict], mode: str = 'auto') -> Dict:
+    """Aplica link_duplicate a grupos retornados por DuplicateFinder.find."""
+    if mode not in DEDUP_MODES:
+        raise ValueError(f"modo de deduplicação inválido: {mode}")
+    files = []
+    kept = 0
+    for group in groups:
+        keeper = group['files'][0]
+        for duplicate in group['files'][1:]:
+            result = link_duplicate(keeper, duplicate, mode)
+            if result is None:
+                kept += 1
+            else:
+                files.append(result)
+    return {
+        'files': files,
+        'linked': len(files),
+        'kept': kept,
+        'reclaimed': sum(f['reclaimed'] for f in files),
+    }
@@ -18,6 +18,10 @@ class DiskOptimizationError(SystemOptimizationError):
     """Raised when disk optimization fails."""
     pass
 
+class ScanCancelledError(DiskOptimizationError):
+    """Raised when a disk scan is cancelled or times out."""
+    pass
+
 class StartupOptimizationError(SystemOptimizationError):
     """Raised when startup optimization fails."""
     pass
@@ -282,7 +282,8 @@ class PaguroBoostGUI(ctk.CTk):
         analyses = [
             ("Memória RAM", "Análise detalhada do uso de memória e top processos.", self.show_memory_analysis, 1, 0),
             ("Armazenamento", "Escaneamento de arquivos grandes, antigos e duplicatas.", self.show_disk_analysis, 1, 1),
-            ("Performance", "Relatório avançado de estabilidade do sistema ao longo do tempo.", self.show_performance_report, 2, 0)
+            ("Performance", "Relatório avançado de estabilidade do sistema ao longo do tempo.", self.show_performance_report, 2, 0),
+            ("Estimativa Rápida", "Uso de disco por amostragem em segundos, com intervalo de confiança.", self.show_disk_estimate, 2, 1)
         ]
 
         for title, desc, cmd, row, col in analyses:
@@ -563,10 +564,10 @@ class PaguroBoostGUI(ctk.CTk):
         # Processos Box
         proc = ctk.CTkFrame(container, fg_color=self.colors["surface"], corner_radius=10)
         proc.pack(fill="x", pady=20)
-        ctk.CTkLabel(proc, text="[TOP 10 PROCESSOS EM MEMÓRIA]", font=ctk.CTkFont(family="Courier", size=14, weight="bold"), text_color=self.colors["accent"]).pack(anchor="w", padx=20, pady=10)
+        ctk.CTkLabel(proc, text="[TOP 10 APLICAÇÕES EM MEMÓRIA]", font=ctk.CTkFont(family="Courier", size=14, weight="bold"), text_color=self.colors["accent"]).pack(anchor="w", padx=20, pady=10)
         
         for p in analysis.get('processos_top_memoria', []):
-            line = f"{p['pid']:<8} | {p['memory_percent']:>5.1f}% | {p['memory_mb']:>7} MB | {p['name']}"
+            line = f"{p['pid']:<8} | {p['memory_percent']:>5.1f}% | {p['memory_mb']:>7} MB | {p.get('processos', 1):>3} proc | {p['name']}"
             ctk.CTkLabel(proc, text=line, font=ctk.CTkFont(family="Courier", size=12), text_color=self.colors["text"]).pack(anchor="w", padx=20, pady=2)
             
         # Recomendações
@@ -579,17 +580,62 @@ class PaguroBoostGUI(ctk.CTk):
                 ctk.CTkLabel(rec_frame, text=f"-> {r}", font=ctk.CTkFont(family="Courier", size=12), text_color=self.colors["text_dim"], wraplength=600, justify="left").pack(anchor="w", padx=20, pady=5)
 
     def show_disk_analysis(self):
-        def analyze():
-            try:
-                if not self.optimizer: self.optimizer = SystemOptimizer()
-                analysis = self.optimizer.analisar_uso_disco_detalhado()
-                if analysis:
-                    self.after(0, lambda: self._render_disk_analysis(analysis))
+        if not self.optimizer: self.optimizer = SystemOptimizer()
+        job = self.optimizer.iniciar_analise_disco()
+        
+        top = ctk.CTkToplevel(self)
+        top.title("Varredura de Disco")
+        top.geometry("520x230")
+        top.configure(fg_color=self.colors["bg"])
+        top.transient(self)
+        ctk.CTkLabel(top, text=">>> VARRENDO DISCO <<<", font=ctk.CTkFont(family="Courier", size=18, weight="bold"), text_color=self.colors["accent"]).pack(pady=(20, 10), padx=20, anchor="w")
+        bar = ctk.CTkProgressBar(top, progress_color=self.colors["accent"])
+        bar.pack(fill="x", padx=20, pady=5)
+        bar.configure(mode="indeterminate")
+        bar.start()
+        status = ctk.CTkLabel(top, text="Iniciando...", font=ctk.CTkFont(family="Courier", size=12), text_color=self.colors["text_dim"], justify="left")
+        status.pack(anchor="w", padx=20, pady=10)
+        ctk.CTkButton(
+            top, text="[X] CANCELAR",
+            font=ctk.CTkFont(family="Courier", size=12, weight="bold"),
+            fg_color="#ff0000", text_color="white", hover_color="#cc0000",
+            command=job.cancel
+        ).pack(padx=20, pady=10, anchor="e")
+        top.protocol("WM_DELETE_WINDOW", lambda: (job.cancel(), top.destroy()))
+        
+        def poll():
+            if not top.winfo_exists():
+                return
+            info = job.snapshot()
+            if job.running:
+                if info['phase'] == 'hash':
+                    texto = (f"Confirmando duplicados: {info['hashed_bytes'] / (1024**2):.0f} de "
+                             f"{info['hash_bytes'] / (1024**2):.0f} MB\n"
+                             f"{info['files']} arquivos varridos | {info['elapsed']:.0f}s")
                 else:
-                    self.after(0, lambda: messagebox.showerror("Erro", "Erro ao acessar partições."))
-            except Exception as e:
-                pass
-        threading.Thread(target=analyze, daemon=True).start()
+                    texto = (f"{info['directories']} diretórios | {info['files']} arquivos | "
+                             f"{info['bytes'] / (1024**3):.1f} GB\n"
+                             f"{info['files_per_second']:.0f} arquivos/s | {info['elapsed']:.0f}s")
+                if info['fraction'] is not None:
+                    if bar.cget("mode") != "determinate":
+                        bar.stop()
+                        bar.configure(mode="determinate")
+                    bar.set(info['fraction'])
+                    if info['eta_seconds'] is not None:
+                        texto += f" | restante ~{info['eta_seconds']:.0f}s"
+                status.configure(text=texto)
+                self.after(250, poll)
+                return
+            
+            top.destroy()
+            if job.state == job.DONE and job.result:
+                self._render_disk_analysis(job.result)
+            elif job.state == job.TIMEOUT:
+                messagebox.showwarning("Aviso", "Tempo limite da varredura de disco atingido.")
+            elif job.state == job.FAILED or (job.state == job.DONE and not job.result):
+                messagebox.showerror("Erro", "Erro ao acessar partições.")
+        
+        self.after(250, poll)
 
     def _render_disk_analysis(self, analysis):
         top, container = self.abstract_popup_window("Análise de Armazenamento")
@@ -643,7 +689,19 @@ class PaguroBoostGUI(ctk.CTk):
             ctk.CTkLabel(df, text="[DIRETÓRIOS CRÍTICOS (GRANDES)]", font=ctk.CTkFont(family="Courier", size=14, weight="bold"), text_color=self.colors["accent"]).pack(anchor="w", padx=20, pady=10)
             for d in dirs[:5]:
                 nm = os.path.basename(d['caminho']) or d['caminho']
-                ctk.CTkLabel(df, text=f"{nm} -> {d['tamanho_gb']:.1f} GB", font=ctk.CTkFont(family="Courier", size=12)).pack(anchor="w", padx=20, pady=2)
+                aparente = d.get('tamanho_aparente_gb', d['tamanho_gb'])
+                ctk.CTkLabel(df, text=f"{nm} -> {d['tamanho_gb']:.1f} GB em disco ({aparente:.1f} GB aparente)", font=ctk.CTkFont(family="Courier", size=12)).pack(anchor="w", padx=20, pady=2)
+
+        # Maiores arquivos e diretórios folha
+        for chave, titulo, campo in (('maiores_arquivos', "[MAIORES ARQUIVOS]", 'arquivo'),
+                                     ('maiores_diretorios_folha', "[MAIORES DIRETÓRIOS FOLHA]", 'caminho')):
+            itens = analysis.get(chave, [])
+            if itens:
+                tf = ctk.CTkFrame(container, fg_color=self.colors["surface"], corner_radius=10)
+                tf.pack(fill="x", pady=10)
+                ctk.CTkLabel(tf, text=f"{titulo} Top {min(10, len(itens))} de {len(itens)}", font=ctk.CTkFont(family="Courier", size=14, weight="bold"), text_color=self.colors["accent"]).pack(anchor="w", padx=20, pady=10)
+                for item in itens[:10]:
+                    ctk.CTkLabel(tf, text=f"{item['alocado_mb']:>9.1f} MB | {item[campo]}", font=ctk.CTkFont(family="Courier", size=12), text_color=self.colors["text_dim"]).pack(anchor="w", padx=20, pady=2)
 
         # Arquivos antigos
         ant = analysis.get('arquivos_antigos', {})
@@ -654,6 +712,18 @@ class PaguroBoostGUI(ctk.CTk):
             for a in ant.get('sample_arquivos', [])[:5]:
                 ctk.CTkLabel(af, text=f"{os.path.basename(a['arquivo'])} | {a['dias_antigo']} dias | {a['tamanho_mb']:.1f} MB", font=ctk.CTkFont(family="Courier", size=12), text_color=self.colors["text_dim"]).pack(anchor="w", padx=20, pady=2)
 
+        # Distribuição por idade (mtime) de cada diretório
+        idades = {d: h['mtime'] for d, h in analysis.get('distribuicao_idade', {}).items()
+                  if any(f['arquivos'] for f in h['mtime'].values())}
+        if idades:
+            hf = ctk.CTkFrame(container, fg_color=self.colors["surface"], corner_radius=10)
+            hf.pack(fill="x", pady=10)
+            faixas = list(next(iter(idades.values())))
+            ctk.CTkLabel(hf, text="[IDADE DOS ARQUIVOS] MB por última modificação (" + " / ".join(faixas) + ")", font=ctk.CTkFont(family="Courier", size=14, weight="bold"), text_color=self.colors["accent"]).pack(anchor="w", padx=20, pady=10)
+            for diretorio, hist in idades.items():
+                colunas = " ".join(f"{hist[f]['tamanho_mb']:>9.1f}" for f in faixas)
+                ctk.CTkLabel(hf, text=f"{colunas} | {diretorio}", font=ctk.CTkFont(family="Courier", size=12), text_color=self.colors["text_dim"]).pack(anchor="w", padx=20, pady=2)
+
         recs = analysis.get('recomendacoes', [])
         if recs:
             rec_frame = ctk.CTkFrame(container, fg_color=self.colors["surface"], corner_radius=10)
@@ -663,6 +733,40 @@ class PaguroBoostGUI(ctk.CTk):
                 ctk.CTkLabel(rec_frame, text=f"-> {r}", font=ctk.CTkFont(family="Courier", size=12), wraplength=600, justify="left").pack(anchor="w", padx=20, pady=5)
 
 
+    def show_disk_estimate(self):
+        def estimate():
+            try:
+                if not self.optimizer: self.optimizer = SystemOptimizer()
+                estimativa = self.optimizer.estimar_uso_disco()
+                if not estimativa:
+                    self.after(0, lambda: messagebox.showerror("Erro", "Erro ao estimar uso de disco."))
+                    return
+                self.after(0, lambda: self._render_disk_estimate(estimativa))
+            except Exception as e:
+                self.after(0, lambda err=e: messagebox.showerror("Erro", f"Erro crítico na estimativa: {err}"))
+        threading.Thread(target=estimate, daemon=True).start()
+
+    def _render_disk_estimate(self, estimativa):
+        top, container = self.abstract_popup_window("Estimativa de Armazenamento")
+
+        info = ctk.CTkFrame(container, fg_color=self.colors["surface"], corner_radius=10)
+        info.pack(fill="x", pady=10)
+        total = estimativa['total']
+        baixo, alto = total['intervalo_mb']
+        ctk.CTkLabel(info, text=f"Diretório Raiz: {estimativa['caminho']}", font=ctk.CTkFont(family="Courier", size=14, weight="bold")).pack(anchor="w", padx=20, pady=10)
+        ctk.CTkLabel(info, text=f"Estimado: {total['tamanho_mb'] / 1024:.1f} GB ({baixo / 1024:.1f} - {alto / 1024:.1f} GB)", font=ctk.CTkFont(family="Courier", size=12)).pack(anchor="w", padx=20, pady=5)
+        ctk.CTkLabel(info, text=f"{estimativa['sondas']} sondas | {estimativa['diretorios_listados']} diretórios | {estimativa['tempo_segundos']:.1f}s", font=ctk.CTkFont(family="Courier", size=12), text_color=self.colors["text_dim"]).pack(anchor="w", padx=20, pady=5)
+
+        for chave, titulo in (('diretorios', "[DIRETÓRIOS]"), ('tipos_arquivo', "[TIPOS DE ARQUIVO]")):
+            itens = sorted(estimativa.get(chave, {}).items(), key=lambda x: x[1]['tamanho_mb'], reverse=True)[:10]
+            if itens:
+                tf = ctk.CTkFrame(container, fg_color=self.colors["surface"], corner_radius=10)
+                tf.pack(fill="x", pady=10)
+                ctk.CTkLabel(tf, text=f"{titulo} MB estimados (intervalo)", font=ctk.CTkFont(family="Courier", size=14, weight="bold"), text_color=self.colors["accent"]).pack(anchor="w", padx=20, pady=10)
+                for nome, item in itens:
+                    baixo, alto = item['intervalo_mb']
+                    ctk.CTkLabel(tf, text=f"{item['tamanho_mb']:>9.1f} ({baixo:.0f}-{alto:.0f}) | {nome}", font=ctk.CTkFont(family="Courier", size=12), text_color=self.colors["text_dim"]).pack(anchor="w", padx=20, pady=2)
+
     def show_performance_report(self):
         # Para simplificar na reescrita premium, vamos gerar direto 24h as default
         def generate():
@@ -697,6 +801,19 @@ class PaguroBoostGUI(ctk.CTk):
             ctk.CTkLabel(af, text="[MÉDIAS REGISTRADAS]", font=ctk.CTkFont(family="Courier", size=14, weight="bold")).pack(anchor="w", padx=20, pady=10)
             ctk.CTkLabel(af, text=f"CPU: {avg.get('cpu_percent', 0):.1f}% | RAM: {avg.get('memory_percent', 0):.1f}% | HDD: {avg.get('disk_percent', 0):.1f}%", font=ctk.CTkFont(family="Courier", size=12)).pack(anchor="w", padx=20, pady=5)
 
+        eventos = report.get('optimization_events', [])
+        if eventos:
+            ef = ctk.CTkFrame(container, fg_color=self.colors["surface"], corner_radius=10)
+            ef.pack(fill="x", pady=10)
+            ctk.CTkLabel(ef, text="[EFEITO DAS OTIMIZAÇÕES]", font=ctk.CTkFont(family="Courier", size=14, weight="bold"), text_color=self.colors["accent"]).pack(anchor="w", padx=20, pady=10)
+            for ev in eventos[-5:]:
+                dados = ev['event'].get('data', {})
+                mem = dados.get('effects', {}).get('memory_used')
+                texto = f"{ev['timestamp'][:16]} | {ev['event'].get('label', '?')}"
+                if mem:
+                    texto += f" | RAM {mem['delta'] / (1024**2):+.0f} MB [{mem['ci_low'] / (1024**2):+.0f}, {mem['ci_high'] / (1024**2):+.0f}]"
+                ctk.CTkLabel(ef, text=texto, font=ctk.CTkFont(family="Courier", size=12), text_color=self.colors["text_dim"]).pack(anchor="w", padx=20, pady=2)
+
         recs = report.get('recommendations', [])
         if recs:
             rf = ctk.CTkFrame(container, fg_color=self.colors["surface"], corner_radius=10)
@@ -0,0 +1,124 @@
+"""
+Cache persistente de hashes de conteúdo para o Paguro Boost
+
+Guarda digests parciais (blocos inicial/final) e completos no mesmo banco
+SQLite do índice de varredura, com chave (st_dev, st_ino, st_size,
+st_mtime_ns): enquanto o arquivo não muda, seu conteúdo nunca é relido.
+O tamanho do cache é limitado por despejo LRU.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+from .config import SCAN_INDEX_FILE
+
+
+HashKey = Tuple[int, int, int, int]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    dev INTEGER,
+    ino INTEGER,
+    size INTEGER,
+    mtime_ns INTEGER,
+    block_size INTEGER,
+    partial BLOB,
+    full BLOB,
+    last_used REAL,
+    PRIMARY KEY (dev, ino, size, mtime_ns)
+);
+CREATE INDEX IF NOT EXISTS hashes_last_used ON hashes (last_used);
+"""
+
+# Chaves por lote nas consultas em massa
+_BATCH = 5000
+
+
+def hash_key(st: os.stat_result) -> HashKey:
+    """Chave do cache para um stat de arquivo."""
+    return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class HashCache:
+    """Digests por (dispositivo, inode, tamanho, mtime_ns), com despejo LRU."""
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 500000):
+        self.path = str(path or SCAN_INDEX_FILE)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def lookup_many(self, keys: Iterable[HashKey], block_size: int) -> Dict[HashKey, Dict]:
+        """
+        Resolve muitas chaves de uma vez.
+
+        Retorna {chave: {'partial': bytes|None, 'full': bytes|None}} apenas para
+        as chaves presentes; o digest parcial só vale para o mesmo block_size.
+        """
+        keys = list(dict.fromkeys(keys))
+        found: Dict[HashKey, Dict] = {}
+        now = time.time()
+        with self._lock:
+            conn = self._conn
+            conn.execute('CREATE TEMP TABLE IF NOT EXISTS lookup '
+                         '(dev INTEGER, ino INTEGER, size INTEGER, mtime_ns INTEGER)')
+            for start in range(0, len(keys), _BATCH):
+                conn.execute('DELETE FROM lookup')
+                conn.executemany('INSERT INTO lookup VALUES (?, ?, ?, ?)', keys[start:start + _BATCH])
+                for row in conn.execute(
+                        'SELECT h.dev, h.ino, h.size, h.mtime_ns, h.block_size, h.partial, h.full '
+                        'FROM lookup l JOIN hashes h ON h.dev = l.dev AND h.ino = l.ino '
+                        'AND h.size = l.size AND h.mtime_ns = l.mtime_ns'):
+                    found[tuple(row[:4])] = {
+                        'partial': row[5] if row[4] == block_size else None,
+                        'full': row[6],
+                    }
+            if found:
+                conn.executemany('UPDATE hashes SET last_used = ? WHERE dev = ? AND ino = ? '
+                                 'AND size = ? AND mtime_ns = ?', [(now,) + k for k in found])
+            conn.commit()
+        return found
+
+    def store_many(self, digests: Dict[HashKey, Dict], block_size: int) -> None:
+        """Grava digests novos ({chave: {'partial': ..., 'full': ...}}) e aplica o limite LRU."""
+        if not digests:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._conn
+            # INSERT OR IGNORE + UPDATE em vez de ON CONFLICT DO UPDATE (SQLite >= 3.24):
+            # um digest novo não apaga o outro já guardado para a mesma chave
+            conn.executemany('INSERT OR IGNORE INTO hashes VALUES (?, ?, ?, ?, ?, NULL, NULL, ?)',
+                             [key + (block_size, now) for key in digests])
+            conn.executemany(
+                'UPDATE hashes SET partial = COALESCE(?1, partial), '
+                'block_size = CASE WHEN ?1 IS NULL THEN block_size ELSE ?2 END, '
+                'full = COALESCE(?3, full), last_used = ?4 '
+                'WHERE dev = ?5 AND ino = ?6 AND size = ?7 AND mtime_ns = ?8',
+                [(d.get('partial'), block_size, d.get('full'), now) + key for key, d in digests.items()])
+            self._evict()
+            conn.commit()
+
+    def _evict(self) -> None:
+        (count,) = self._conn.execute('SELECT COUNT(*) FROM hashes').fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self._conn.execute('DELETE FROM hashes WHERE rowid IN '
+                               '(SELECT rowid FROM hashes ORDER BY last_used LIMIT ?)', (excess,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM hashes').fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,304 @@
+"""
+Análise de logs do sistema e compressão no lugar para o Paguro Boost
+
+Mede os arquivos do journald (/var/log/journal ou /run/log/journal) e a
+árvore de /var/log, separando logs ativos, rotacionados já comprimidos e
+rotacionados sem compressão (ex.: syslog.1, app.log.2, messages-20240101).
+Os rotacionados sem compressão são comprimidos com gzip ou lzma da
+biblioteca padrão, em paralelo, com leitura amigável ao page cache.
+
+Logs ainda abertos por algum processo (ex.: o .1 deixado sem compressão
+pelo delaycompress do logrotate enquanto o daemon ainda escreve nele) não
+são comprimidos; sem a tabela completa de arquivos abertos (/proc), a
+rotação mais recente de cada log também é mantida.
+
+Em vez de apagar o journal por idade, o tamanho alvo de
+`journalctl --vacuum-size` é calculado a partir de uma meta de espaço livre
+no sistema de arquivos do journal.
+"""
+
+import errno
+import gzip
+import lzma
+import os
+import re
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .disk_scanner import DiskScanner, ScanEntry, allocated_size
+from .fileio import BulkFile
+
+
+LOG_DIR = '/var/log'
+JOURNAL_DIRS = ('/var/log/journal', '/run/log/journal')
+
+COMPRESSED_SUFFIXES = ('.gz', '.xz', '.bz2', '.zst', '.lz4', '.zip')
+# app.log.1, syslog.2, messages-20240101, auth.log-2024010112
+_ROTATED = re.compile(r'(\.\d+|[-_.]\d{8}(\d{2})?)$')
+COMPRESSORS = {'gzip': '.gz', 'xz': '.xz'}
+
+_FD_SUPPORTED = all(f in os.supports_dir_fd for f in (os.open, os.stat, os.rename, os.unlink, os.utime))
+_DIR_FLAGS = (os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0) | getattr(os, 'O_NOFOLLOW', 0)
+              | getattr(os, 'O_CLOEXEC', 0))
+
+# Maiores arquivos mantidos no relatório
+TOP_FILES = 20
+
+
+def classify_log(name: str) -> str:
+    """'journal', 'compressed', 'rotated' (sem compressão) ou 'active'."""
+    if name.endswith('.journal') or name.endswith('.journal~'):
+        return 'journal'
+    if name.endswith(COMPRESSED_SUFFIXES):
+        return 'compressed'
+    if _ROTATED.search(name):
+        return 'rotated'
+    return 'active'
+
+
+def is_archived_journal(name: str) -> bool:
+    """Journal arquivado (system@...journal) ou sujo (.journal~): removível pelo vacuum."""
+    return name.endswith('.journal~') or ('@' in name and name.endswith('.journal'))
+
+
+def vacuum_size_target(journal_bytes: int, free_bytes: int, total_bytes: int,
+                       target_free_percent: float, min_bytes: int = 0) -> Optional[int]:
+    """
+    Tamanho para `journalctl --vacuum-size` que leva o espaço livre à meta.
+
+    None quando o sistema de arquivos já está dentro da meta ou o journal
+    não pode encolher além de min_bytes.
+    """
+    need = int(total_bytes * target_free_percent / 100) - free_bytes
+    if need <= 0:
+        return None
+    target = max(min_bytes, journal_bytes - need)
+    return target if target < journal_bytes else None
+
+
+def vacuum_candidates(journal_files: Iterable[ScanEntry], target: int) -> List[ScanEntry]:
+    """Arquivos que o vacuum removeria para chegar a target: arquivados, do mais antigo ao mais novo."""
+    files = list(journal_files)
+    total = sum(f.allocated for f in files)
+    chosen = []
+    for entry in sorted((f for f in files if is_archived_journal(f.name)), key=lambda f: f.mtime):
+        if total <= target:
+            break
+        chosen.append(entry)
+        total -= entry.allocated
+    return chosen
+
+
+def open_files(proc: str = '/proc') -> Tuple[Set[Tuple[int, int]], bool]:
+    """
+    (st_dev, st_ino) dos arquivos regulares abertos por algum processo.
+
+    O segundo valor diz se a tabela está completa: False sem /proc ou se o
+    fd de algum processo não pôde ser lido (ex.: sem root).
+    """
+    try:
+        pids = [pid for pid in os.listdir(proc) if pid.isdigit()]
+    except OSError:
+        return set(), False
+    held: Set[Tuple[int, int]] = set()
+    complete = True
+    for pid in pids:
+        fd_dir = os.path.join(proc, pid, 'fd')
+        try:
+            fds = os.listdir(fd_dir)
+        except FileNotFoundError:
+            continue  # processo terminou
+        except OSError:
+            complete = False
+            continue
+        for fd in fds:
+            try:
+                st = os.stat(os.path.join(fd_dir, fd))
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                held.add((st.st_dev, st.st_ino))
+    return held, complete
+
+
+def newest_rotations(paths: Iterable[str]) -> Set[str]:
+    """A rotação mais recente (mtime) de cada log entre os caminhos dados."""
+    newest: Dict[Tuple[str, str], Tuple[float, str]] = {}
+    for path in paths:
+        try:
+            mtime = os.lstat(path).st_mtime
+        except OSError:
+            continue
+        directory, name = os.path.split(path)
+        key = (directory, _ROTATED.sub('', name))
+        if key not in newest or mtime > newest[key][0]:
+            newest[key] = (mtime, path)
+    return {path for _, path in newest.values()}
+
+
+def _compressor(method: str, raw, st: os.stat_result, name: str, level: Optional[int]):
+    if method == 'gzip':
+        return gzip.GzipFile(filename=name, mode='wb', fileobj=raw, mtime=int(st.st_mtime),
+                             compresslevel=9 if level is None else level)
+    return lzma.LZMAFile(raw, 'wb', preset=6 if level is None else level)
+
+
+def compress_file(path: str, method: str = 'gzip', level: Optional[int] = None, throttle=None) -> Dict:
+    """
+    Comprime path em path + sufixo e remove o original.
+
+    O resultado é gravado em um temporário, sincronizado e renomeado; dono,
+    permissões e datas do original são preservados. Tudo é feito relativo
+    ao diretório do log, sem seguir links simbólicos, e o arquivo lido tem
+    de ser o mesmo inode conferido: se ele for trocado ou mudar durante a
+    compressão, nada é alterado (OSError EAGAIN).
+    """
+    if method not in COMPRESSORS:
+        raise ValueError(f"método de compressão inválido: {method}")
+    directory, name = os.path.split(path)
+    dir_fd = os.open(directory or os.curdir, _DIR_FLAGS) if _FD_SUPPORTED else None
+    try:
+        return _compress_at(dir_fd, path, name if dir_fd is not None else path, method, level, throttle)
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+
+
+def _compress_at(dir_fd: Optional[int], path: str, name: str, method: str,
+                 level: Optional[int], throttle) -> Dict:
+    st = os.stat(name, dir_fd=dir_fd, follow_symlinks=False)
+    if not stat.S_ISREG(st.st_mode) or st.st_nlink > 1:
+        raise OSError(errno.EINVAL, 'não é um arquivo regular sem outros links', path)
+    target = name + COMPRESSORS[method]
+    try:
+        os.stat(target, dir_fd=dir_fd, follow_symlinks=False)
+        raise OSError(errno.EEXIST, 'destino já existe', path + COMPRESSORS[method])
+    except FileNotFoundError:
+        pass
+
+    temp = target + '.paguro-tmp'
+    fd = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_NOFOLLOW', 0)
+                 | getattr(os, 'O_CLOEXEC', 0), stat.S_IMODE(st.st_mode), dir_fd=dir_fd)
+    try:
+        # O modo de os.open passa pela umask
+        if hasattr(os, 'fchmod'):
+            os.fchmod(fd, stat.S_IMODE(st.st_mode))
+        with os.fdopen(fd, 'wb') as raw:
+            with _compressor(method, raw, st, os.path.basename(path), level) as out, \
+                    BulkFile(name, dir_fd=dir_fd, follow_symlinks=False) as src:
+                opened = os.fstat(src.fd)
+                if (opened.st_dev, opened.st_ino) != (st.st_dev, st.st_ino):
+                    raise OSError(errno.EAGAIN, 'trocado durante a compressão', path)
+                for chunk in src.chunks():
+                    if throttle is not None:
+                        throttle.wait(nbytes=len(chunk))
+                    out.write(chunk)
+            raw.flush()
+            os.fsync(raw.fileno())
+            current = os.stat(name, dir_fd=dir_fd, follow_symlinks=False)
+            if (current.st_dev, current.st_ino, current.st_size, current.st_mtime_ns) != \
+                    (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns):
+                raise OSError(errno.EAGAIN, 'modificado durante a compressão', path)
+            try:
+                os.fchown(raw.fileno(), st.st_uid, st.st_gid)
+            except (PermissionError, AttributeError):
+                pass
+        os.utime(temp, ns=(st.st_atime_ns, st.st_mtime_ns), dir_fd=dir_fd)
+        os.rename(temp, target, src_dir_fd=dir_fd, dst_dir_fd=dir_fd)
+    except BaseException:
+        try:
+            os.unlink(temp, dir_fd=dir_fd)
+        except OSError:
+            pass
+        raise
+    os.unlink(name, dir_fd=dir_fd)
+    return {'path': path, 'target': path + COMPRESSORS[method], 'before': allocated_size(st),
+            'after': allocated_size(os.stat(target, dir_fd=dir_fd, follow_symlinks=False))}
+
+
+class LogAnalyzer:
+    """Tamanho do journal e de /var/log por classe de arquivo e compressão dos rotacionados."""
+
+    def __init__(self, scanner: Optional[DiskScanner] = None, log_dir: str = LOG_DIR,
+                 journal_dirs: Iterable[str] = JOURNAL_DIRS):
+        self.scanner = scanner or DiskScanner()
+        self.log_dir = log_dir
+        self.journal_dirs = [d for d in journal_dirs if os.path.isdir(d)]
+
+    def analyze(self) -> Dict:
+        """Totais por classe, arquivos do journal, rotacionados sem compressão e maiores arquivos."""
+        classes = {c: {'count': 0, 'size': 0, 'allocated': 0} for c in ('active', 'rotated', 'compressed')}
+        journal: List[ScanEntry] = []
+        rotated: List[ScanEntry] = []
+        files: List[ScanEntry] = []
+        for entry in self.scanner.scan([self.log_dir] + self.journal_dirs):
+            if entry.is_dir:
+                continue
+            files.append(entry)
+            kind = classify_log(entry.name)
+            if kind == 'journal':
+                journal.append(entry)
+                continue
+            bucket = classes[kind]
+            bucket['count'] += 1
+            bucket['size'] += entry.size
+            bucket['allocated'] += entry.allocated
+            if kind == 'rotated':
+                rotated.append(entry)
+
+        archived = [e for e in journal if is_archived_journal(e.name)]
+        return {
+            'journal': {
+                'files': len(journal),
+                'archived': len(archived),
+                'size': sum(e.size for e in journal),
+                'allocated': sum(e.allocated for e in journal),
+                'archived_allocated': sum(e.allocated for e in archived),
+                'oldest': min((e.mtime for e in journal), default=None),
+                'entries': journal,
+            },
+            'classes': classes,
+            'rotated_uncompressed': sorted(rotated, key=lambda e: e.size, reverse=True),
+            'largest': sorted(files, key=lambda e: e.allocated, reverse=True)[:TOP_FILES],
+        }
+
+    @staticmethod
+    def compress(paths: Iterable[str], method: str = 'gzip', level: Optional[int] = None,
+                 max_workers: int = 4, throttle=None, skip_open: bool = True) -> Dict:
+        """
+        Comprime os arquivos em paralelo; retorna arquivos, bytes antes/depois,
+        economia, falhas e arquivos mantidos por ainda estarem em uso (busy).
+        """
+        report = {'files': 0, 'before': 0, 'after': 0, 'saved': 0, 'failures': 0, 'busy': 0, 'errors': []}
+        paths = list(paths)
+        if skip_open:
+            held, complete = open_files()
+            keep = set() if complete else newest_rotations(paths)
+            selected = []
+            for path in paths:
+                try:
+                    st = os.lstat(path)
+                except OSError:
+                    continue
+                if path in keep or (st.st_dev, st.st_ino) in held:
+                    report['busy'] += 1
+                else:
+                    selected.append(path)
+            paths = selected
+        initializer = throttle.worker_init if throttle else None
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), initializer=initializer) as pool:
+            futures = {pool.submit(compress_file, path, method, level, throttle): path for path in paths}
+            for future, path in futures.items():
+                try:
+                    result = future.result()
+                except OSError as e:
+                    report['failures'] += 1
+                    if len(report['errors']) < 20:
+                        report['errors'].append({'path': path, 'error': e.strerror or str(e)})
+                    continue
+                report['files'] += 1
+                report['before'] += result['before']
+                report['after'] += result['after']
+        report['saved'] = report['before'] - report['after']
+        return report
@@ -0,0 +1,112 @@
+"""
+Medição estatística antes/depois de otimizações para o Paguro Boost
+
+Cada operação é cercada por N amostras em cadência fixa; o efeito é
+reportado como a diferença das medianas com intervalo de confiança por
+bootstrap, em vez de uma única leitura antes e depois.
+"""
+
+import os
+import random
+import statistics
+import time
+from typing import Callable, Dict, List, Optional
+import psutil
+
+
+def resource_sampler() -> Dict[str, float]:
+    """Amostra CPU, memória e disco do sistema (não bloqueante)."""
+    mem = psutil.virtual_memory()
+    disk = psutil.disk_usage('C:\\' if os.name == 'nt' else '/')
+    return {
+        'cpu_percent': psutil.cpu_percent(interval=None),
+        'memory_percent': mem.percent,
+        'memory_used': float(mem.used),
+        'disk_used': float(disk.used),
+    }
+
+
+def memory_sampler() -> Dict[str, float]:
+    """Amostra apenas a memória usada (bytes)."""
+    return {'memory_used': float(psutil.virtual_memory().used)}
+
+
+def collect_samples(sampler: Callable[[], Dict[str, float]], samples: int,
+                    interval: float) -> Dict[str, List[float]]:
+    """Coleta N amostras em cadência fixa, agrupadas por métrica."""
+    series: Dict[str, List[float]] = {}
+    start = time.monotonic()
+    for i in range(samples):
+        # Cadência fixa: dormir até o instante programado, não um intervalo após a coleta
+        delay = start + i * interval - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        for name, value in sampler().items():
+            series.setdefault(name, []).append(value)
+    return series
+
+
+def median_delta(before: List[float], after: List[float], confidence: float = 0.95,
+                 resamples: int = 2000, seed: Optional[int] = 0) -> Dict:
+    """
+    Diferença das medianas (depois - antes) com intervalo de confiança por bootstrap.
+
+    O efeito é considerado significativo quando o intervalo não contém zero.
+    """
+    rng = random.Random(seed)
+    before_median = statistics.median(before)
+    after_median = statistics.median(after)
+    delta = after_median - before_median
+
+    deltas = []
+    for _ in range(resamples):
+        b = [rng.choice(before) for _ in before]
+        a = [rng.choice(after) for _ in after]
+        deltas.append(statistics.median(a) - statistics.median(b))
+    deltas.sort()
+    alpha = (1 - confidence) / 2
+    low = deltas[int(alpha * (resamples - 1))]
+    high = deltas[int((1 - alpha) * (resamples - 1))]
+
+    return {
+        'before_median': before_median,
+        'after_median': after_median,
+        'delta': delta,
+        'ci_low': low,
+        'ci_high': high,
+        'confidence': confidence,
+        'significant': low > 0 or high < 0,
+        'samples': (len(before), len(after)),
+    }
+
+
+def measure_operation(operation: Callable, sampler: Callable[[], Dict[str, float]] = resource_sampler,
+                      samples: int = 5, interval: float = 0.5,
+                      confidence: float = 0.95) -> Dict:
+    """Executa a operação entre duas séries de amostras e calcula o efeito por métrica."""
+    # Primeira leitura de cpu_percent(interval=None) é sempre 0.0: descartar
+    sampler()
+
+    before = collect_samples(sampler, samples, interval)
+    started = time.monotonic()
+    error = None
+    result = None
+    try:
+        result = operation()
+    except Exception as e:
+        error = e
+    duration = time.monotonic() - started
+    after = collect_samples(sampler, samples, interval)
+
+    effects = {}
+    for name, values in before.items():
+        if after.get(name):
+            effects[name] = median_delta(values, after[name], confidence)
+
+    return {
+        'result': result,
+        'error': error,
+        'duration': duration,
+        'interval': interval,
+        'effects': effects,
+    }
@@ -7,6 +7,34 @@ import psutil
 import threading
 
 
+PRESSURE_DIR = '/proc/pressure'
+PRESSURE_RESOURCES = ('cpu', 'memory', 'io')
+
+
+def parse_pressure(text: str) -> Dict:
+    """Interpreta o conteúdo de um arquivo PSI (linhas some/full)."""
+    result = {}
+    for line in text.splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        values = {}
+        for field in parts[1:]:
+            key, _, value = field.partition('=')
+            values[key] = int(value) if key == 'total' else float(value)
+        result[parts[0]] = values
+    return result
+
+
+def read_pressure_file(path: str) -> Optional[Dict]:
+    """Lê um arquivo PSI; retorna None se não existir ou não for legível."""
+    try:
+        with open(path, 'r') as f:
+            return parse_pressure(f.read())
+    except (OSError, IOError, ValueError):
+        return None
+
+
 class SystemMetrics:
     def __init__(self, history_file: str = "system_metrics.json"):
         self.history_file = history_file
@@ -15,6 +43,13 @@ class SystemMetrics:
         self.monitor_interval = 30  # segundos
         self.history_data = self._load_history()
         
+        # PSI: último total lido por consumidor, para converter contadores em taxas
+        self._pressure_lock = threading.Lock()
+        self._pressure_previous = {}
+        self.pressure_triggers = []
+        self.pressure_interval = 2.0  # segundos
+        self.pressure_thread = None
+        
     def _load_history(self) -> List[Dict]:
         """Carrega histórico de métricas do arquivo."""
         if os.path.exists(self.history_file):
@@ -54,6 +89,12 @@ class SystemMetrics:
             top_cpu_processes = self._get_top_processes_cpu()
             top_memory_processes = self._get_top_processes_memory()
             
+            # Pressure stall information (Linux)
+            pressure = self.get_pressure('metrics')
+            
+            # Memória por cgroup v2 (slices/serviços)
+            cgroups = self._get_top_cgroups()
+            
             metrics = {
                 'timestamp': datetime.now().isoformat(),
                 'cpu': {
@@ -85,6 +126,8 @@ class SystemMetrics:
                     'top_memory': top_memory_processes
                 },
                 'temperatures': temperatures,
+                'pressure': pressure,
+                'cgroups': cgroups,
                 'boot_time': psutil.boot_time()
             }
             
@@ -109,6 +152,137 @@ class SystemMetrics:
             pass
         return {}
     
+    def pressure_available(self) -> bool:
+        """Indica se o kernel expõe PSI em /proc/pressure."""
+        return os.path.exists(os.path.join(PRESSURE_DIR, 'memory'))
+    
+    def get_pressure(self, consumer: str = 'default') -> Dict:
+        """
+        Coleta PSI de cpu/memory/io.
+        
+        Além de avg10/avg60/avg300/total, cada linha recebe 'rate': a fração
+        (%) do tempo com tarefas paradas desde a leitura anterior do mesmo
+        consumidor, derivada do contador 'total' (microssegundos).
+        """
+        now = time.monotonic()
+        pressure = {}
+        for resource in PRESSURE_RESOURCES:
+            data = read_pressure_file(os.path.join(PRESSURE_DIR, resource))
+            if data:
+                pressure[resource] = data
+        
+        if not pressure:
+            return {}
+        
+        with self._pressure_lock:
+            previous = self._pressure_previous.get(consumer)
+            self._pressure_previous[consumer] = (now, pressure)
+        
+        for resource, lines in pressure.items():
+            for kind, values in lines.items():
+                values['rate'] = None
+                if previous:
+                    prev_time, prev_pressure = previous
+                    prev_total = prev_pressure.get(resource, {}).get(kind, {}).get('total')
+                    elapsed_us = (now - prev_time) * 1_000_000
+                    if prev_total is not None and elapsed_us > 0:
+                        delta = max(0, values['total'] - prev_total)
+                        values['rate'] = min(100.0, (delta / elapsed_us) * 100)
+        
+        return pressure
+    
+    def register_pressure_trigger(self, resource: str, threshold: float, callback,
+                                  kind: str = 'some', cooldown: float = 300.0) -> Dict:
+        """
+        Registra um gatilho PSI verificado por polling dos arquivos de pressão.
+        
+        O callback recebe os valores da linha (resource/kind) quando a taxa de
+        stall ultrapassa o limite (%), respeitando o intervalo de cooldown.
+        """
+        trigger = {
+            'resource': resource,
+            'kind': kind,
+            'threshold': threshold,
+            'callback': callback,
+            'cooldown': cooldown,
+            'last_fired': None,
+        }
+        self.pressure_triggers.append(trigger)
+        if self.monitoring:
+            self._start_pressure_watch()
+        return trigger
+    
+    def remove_pressure_trigger(self, trigger: Dict) -> bool:
+        """Remove um gatilho PSI registrado."""
+        if trigger in self.pressure_triggers:
+            self.pressure_triggers.remove(trigger)
+            return True
+        return False
+    
+    def check_pressure_triggers(self, pressure: Optional[Dict] = None) -> List[Dict]:
+        """Avalia os gatilhos PSI e dispara os que ultrapassaram o limite."""
+        if not self.pressure_triggers:
+            return []
+        if pressure is None:
+            pressure = self.get_pressure('triggers')
+        
+        fired = []
+        now = time.monotonic()
+        for trigger in list(self.pressure_triggers):
+            values = pressure.get(trigger['resource'], {}).get(trigger['kind'])
+            if not values:
+                continue
+            # Sem taxa ainda (primeira leitura): usar a média de 10s do kernel
+            stall = values['rate'] if values.get('rate') is not None else values.get('avg10', 0.0)
+            if stall < trigger['threshold']:
+                continue
+            if trigger['last_fired'] is not None and now - trigger['last_fired'] < trigger['cooldown']:
+                continue
+            trigger['last_fired'] = now
+            try:
+                trigger['callback'](values)
+            except Exception as e:
+                print(f"Erro no gatilho de pressão ({trigger['resource']}): {e}")
+            fired.append(trigger)
+        return fired
+    
+    def _start_pressure_watch(self):
+        """Inicia a thread de polling dos gatilhos PSI."""
+        if self.pressure_thread and self.pressure_thread.is_alive():
+            return
+        if not self.pressure_available():
+            return
+        self.pressure_thread = threading.Thread(target=self._pressure_loop, daemon=True)
+        self.pressure_thread.start()
+    
+    def _pressure_loop(self):
+        """Loop de polling dos arquivos PSI para os gatilhos."""
+        while self.monitoring and self.pressure_triggers:
+            try:
+                self.check_pressure_triggers()
+            except Exception as e:
+                print(f"Erro no monitoramento de pressão: {e}")
+            time.sleep(self.pressure_interval)
+    
+    def _get_top_cgroups(self, limit: int = 10) -> List[Dict]:
+        """Obtém os cgroups v2 com maior uso de memória."""
+        try:
+            from .cgroups import sweep_cgroups
+            top = []
+            for cg in sweep_cgroups()[:limit]:
+                top.append({
+                    'name': cg['name'],
+                    'current': cg['current'],
+                    'anon': cg['anon'],
+                    'file': cg['file'],
+                    'slab': cg['slab'],
+                    'pressure_some_avg10': cg['pressure'].get('some', {}).get('avg10'),
+                    'pressure_full_avg10': cg['pressure'].get('full', {}).get('avg10')
+                })
+            return top
+        except Exception:
+            return []
+    
     def _get_top_processes_cpu(self, limit: int = 5) -> List[Dict]:
         """Obtém top processos por uso de CPU."""
         try:
@@ -160,12 +334,44 @@ class SystemMetrics:
         
         self._save_history()
     
+    def add_event(self, event_type: str, label: str, data: Optional[Dict] = None) -> Dict:
+        """Adiciona ao histórico um evento anotado (ex.: efeito medido de uma otimização)."""
+        event = {
+            'timestamp': datetime.now().isoformat(),
+            'event': {
+                'type': event_type,
+                'label': label,
+                'data': data or {}
+            }
+        }
+        self.add_metrics_to_history(event)
+        return event
+    
+    def get_events(self, hours: int = 24, event_type: Optional[str] = None) -> List[Dict]:
+        """Obtém eventos anotados das últimas N horas."""
+        cutoff_time = datetime.now() - timedelta(hours=hours)
+        
+        events = []
+        for entry in self.history_data:
+            event = entry.get('event')
+            if not event or (event_type and event.get('type') != event_type):
+                continue
+            try:
+                if datetime.fromisoformat(entry['timestamp']) >= cutoff_time:
+                    events.append(entry)
+            except (ValueError, KeyError):
+                continue
+        
+        return events
+    
     def get_metrics_in_range(self, hours: int = 24) -> List[Dict]:
         """Obtém métricas das últimas N horas."""
         cutoff_time = datetime.now() - timedelta(hours=hours)
         
         filtered_metrics = []
         for metric in self.history_data:
+            if 'event' in metric:  # Eventos anotados não são amostras
+                continue
             try:
                 metric_time = datetime.fromisoformat(metric['timestamp'])
                 if metric_time >= cutoff_time:
@@ -225,6 +431,8 @@ class SystemMetrics:
         self.monitoring = True
         self.monitor_thread = threading.Thread(target=self._monitoring_loop, daemon=True)
         self.monitor_thread.start()
+        if self.pressure_triggers:
+            self._start_pressure_watch()
         return True
     
     def stop_monitoring(self):
@@ -232,6 +440,8 @@ class SystemMetrics:
         self.monitoring = False
         if self.monitor_thread:
             self.monitor_thread.join(timeout=2)
+        if self.pressure_thread:
+            self.pressure_thread.join(timeout=2)
     
     def _monitoring_loop(self):
         """Loop principal de monitoramento."""
@@ -277,6 +487,7 @@ class SystemMetrics:
             },
             'patterns': patterns,
             'recommendations': recommendations,
+            'optimization_events': self.get_events(hours, 'optimization'),
             'generated_at': datetime.now().isoformat()
         }
     
@@ -0,0 +1,206 @@
+"""
+Pontos de montagem e exclusões para a varredura de disco do Paguro Boost
+
+Lê /proc/self/mountinfo para reconhecer fronteiras de sistemas de arquivos,
+pular sistemas virtuais e de rede, ignorar bind mounts de árvores já
+percorridas e saber se cada dispositivo é rotacional. PathTrie responde
+"este caminho está sob algum diretório excluído?" em O(profundidade).
+"""
+
+import os
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set
+
+
+MOUNTINFO_FILE = '/proc/self/mountinfo'
+
+# Sistemas de arquivos virtuais (sem dados em disco)
+PSEUDO_FILESYSTEMS = frozenset({
+    'proc', 'sysfs', 'devtmpfs', 'devpts', 'cgroup', 'cgroup2', 'pstore', 'securityfs',
+    'debugfs', 'tracefs', 'configfs', 'fusectl', 'mqueue', 'hugetlbfs', 'bpf', 'autofs',
+    'binfmt_misc', 'efivarfs', 'rpc_pipefs', 'nsfs', 'selinuxfs', 'ramfs', 'squashfs',
+})
+
+# Sistemas de arquivos de rede (lentos e compartilhados com outras máquinas)
+NETWORK_FILESYSTEMS = frozenset({
+    'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'ncpfs', 'afs', 'ceph', 'glusterfs', '9p',
+    'fuse.sshfs', 'fuse.rclone', 'fuse.s3fs', 'fuse.gcsfuse', 'davfs', 'fuse.davfs2',
+})
+
+
+class MountInfo(NamedTuple):
+    """Linha de /proc/self/mountinfo."""
+    mount_id: int
+    parent_id: int
+    dev: int
+    root: str
+    mount_point: str
+    fstype: str
+    source: str
+
+
+def _unescape(field: str) -> str:
+    # Espaços, tabs e barras invertidas vêm codificados em octal (\040)
+    if '\\' not in field:
+        return field
+    out, i = [], 0
+    while i < len(field):
+        if field[i] == '\\' and field[i + 1:i + 4].isdigit():
+            out.append(chr(int(field[i + 1:i + 4], 8)))
+            i += 4
+        else:
+            out.append(field[i])
+            i += 1
+    return ''.join(out)
+
+
+def parse_mountinfo(text: str) -> List[MountInfo]:
+    """Converte o conteúdo de /proc/self/mountinfo em uma lista de MountInfo."""
+    mounts = []
+    for line in text.splitlines():
+        pre, sep, post = line.partition(' - ')
+        if not sep:
+            continue
+        fields, tail = pre.split(), post.split()
+        if len(fields) < 5 or len(tail) < 2:
+            continue
+        major, _, minor = fields[2].partition(':')
+        mounts.append(MountInfo(
+            mount_id=int(fields[0]),
+            parent_id=int(fields[1]),
+            dev=os.makedev(int(major), int(minor)),
+            root=_unescape(fields[3]),
+            mount_point=_unescape(fields[4]),
+            fstype=tail[0],
+            source=_unescape(tail[1]),
+        ))
+    return mounts
+
+
+class MountTable:
+    """Tabela de montagens com as decisões de travessia da varredura."""
+
+    def __init__(self, mounts: Iterable[MountInfo] = ()):
+        self.mounts = list(mounts)
+        self._by_point = {m.mount_point: m for m in self.mounts}
+
+    @classmethod
+    def load(cls, path: str = MOUNTINFO_FILE) -> 'MountTable':
+        """Lê a tabela do sistema; vazia onde mountinfo não existe (Windows, macOS)."""
+        try:
+            with open(path, 'r') as f:
+                return cls(parse_mountinfo(f.read()))
+        except (OSError, ValueError):
+            return cls()
+
+    def mount_for(self, path: str) -> Optional[MountInfo]:
+        """Montagem que contém path (prefixo mais longo)."""
+        current = os.path.abspath(path)
+        while True:
+            mount = self._by_point.get(current)
+            if mount is not None:
+                return mount
+            parent = os.path.dirname(current)
+            if parent == current:
+                return None
+            current = parent
+
+    def bind_duplicates(self) -> Set[str]:
+        """Pontos de montagem que reexpõem uma árvore já visível em outra montagem."""
+        by_dev: Dict[int, List[MountInfo]] = {}
+        for mount in self.mounts:
+            by_dev.setdefault(mount.dev, []).append(mount)
+        duplicates = set()
+        for mounts in by_dev.values():
+            kept: List[MountInfo] = []
+            for mount in sorted(mounts, key=lambda m: (m.root.count('/'), len(m.root), m.mount_id)):
+                prefix = mount.root.rstrip('/') + '/'
+                if any(k.root == '/' or k.root == mount.root or prefix.startswith(k.root.rstrip('/') + '/')
+                       for k in kept):
+                    duplicates.add(mount.mount_point)
+                else:
+                    kept.append(mount)
+        return duplicates
+
+    def skipped_mount_points(self, skip_pseudo: bool = True, skip_network: bool = True) -> Set[str]:
+        """Pontos de montagem que a varredura não deve atravessar."""
+        skipped = self.bind_duplicates()
+        for mount in self.mounts:
+            if (skip_pseudo and mount.fstype in PSEUDO_FILESYSTEMS) or \
+                    (skip_network and mount.fstype in NETWORK_FILESYSTEMS):
+                skipped.add(mount.mount_point)
+        # A montagem raiz nunca é pulada
+        skipped.discard('/')
+        return skipped
+
+
+def is_rotational(dev: int) -> bool:
+    """Indica se o dispositivo de bloco é um disco rotacional (HDD)."""
+    if not hasattr(os, 'major'):
+        return False
+    try:
+        base = os.path.realpath(f'/sys/dev/block/{os.major(dev)}:{os.minor(dev)}')
+    except (OSError, ValueError):
+        return False
+    # Partições não têm queue/ própria: usar a do disco pai
+    for candidate in (base, os.path.dirname(base)):
+        try:
+            with open(os.path.join(candidate, 'queue', 'rotational'), 'r') as f:
+                return f.read().strip() == '1'
+        except OSError:
+            continue
+    return False
+
+
+class PathTrie:
+    """Trie de componentes de caminho para testar exclusões em O(profundidade)."""
+
+    _END = object()
+
+    def __init__(self, paths: Iterable[str] = ()):
+        self._root: Dict = {}
+        for path in paths:
+            self.add(path)
+
+    @staticmethod
+    def _parts(path: str) -> List[str]:
+        path = os.path.normcase(os.path.abspath(path))
+        drive, rest = os.path.splitdrive(path)
+        return [drive] + [p for p in rest.split(os.sep) if p]
+
+    def add(self, path: str) -> None:
+        # Caminhos de outra plataforma (ex.: C:\\Windows no Linux) não são absolutos aqui
+        if not os.path.isabs(path):
+            return
+        node = self._root
+        for part in self._parts(path):
+            node = node.setdefault(part, {})
+        node[self._END] = True
+
+    def contains(self, path: str) -> bool:
+        """True se path é um caminho excluído ou está sob um."""
+        node = self._root
+        if self._END in node:
+            return True
+        for part in self._parts(path):
+            node = node.get(part)
+            if node is None:
+                return False
+            if self._END in node:
+                return True
+        return False
+
+    def intersects(self, path: str) -> bool:
+        """True se path está excluído ou contém algum caminho excluído."""
+        node = self._root
+        if self._END in node:
+            return True
+        for part in self._parts(path):
+            node = node.get(part)
+            if node is None:
+                return False
+            if self._END in node:
+                return True
+        return bool(node)
+
+    def __bool__(self) -> bool:
+        return bool(self._root)
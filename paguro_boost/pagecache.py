@@ -0,0 +1,201 @@
+"""
+Análise e liberação seletiva do page cache (Linux) para o Paguro Boost
+
+Em vez de descartar todo o page cache via /proc/sys/vm/drop_caches, mede
+quais arquivos ocupam cache (mmap + mincore) e libera apenas os escolhidos
+com posix_fadvise(POSIX_FADV_DONTNEED).
+"""
+
+import ctypes
+import ctypes.util
+import mmap
+import os
+import stat
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+PAGE_SIZE = mmap.PAGESIZE
+
+# Janela de mapeamento por chamada a mincore (limita o vetor de residência)
+_WINDOW_BYTES = 256 * 1024 * 1024
+
+# Apenas o bit menos significativo do vetor do mincore indica residência
+_RESIDENT_TABLE = bytes(b & 1 for b in range(256))
+
+_libc = None
+if hasattr(os, 'posix_fadvise'):
+    try:
+        _libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        _libc.mmap.restype = ctypes.c_void_p
+        _libc.mmap.argtypes = (ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int,
+                               ctypes.c_int, ctypes.c_int, ctypes.c_long)
+        _libc.munmap.restype = ctypes.c_int
+        _libc.munmap.argtypes = (ctypes.c_void_p, ctypes.c_size_t)
+        _libc.mincore.restype = ctypes.c_int
+        _libc.mincore.argtypes = (ctypes.c_void_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_ubyte))
+    except (OSError, AttributeError):
+        _libc = None
+
+_MAP_FAILED = ctypes.c_void_p(-1).value
+
+
+def pagecache_supported() -> bool:
+    """Indica se mincore/posix_fadvise estão disponíveis nesta plataforma."""
+    return _libc is not None
+
+
+def _resident_bytes_fd(fd: int, size: int) -> int:
+    """Conta os bytes de um arquivo aberto que estão no page cache."""
+    resident_pages = 0
+    offset = 0
+    while offset < size:
+        length = min(_WINDOW_BYTES, size - offset)
+        addr = _libc.mmap(None, length, mmap.PROT_READ, mmap.MAP_SHARED, fd, offset)
+        if addr in (None, _MAP_FAILED):
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        try:
+            pages = (length + PAGE_SIZE - 1) // PAGE_SIZE
+            vec = (ctypes.c_ubyte * pages)()
+            if _libc.mincore(addr, length, vec) != 0:
+                err = ctypes.get_errno()
+                raise OSError(err, os.strerror(err))
+            resident_pages += bytes(vec).translate(_RESIDENT_TABLE).count(1)
+        finally:
+            _libc.munmap(addr, length)
+        offset += length
+    return min(size, resident_pages * PAGE_SIZE)
+
+
+def resident_bytes(fd: int, size: int) -> Optional[int]:
+    """Bytes de um arquivo aberto presentes no page cache, ou None se indisponível."""
+    if _libc is None or size <= 0:
+        return None if _libc is None else 0
+    try:
+        return _resident_bytes_fd(fd, size)
+    except OSError:
+        return None
+
+
+def file_residency(path: str) -> Optional[Tuple[int, int]]:
+    """Retorna (tamanho, bytes em cache) de um arquivo regular, ou None se indisponível."""
+    if _libc is None:
+        return None
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0) | getattr(os, 'O_NOATIME', 0))
+    except PermissionError:
+        # O_NOATIME exige ser dono do arquivo
+        try:
+            fd = os.open(path, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+        except OSError:
+            return None
+    except OSError:
+        return None
+    try:
+        st = os.fstat(fd)
+        if not stat.S_ISREG(st.st_mode) or st.st_size == 0:
+            return (st.st_size, 0)
+        return (st.st_size, _resident_bytes_fd(fd, st.st_size))
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+
+def evict_file(path: str) -> Optional[Dict]:
+    """Remove um arquivo do page cache e informa os bytes efetivamente liberados."""
+    if _libc is None:
+        return None
+    before = file_residency(path)
+    if before is None:
+        return None
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+    except OSError:
+        return None
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    after = file_residency(path) or (before[0], before[1])
+    return {
+        'path': path,
+        'size': before[0],
+        'cached_before': before[1],
+        'cached_after': after[1],
+        'reclaimed': max(0, before[1] - after[1]),
+    }
+
+
+class PageCacheAnalyzer:
+    """Identifica arquivos que ocupam page cache e libera os frios ou grandes."""
+
+    def __init__(self, cold_seconds: float = 3600, large_bytes: int = 64 * 1024 * 1024,
+                 min_cached_bytes: int = 1024 * 1024, max_files: int = 20000):
+        self.cold_seconds = cold_seconds
+        self.large_bytes = large_bytes
+        self.min_cached_bytes = min_cached_bytes
+        self.max_files = max_files
+
+    def _iter_files(self, directories: Iterable[str]):
+        """Percorre os diretórios (sem seguir symlinks) produzindo (caminho, stat)."""
+        count = 0
+        stack = [d for d in directories if os.path.isdir(d)]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                yield entry.path, entry.stat(follow_symlinks=False)
+                                count += 1
+                                if count >= self.max_files:
+                                    return
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+
+    def analyze(self, directories: Iterable[str]) -> List[Dict]:
+        """Lista arquivos com pelo menos min_cached_bytes no page cache, maiores primeiro."""
+        now = time.time()
+        cached_files = []
+        for path, st in self._iter_files(directories):
+            # Arquivos menores que o mínimo nunca atingem o limite de cache
+            if st.st_size < self.min_cached_bytes:
+                continue
+            residency = file_residency(path)
+            if residency is None or residency[1] < self.min_cached_bytes:
+                continue
+            cached_files.append({
+                'path': path,
+                'size': residency[0],
+                'cached': residency[1],
+                'idle_seconds': now - max(st.st_atime, st.st_mtime),
+            })
+        cached_files.sort(key=lambda f: f['cached'], reverse=True)
+        return cached_files
+
+    def select(self, cached_files: List[Dict]) -> List[Dict]:
+        """Seleciona arquivos frios (sem acesso recente) ou com muito cache."""
+        return [f for f in cached_files
+                if f['idle_seconds'] >= self.cold_seconds or f['cached'] >= self.large_bytes]
+
+    def evict(self, directories: Iterable[str]) -> Dict:
+        """Analisa, seleciona e libera do cache; retorna relatório por arquivo."""
+        candidates = self.select(self.analyze(directories))
+        files = []
+        for candidate in candidates:
+            result = evict_file(candidate['path'])
+            if result is not None:
+                files.append(result)
+        return {
+            'files': files,
+            'reclaimed': sum(f['reclaimed'] for f in files),
+        }
@@ -0,0 +1,163 @@
+"""
+Agrupamento de processos por aplicação para o Paguro Boost
+"""
+
+import os
+import platform
+import time
+from typing import Dict, List, Optional
+import psutil
+
+
+IS_LINUX = platform.system() == 'Linux'
+
+# Atributos lidos de cada processo em uma única passada
+_SNAPSHOT_ATTRS = ['pid', 'ppid', 'name', 'exe', 'memory_info', 'memory_full_info',
+                   'memory_percent', 'cpu_percent', 'cpu_times']
+
+
+def _read_cgroup_unit(pid: int) -> Optional[str]:
+    """Lê a unidade systemd (cgroup v2) de um processo, se for específica de uma aplicação."""
+    try:
+        with open(f'/proc/{pid}/cgroup', 'r') as f:
+            for line in f:
+                if line.startswith('0::'):
+                    unit = line.strip()[3:].rstrip('/').rsplit('/', 1)[-1]
+                    # Apenas scopes de aplicação e serviços; sessões agregam apps distintos
+                    if (unit.startswith('app-') and unit.endswith('.scope')) or \
+                            (unit.endswith('.service') and not unit.startswith('user@')):
+                        return unit
+    except (OSError, IOError):
+        pass
+    return None
+
+
+def snapshot_processes(interval: float = 0.2) -> List[Dict]:
+    """
+    Captura um snapshot de todos os processos em uma única passada.
+
+    A primeira leitura de cpu_percent de um processo é sempre 0.0: os
+    contadores são iniciados antes e o uso de CPU é medido ao longo de
+    interval segundos (0 mantém uma passada só, sem CPU%).
+    """
+    if interval > 0:
+        # process_iter reaproveita os objetos Process entre chamadas
+        for proc in psutil.process_iter():
+            try:
+                proc.cpu_percent(None)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        time.sleep(interval)
+    snapshot = []
+    for proc in psutil.process_iter(_SNAPSHOT_ATTRS, ad_value=None):
+        try:
+            info = proc.info
+            mem = info.get('memory_info')
+            if mem is None:
+                continue
+            full = info.get('memory_full_info')
+            pss = getattr(full, 'pss', None) if full is not None else None
+            cpu_times = info.get('cpu_times')
+            snapshot.append({
+                'pid': info['pid'],
+                'ppid': info.get('ppid') or 0,
+                'name': info.get('name') or '?',
+                'exe': info.get('exe') or '',
+                'rss': mem.rss,
+                'pss': pss if pss is not None else mem.rss,
+                'memory_percent': info.get('memory_percent') or 0.0,
+                'cpu_percent': info.get('cpu_percent') or 0.0,
+                'cpu_time': (cpu_times.user + cpu_times.system) if cpu_times else 0.0,
+                'cgroup': _read_cgroup_unit(info['pid']) if IS_LINUX else None,
+            })
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+    return snapshot
+
+
+def _app_key(proc: Dict) -> str:
+    """Identifica a aplicação de um processo pelo executável (ou nome)."""
+    if proc['exe']:
+        return os.path.normcase(proc['exe'])
+    return proc['name'].lower()
+
+
+def group_processes(snapshot: List[Dict], total_memory: Optional[int] = None) -> List[Dict]:
+    """
+    Agrupa processos em aplicações.
+
+    Processos no mesmo scope/serviço systemd formam um grupo; fora disso,
+    processos filhos com o mesmo executável do pai são agregados à raiz da
+    árvore (navegadores, apps Electron, pools de workers).
+    """
+    if total_memory is None:
+        total_memory = psutil.virtual_memory().total
+
+    by_pid = {p['pid']: p for p in snapshot}
+    roots: Dict[int, int] = {}
+
+    def find_root(proc: Dict) -> int:
+        chain = []
+        current = proc
+        while True:
+            pid = current['pid']
+            if pid in roots:
+                root = roots[pid]
+                break
+            chain.append(pid)
+            parent = by_pid.get(current['ppid'])
+            if parent is None or parent['pid'] == pid or _app_key(parent) != _app_key(current):
+                root = pid
+                break
+            current = parent
+        for pid in chain:
+            roots[pid] = root
+        return root
+
+    groups: Dict[tuple, Dict] = {}
+    for proc in snapshot:
+        if proc['cgroup']:
+            key = ('cgroup', proc['cgroup'])
+        else:
+            key = ('arvore', find_root(proc))
+
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                'pid': key[1] if key[0] == 'arvore' else proc['pid'],
+                'pids': [],
+                'pss': 0,
+                'rss': 0,
+                'cpu_percent': 0.0,
+                'cpu_time': 0.0,
+                '_maior': proc,
+            }
+        group['pids'].append(proc['pid'])
+        group['pss'] += proc['pss']
+        group['rss'] += proc['rss']
+        group['cpu_percent'] += proc['cpu_percent']
+        group['cpu_time'] += proc['cpu_time']
+        if proc['pss'] > group['_maior']['pss']:
+            group['_maior'] = proc
+
+    result = []
+    for key, group in groups.items():
+        principal = group.pop('_maior')
+        if key[0] == 'arvore':
+            principal = by_pid.get(group['pid'], principal)
+        result.append({
+            'name': principal['name'],
+            'pid': group['pid'],
+            'pids': group['pids'],
+            'processos': len(group['pids']),
+            'agrupamento': key[0],
+            'cgroup': key[1] if key[0] == 'cgroup' else None,
+            'memory_mb': group['pss'] // (1024 * 1024),
+            'rss_mb': group['rss'] // (1024 * 1024),
+            'memory_percent': (group['pss'] / total_memory) * 100 if total_memory else 0.0,
+            'cpu_percent': group['cpu_percent'],
+            'cpu_time': group['cpu_time'],
+        })
+
+    result.sort(key=lambda g: g['memory_mb'], reverse=True)
+    return result
@@ -0,0 +1,470 @@
+"""
+Quarentena reversível para o motor de limpeza do Paguro Boost
+
+Em vez de apagar, o motor de limpeza pode mover cada alvo com rename()
+para uma área de quarentena no mesmo sistema de arquivos: a operação é
+O(1) por item (um diretório inteiro é movido de uma vez), a limpeza visível
+termina em milissegundos e pode ser desfeita.
+
+Cada movimento é registrado em um diário (tabela no banco do índice de
+varredura) com o caminho original; restore() devolve um lote inteiro.
+Passado o período de carência, um trabalhador em segundo plano com
+prioridade idle apaga de fato o conteúdo da quarentena.
+
+A quarentena pode ficar em um diretório gravável por todos (ex.: /tmp em
+tmpfs): a área e cada lote só são usados se forem diretórios reais do
+usuário efetivo sem escrita para outros (0700), e a purga e a restauração
+trabalham sobre descritores de diretório, sem seguir links simbólicos.
+"""
+
+import errno
+import itertools
+import os
+import shutil
+import sqlite3
+import stat
+import threading
+import time
+from typing import Dict, List, Optional, Union
+
+from .config import SCAN_INDEX_FILE
+from .throttle import enter_background
+
+
+QUARANTINE_DIRNAME = '.paguro-quarantine'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quarantine (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch TEXT,
+    original TEXT,
+    stored TEXT,
+    size INTEGER,
+    allocated INTEGER,
+    created REAL,
+    state TEXT
+);
+CREATE INDEX IF NOT EXISTS quarantine_batch ON quarantine (batch);
+CREATE INDEX IF NOT EXISTS quarantine_state ON quarantine (state, created);
+"""
+
+# Linhas do diário acumuladas antes de gravar
+_FLUSH_EVERY = 1000
+
+_FD_SUPPORTED = (os.rename in os.supports_dir_fd and os.open in os.supports_dir_fd
+                 and os.mkdir in os.supports_dir_fd and os.unlink in os.supports_dir_fd
+                 and os.scandir in os.supports_fd)
+_DIR_FLAGS = (os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0) | getattr(os, 'O_NOFOLLOW', 0)
+              | getattr(os, 'O_CLOEXEC', 0))
+
+
+def quarantine_anchor(path: str) -> str:
+    """
+    Diretório onde fica a quarentena de path: o ancestral gravável mais alto
+    dentro do mesmo ponto de montagem (rename não atravessa montagens).
+    """
+    path = os.path.abspath(path)
+    anchor = path
+    current = path
+    while True:
+        if os.access(current, os.W_OK | os.X_OK):
+            anchor = current
+        if os.path.ismount(current):
+            break
+        parent = os.path.dirname(current)
+        if parent == current:
+            break
+        current = parent
+    return anchor
+
+
+def _open_private_dir(name: str, dir_fd: Optional[int] = None, create: bool = True) -> int:
+    """
+    Abre (criando, se pedido) um diretório da quarentena sem seguir links.
+
+    Só é aceito um diretório do usuário efetivo sem escrita para grupo e
+    outros; o modo é então reduzido a 0700. Senão, OSError EPERM.
+    """
+    if create:
+        try:
+            os.mkdir(name, 0o700, dir_fd=dir_fd)
+        except FileExistsError:
+            pass
+    fd = os.open(name, _DIR_FLAGS, dir_fd=dir_fd)
+    st = os.fstat(fd)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.geteuid() or st.st_mode & 0o022:
+        os.close(fd)
+        raise OSError(errno.EPERM, 'diretório da quarentena não é privado', name)
+    if stat.S_IMODE(st.st_mode) != 0o700:
+        os.fchmod(fd, 0o700)
+    return fd
+
+
+def _clear_files(fd: int) -> List[str]:
+    """Apaga o que não é diretório em fd e devolve os nomes dos subdiretórios."""
+    subdirs = []
+    with os.scandir(fd) as it:
+        children = [(entry.name, entry.is_dir(follow_symlinks=False)) for entry in it]
+    for child, is_dir in children:
+        if is_dir:
+            subdirs.append(child)
+        else:
+            os.unlink(child, dir_fd=fd)
+    return subdirs
+
+
+def _remove_at(parent: int, name: str) -> None:
+    """
+    Apaga parent/name (arquivo ou árvore) por descritores, sem seguir links simbólicos.
+
+    Percorre a árvore com uma pilha explícita e um único descritor aberto
+    (volta ao pai por '..', conferindo dispositivo e inode), então a
+    profundidade não esbarra no limite de recursão nem no de descritores.
+    """
+    try:
+        fd = os.open(name, _DIR_FLAGS, dir_fd=parent)
+    except OSError as e:
+        if e.errno not in (errno.ENOTDIR, errno.ELOOP):
+            raise
+        os.unlink(name, dir_fd=parent)
+        return
+    try:
+        st = os.fstat(fd)
+        stack = [(name, (st.st_dev, st.st_ino), _clear_files(fd))]
+        while stack:
+            current, _, subdirs = stack[-1]
+            if subdirs:
+                child = subdirs.pop()
+                try:
+                    child_fd = os.open(child, _DIR_FLAGS, dir_fd=fd)
+                except OSError as e:
+                    if e.errno not in (errno.ENOTDIR, errno.ELOOP):
+                        raise
+                    os.unlink(child, dir_fd=fd)
+                    continue
+                os.close(fd)
+                fd = child_fd
+                st = os.fstat(fd)
+                stack.append((child, (st.st_dev, st.st_ino), _clear_files(fd)))
+                continue
+            stack.pop()
+            if not stack:
+                break
+            up = os.open(os.pardir, _DIR_FLAGS, dir_fd=fd)
+            os.close(fd)
+            fd = up
+            st = os.fstat(fd)
+            if (st.st_dev, st.st_ino) != stack[-1][1]:
+                raise OSError(errno.EAGAIN, 'árvore movida durante a remoção', name)
+            os.rmdir(current, dir_fd=fd)
+    finally:
+        os.close(fd)
+    os.rmdir(name, dir_fd=parent)
+
+
+def _open_parent(path: str) -> int:
+    """
+    Abre o diretório pai de path a partir da raiz, componente a componente,
+    criando os que faltam, sem seguir links simbólicos (OSError ELOOP).
+    """
+    fd = os.open(os.sep, _DIR_FLAGS)
+    try:
+        for part in os.path.dirname(path).split(os.sep):
+            if not part:
+                continue
+            if part == os.pardir:
+                raise OSError(errno.EINVAL, 'caminho não normalizado', path)
+            try:
+                child = os.open(part, _DIR_FLAGS, dir_fd=fd)
+            except FileNotFoundError:
+                try:
+                    os.mkdir(part, dir_fd=fd)
+                except FileExistsError:
+                    pass
+                child = os.open(part, _DIR_FLAGS, dir_fd=fd)
+            os.close(fd)
+            fd = child
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+class Quarantine:
+    """Áreas de quarentena por sistema de arquivos, diário de restauração e purga tardia."""
+
+    QUARANTINED = 'quarantined'
+    RESTORED = 'restored'
+    PURGED = 'purged'
+
+    def __init__(self, path: Optional[str] = None, grace_seconds: float = 86400,
+                 throttle=None, batch: Optional[str] = None):
+        self.path = str(path or SCAN_INDEX_FILE)
+        self.grace_seconds = grace_seconds
+        self.throttle = throttle
+        self.batch = batch or time.strftime('%Y%m%d-%H%M%S') + f'-{os.getpid()}'
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._areas: Dict[str, str] = {}          # âncora -> diretório do lote
+        self._area_fds: Dict[str, int] = {}
+        self._pending: List[tuple] = []
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    # --- movimento para a quarentena ---
+
+    def area_for(self, root: str) -> str:
+        """Diretório do lote atual na quarentena do sistema de arquivos de root."""
+        anchor = quarantine_anchor(root)
+        with self._lock:
+            area = self._areas.get(anchor)
+            if area is None:
+                area = os.path.join(anchor, QUARANTINE_DIRNAME, self.batch)
+                if _FD_SUPPORTED:
+                    root = _open_private_dir(os.path.dirname(area))
+                    try:
+                        self._area_fds[area] = _open_private_dir(self.batch, dir_fd=root)
+                    finally:
+                        os.close(root)
+                else:
+                    os.makedirs(area, mode=0o700, exist_ok=True)
+                self._areas[anchor] = area
+            return area
+
+    def move(self, parent: Union[int, str], name: str, path: str, area: str,
+             size: int, allocated: int) -> str:
+        """
+        Move parent/name (descritor do diretório pai ou caminho) para a área.
+
+        Falha com OSError (ex.: EXDEV, EBUSY); nada é movido nesse caso.
+        """
+        stored_name = f'{next(self._counter):08d}-{name}'
+        stored = os.path.join(area, stored_name)
+        area_fd = self._area_fds.get(area)
+        if isinstance(parent, int) and area_fd is not None:
+            os.rename(name, stored_name, src_dir_fd=parent, dst_dir_fd=area_fd)
+        else:
+            os.rename(path, stored)
+        with self._lock:
+            self._pending.append((self.batch, path, stored, size, allocated, time.time(), self.QUARANTINED))
+            flush = len(self._pending) >= _FLUSH_EVERY
+        if flush:
+            self.flush()
+        return stored
+
+    def flush(self) -> None:
+        """Grava no diário os movimentos pendentes."""
+        with self._lock:
+            if self._pending:
+                self._conn.executemany(
+                    'INSERT INTO quarantine (batch, original, stored, size, allocated, created, state) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)', self._pending)
+                self._conn.commit()
+                self._pending = []
+
+    # --- consulta e restauração ---
+
+    def batches(self) -> List[Dict]:
+        """Lotes ainda em quarentena, do mais recente ao mais antigo."""
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT batch, COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(allocated), 0), MIN(created) '
+                'FROM quarantine WHERE state = ? GROUP BY batch ORDER BY MIN(created) DESC',
+                (self.QUARANTINED,)).fetchall()
+        return [{'batch': r[0], 'items': r[1], 'bytes': r[2], 'allocated': r[3], 'created': r[4]}
+                for r in rows]
+
+    def restore(self, batch: Optional[str] = None) -> Dict:
+        """
+        Devolve os itens de um lote (o mais recente, por padrão) aos caminhos originais.
+
+        Itens cujo caminho original voltou a existir não são sobrescritos.
+        """
+        self.flush()
+        if batch is None:
+            batches = self.batches()
+            if not batches:
+                return {'batch': None, 'restored': 0, 'conflicts': 0, 'failures': 0}
+            batch = batches[0]['batch']
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, original, stored FROM quarantine WHERE batch = ? AND state = ? '
+                'ORDER BY id DESC', (batch, self.QUARANTINED)).fetchall()
+        report = {'batch': batch, 'restored': 0, 'conflicts': 0, 'failures': 0}
+        restored = []
+        area_fds: Dict[str, Union[int, str]] = {}
+        try:
+            for row_id, original, stored in rows:
+                try:
+                    if not _FD_SUPPORTED:
+                        if os.path.lexists(original):
+                            report['conflicts'] += 1
+                            continue
+                        os.makedirs(os.path.dirname(original), exist_ok=True)
+                        os.rename(stored, original)
+                    elif not self._restore_at(area_fds, original, stored):
+                        report['conflicts'] += 1
+                        continue
+                except OSError:
+                    report['failures'] += 1
+                    continue
+                restored.append((self.RESTORED, row_id))
+                report['restored'] += 1
+        finally:
+            for fd in area_fds.values():
+                if isinstance(fd, int):
+                    os.close(fd)
+        with self._lock:
+            self._conn.executemany('UPDATE quarantine SET state = ? WHERE id = ?', restored)
+            self._conn.commit()
+        return report
+
+    def _restore_at(self, area_fds: Dict[str, Union[int, str]], original: str, stored: str) -> bool:
+        """
+        Move stored de volta para original por descritores: o pai de original
+        é aberto desde a raiz sem seguir links (um diretório trocado por um
+        link simbólico, ex.: em /tmp, não desvia a restauração). False se
+        original voltou a existir.
+        """
+        area = os.path.dirname(stored)
+        if area not in area_fds:
+            area_fds[area] = self._open_area(area)
+        parent = _open_parent(original)
+        try:
+            name = os.path.basename(original)
+            try:
+                os.stat(name, dir_fd=parent, follow_symlinks=False)
+                return False
+            except FileNotFoundError:
+                pass
+            os.rename(os.path.basename(stored), name, src_dir_fd=area_fds[area], dst_dir_fd=parent)
+        finally:
+            os.close(parent)
+        return True
+
+    # --- purga ---
+
+    def purge(self, now: Optional[float] = None, grace_seconds: Optional[float] = None) -> Dict[str, int]:
+        """Apaga os itens em quarentena há mais que o período de carência."""
+        self.flush()
+        now = now if now is not None else time.time()
+        grace = self.grace_seconds if grace_seconds is None else grace_seconds
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, stored, allocated FROM quarantine WHERE state = ? AND created <= ?',
+                (self.QUARANTINED, now - grace)).fetchall()
+        report = {'items': 0, 'bytes': 0, 'failures': 0}
+        purged = []
+        areas = set()
+        by_area: Dict[str, List[tuple]] = {}
+        for row in rows:
+            by_area.setdefault(os.path.dirname(row[1]), []).append(row)
+        for area, items in by_area.items():
+            if self._stop.is_set():
+                break
+            try:
+                area_fd = self._open_area(area)
+            except FileNotFoundError:
+                area_fd = None  # lote já apagado: os itens deixam o diário
+            except OSError:
+                report['failures'] += len(items)
+                continue
+            try:
+                for row_id, stored, allocated in items:
+                    if self._stop.is_set():
+                        break
+                    if self.throttle is not None:
+                        self.throttle.wait(ops=1)
+                    try:
+                        if area_fd is not None:
+                            self._remove(area_fd, stored)
+                    except FileNotFoundError:
+                        pass
+                    except OSError:
+                        report['failures'] += 1
+                        continue
+                    purged.append((self.PURGED, row_id))
+                    report['items'] += 1
+                    report['bytes'] += allocated or 0
+            finally:
+                if isinstance(area_fd, int):
+                    os.close(area_fd)
+            areas.add(area)
+        with self._lock:
+            self._conn.executemany('UPDATE quarantine SET state = ? WHERE id = ?', purged)
+            self._conn.commit()
+        # Lotes esvaziados (e a quarentena, se vazia) deixam de existir
+        for area in areas:
+            for directory in (area, os.path.dirname(area)):
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    break
+        return report
+
+    @staticmethod
+    def _open_area(area: str) -> Union[int, str]:
+        """Diretório de um lote aberto e validado como privado (o caminho, sem suporte a dir_fd)."""
+        root = os.path.dirname(area)
+        if os.path.basename(root) != QUARANTINE_DIRNAME:
+            raise OSError(errno.EINVAL, 'fora da quarentena', area)
+        if not _FD_SUPPORTED:
+            if not os.path.isdir(area):
+                raise FileNotFoundError(errno.ENOENT, 'lote inexistente', area)
+            return area
+        root_fd = _open_private_dir(root, create=False)
+        try:
+            return _open_private_dir(os.path.basename(area), dir_fd=root_fd, create=False)
+        finally:
+            os.close(root_fd)
+
+    @staticmethod
+    def _remove(area: Union[int, str], stored: str) -> None:
+        if isinstance(area, int):
+            _remove_at(area, os.path.basename(stored))
+        elif os.path.isdir(stored) and not os.path.islink(stored):
+            shutil.rmtree(stored)
+        else:
+            os.unlink(stored)
+
+    def _purge_loop(self, interval: float) -> None:
+        enter_background(self.throttle.sched_idle if self.throttle is not None else False)
+        while True:
+            try:
+                self.purge()
+            except sqlite3.Error:
+                pass
+            if self._stop.wait(interval):
+                return
+
+    def start_purger(self, interval: float = 3600) -> None:
+        """Inicia a purga periódica em uma thread de baixa prioridade (I/O idle, nice 19)."""
+        if self._worker is None or not self._worker.is_alive():
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._purge_loop, args=(interval,), daemon=True)
+            self._worker.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join()
+        self.flush()
+        for fd in self._area_fds.values():
+            os.close(fd)
+        self._area_fds.clear()
+        # Áreas criadas e não usadas neste lote
+        for area in self._areas.values():
+            for directory in (area, os.path.dirname(area)):
+                try:
+                    os.rmdir(directory)
+                except OSError:
+                    break
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,299 @@
+"""
+Índice persistente de varredura de disco para o Paguro Boost
+
+Guarda em SQLite (em DEFAULT_DATA_DIR) as entradas de cada diretório já
+varrido, junto com inode e mtime do diretório e agregados de tamanho,
+quantidade de arquivos e histograma de extensões. Em uma nova varredura,
+um diretório cujo inode e mtime não mudaram é reaproveitado do índice sem
+listar nem fazer stat dos seus arquivos.
+
+Os totais da subárvore (tree_size/tree_allocated/tree_files) são mantidos por
+deltas: cada gravação de diretório propaga a diferença para os ancestrais
+indexados. Os agregados do índice somam cada hardlink; a deduplicação por
+inode é feita pelos estágios da varredura.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import SCAN_INDEX_FILE
+from .disk_scanner import ScanEntry
+
+
+SCHEMA_VERSION = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    dev INTEGER,
+    ino INTEGER,
+    mtime_ns INTEGER,
+    size INTEGER,
+    allocated INTEGER,
+    files INTEGER,
+    ext_hist TEXT,
+    scanned_at REAL,
+    tree_size INTEGER,
+    tree_allocated INTEGER,
+    tree_files INTEGER
+);
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    dir TEXT,
+    name TEXT,
+    is_dir INTEGER,
+    size INTEGER,
+    mtime REAL,
+    atime REAL,
+    dev INTEGER,
+    ino INTEGER,
+    nlink INTEGER,
+    allocated INTEGER
+);
+CREATE INDEX IF NOT EXISTS entries_dir ON entries (dir);
+CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent);
+"""
+
+# Quantidade de diretórios gravados entre commits
+_COMMIT_EVERY = 500
+
+
+def prefix_range(path: str) -> Tuple[str, str]:
+    """
+    Intervalo [início, fim) que contém todos os caminhos sob path.
+
+    Como o separador é seguido por '0' na ordem ASCII ('/' + 1), a consulta
+    path >= 'x/' AND path < 'x0' usa o índice da chave primária.
+    """
+    prefix = path.rstrip(os.sep) + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+class ScanIndex:
+    """Índice SQLite de diretórios e entradas, compartilhado entre threads da varredura."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = str(path or SCAN_INDEX_FILE)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._writer = self._connect()
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _init_schema(self) -> None:
+        with self._lock:
+            w = self._writer
+            w.executescript(_SCHEMA)
+            row = w.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is not None and int(row[0]) != SCHEMA_VERSION:
+                # Formato antigo: o índice é apenas cache, recomeçar do zero
+                w.executescript('DROP TABLE dirs; DROP TABLE entries;')
+                w.executescript(_SCHEMA)
+            w.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+            w.commit()
+
+    def _reader(self) -> sqlite3.Connection:
+        """Conexão de leitura própria de cada thread (WAL permite leitores concorrentes)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30)
+        return conn
+
+    def lookup(self, path: str, st: os.stat_result) -> Optional[Tuple[List[ScanEntry], List[str]]]:
+        """Entradas e subdiretórios de um diretório inalterado desde a última varredura."""
+        conn = self._reader()
+        row = conn.execute('SELECT dev, ino, mtime_ns FROM dirs WHERE path = ?', (path,)).fetchone()
+        if row is None or tuple(row) != (st.st_dev, st.st_ino, st.st_mtime_ns):
+            return None
+        entries = [ScanEntry(r[0], r[1], bool(r[2]), *r[3:]) for r in conn.execute(
+            'SELECT path, name, is_dir, size, mtime, atime, dev, ino, nlink, allocated '
+            'FROM entries WHERE dir = ?', (path,))]
+        return entries, [e.path for e in entries if e.is_dir]
+
+    def store(self, path: str, st: os.stat_result, entries: Sequence[ScanEntry]) -> None:
+        """Grava a listagem de um diretório e remove subárvores que deixaram de existir."""
+        size = 0
+        allocated = 0
+        files = 0
+        hist: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+        for entry in entries:
+            if entry.is_dir:
+                continue
+            files += 1
+            size += entry.size
+            allocated += entry.allocated
+            data = hist[os.path.splitext(entry.name)[1].lower()]
+            data[0] += 1
+            data[1] += entry.size
+
+        with self._lock:
+            w = self._writer
+            old = w.execute('SELECT size, allocated, files, tree_size, tree_allocated, tree_files '
+                            'FROM dirs WHERE path = ?', (path,)).fetchone()
+            if old is not None:
+                tree = [old[3] + size - old[0], old[4] + allocated - old[1], old[5] + files - old[2]]
+            else:
+                # Subdiretórios já indexados antes do pai (varreduras de raízes mais profundas)
+                children = w.execute('SELECT COALESCE(SUM(tree_size), 0), COALESCE(SUM(tree_allocated), 0), '
+                                     'COALESCE(SUM(tree_files), 0) FROM dirs WHERE parent = ? AND path != ?',
+                                     (path, path)).fetchone()
+                tree = [size + children[0], allocated + children[1], files + children[2]]
+
+            current = {e.path for e in entries if e.is_dir}
+            for (gone,) in w.execute('SELECT path FROM entries WHERE dir = ? AND is_dir = 1',
+                                     (path,)).fetchall():
+                if gone not in current:
+                    removed = w.execute('SELECT tree_size, tree_allocated, tree_files FROM dirs '
+                                        'WHERE path = ?', (gone,)).fetchone()
+                    if removed is not None:
+                        tree = [t - r for t, r in zip(tree, removed)]
+                    self._delete_subtree(gone)
+
+            w.execute('DELETE FROM entries WHERE dir = ?', (path,))
+            w.executemany('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                          [(e.path, path, e.name, int(e.is_dir), e.size, e.mtime, e.atime,
+                            e.dev, e.ino, e.nlink, e.allocated) for e in entries])
+            w.execute('INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                      (path, os.path.dirname(path), st.st_dev, st.st_ino, st.st_mtime_ns,
+                       size, allocated, files, json.dumps(hist), time.time(), *tree))
+            if old is None:
+                self._propagate(path, *tree)
+            else:
+                self._propagate(path, tree[0] - old[3], tree[1] - old[4], tree[2] - old[5])
+            self._pending += 1
+            if self._pending >= _COMMIT_EVERY:
+                w.commit()
+                self._pending = 0
+
+    def _propagate(self, path: str, delta_size: int, delta_allocated: int, delta_files: int) -> None:
+        """Aplica um delta de tamanho/arquivos aos ancestrais indexados de path."""
+        if not delta_size and not delta_allocated and not delta_files:
+            return
+        parent = os.path.dirname(path)
+        while parent != path:
+            cursor = self._writer.execute(
+                'UPDATE dirs SET tree_size = tree_size + ?, tree_allocated = tree_allocated + ?, '
+                'tree_files = tree_files + ? WHERE path = ?',
+                (delta_size, delta_allocated, delta_files, parent))
+            if cursor.rowcount == 0:
+                break
+            path, parent = parent, os.path.dirname(parent)
+
+    def _delete_subtree(self, path: str) -> None:
+        low, high = prefix_range(path)
+        self._writer.execute('DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)',
+                             (path, low, high))
+        self._writer.execute('DELETE FROM entries WHERE dir = ? OR (dir >= ? AND dir < ?)',
+                             (path, low, high))
+
+    def forget(self, path: str) -> None:
+        """Remove um diretório e toda a subárvore do índice (força nova varredura)."""
+        path = os.path.abspath(path)
+        with self._lock:
+            row = self._writer.execute('SELECT tree_size, tree_allocated, tree_files FROM dirs '
+                                       'WHERE path = ?', (path,)).fetchone()
+            if row is not None:
+                self._propagate(path, -row[0], -row[1], -row[2])
+            self._delete_subtree(path)
+            self._writer.commit()
+            self._pending = 0
+
+    def commit(self) -> None:
+        with self._lock:
+            self._writer.commit()
+            self._pending = 0
+
+    def directory(self, path: str) -> Optional[Dict]:
+        """Agregados diretos e da subárvore de um diretório indexado."""
+        row = self._reader().execute(
+            'SELECT size, files, ext_hist, mtime_ns, scanned_at, tree_size, tree_files, '
+            'allocated, tree_allocated FROM dirs WHERE path = ?',
+            (os.path.abspath(path),)).fetchone()
+        if row is None:
+            return None
+        return {
+            'size': row[0],
+            'files': row[1],
+            'extensions': {ext: {'count': c, 'size': s} for ext, (c, s) in json.loads(row[2]).items()},
+            'mtime_ns': row[3],
+            'scanned_at': row[4],
+            'tree_size': row[5],
+            'tree_files': row[6],
+            'allocated': row[7],
+            'tree_allocated': row[8],
+        }
+
+    def directories(self) -> List[str]:
+        """Caminhos de todos os diretórios indexados, dos mais rasos aos mais profundos."""
+        paths = [r[0] for r in self._reader().execute('SELECT path FROM dirs')]
+        paths.sort(key=lambda p: (p.count(os.sep), p))
+        return paths
+
+    def top_level(self) -> List[str]:
+        """Raízes indexadas (diretórios cujo pai não está no índice)."""
+        return [r[0] for r in self._reader().execute(
+            'SELECT d.path FROM dirs d LEFT JOIN dirs p ON p.path = d.parent '
+            'WHERE p.path IS NULL OR d.path = d.parent')]
+
+    def subtree_totals(self, path: str) -> Dict[str, int]:
+        """Tamanho aparente e alocado, arquivos e diretórios indexados sob path (inclusive)."""
+        path = os.path.abspath(path)
+        low, high = prefix_range(path)
+        row = self._reader().execute(
+            'SELECT COALESCE(SUM(size), 0), COALESCE(SUM(allocated), 0), COALESCE(SUM(files), 0), '
+            'COUNT(*) FROM dirs WHERE path = ? OR (path >= ? AND path < ?)', (path, low, high)).fetchone()
+        return {'size': row[0], 'allocated': row[1], 'files': row[2], 'directories': row[3]}
+
+    def bytes_older_than(self, path: str, days: float, field: str = 'mtime',
+                         now: Optional[float] = None) -> Dict[str, int]:
+        """Bytes e arquivos sob path não modificados (mtime) ou acessados (atime) há N dias."""
+        if field not in ('mtime', 'atime'):
+            raise ValueError(f"campo inválido: {field}")
+        path = os.path.abspath(path)
+        low, high = prefix_range(path)
+        cutoff = (now if now is not None else time.time()) - days * 86400
+        row = self._reader().execute(
+            f'SELECT COALESCE(SUM(size), 0), COUNT(*) FROM entries '
+            f'WHERE is_dir = 0 AND (dir = ? OR (dir >= ? AND dir < ?)) AND {field} < ?',
+            (path, low, high, cutoff)).fetchone()
+        return {'size': row[0], 'files': row[1]}
+
+    def subtree_directories(self, path: str) -> Dict[str, int]:
+        """mtime_ns de cada diretório indexado sob path (inclusive)."""
+        path = os.path.abspath(path)
+        low, high = prefix_range(path)
+        return dict(self._reader().execute(
+            'SELECT path, mtime_ns FROM dirs WHERE path = ? OR (path >= ? AND path < ?)', (path, low, high)))
+
+    def files_under(self, path: str) -> List[ScanEntry]:
+        """Arquivos indexados sob path, em qualquer profundidade."""
+        path = os.path.abspath(path)
+        low, high = prefix_range(path)
+        return [ScanEntry(r[0], r[1], False, *r[2:]) for r in self._reader().execute(
+            'SELECT path, name, size, mtime, atime, dev, ino, nlink, allocated FROM entries '
+            'WHERE is_dir = 0 AND (dir = ? OR (dir >= ? AND dir < ?))', (path, low, high))]
+
+    def close(self) -> None:
+        self.commit()
+        with self._lock:
+            self._writer.close()
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
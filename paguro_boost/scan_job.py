@@ -0,0 +1,123 @@
+"""
+Tarefas de varredura canceláveis com progresso para o Paguro Boost
+
+ScanJob executa uma análise de disco em uma thread própria e expõe, a
+qualquer momento, diretórios/arquivos/bytes processados, vazão e uma
+estimativa de tempo restante baseada nos totais da varredura anterior
+guardados no ScanIndex. Na fase seguinte, de hash dos candidatos a
+duplicados, a fração e o ETA passam a ser os dessa fase. O cancelamento é
+cooperativo: o token é verificado pelos laços do scanner e do hash, que
+interrompem o trabalho com ScanCancelledError.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .disk_scanner import CancellationToken, ScanProgress, minimal_roots
+from .exceptions import ScanCancelledError
+
+
+class ScanJob:
+    """Execução em segundo plano de uma análise de disco com progresso, cancelamento e timeout."""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    CANCELLED = 'cancelled'
+    TIMEOUT = 'timeout'
+    FAILED = 'failed'
+
+    def __init__(self, target: Callable[['ScanJob'], Any], timeout: Optional[float] = None):
+        self.target = target
+        self.timeout = timeout
+        self.token = CancellationToken()
+        self.progress = ScanProgress()
+        self.state = self.PENDING
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.expected: Optional[Dict[str, int]] = None
+        self._timed_out = False
+        self._timer: Optional[threading.Timer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._finished = threading.Event()
+
+    def start(self) -> 'ScanJob':
+        self.progress = ScanProgress()
+        self.state = self.RUNNING
+        if self.timeout:
+            self._timer = threading.Timer(self.timeout, self._expire)
+            self._timer.daemon = True
+            self._timer.start()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _expire(self) -> None:
+        self._timed_out = True
+        self.token.cancel()
+
+    def _run(self) -> None:
+        try:
+            self.result = self.target(self)
+            self.state = self.DONE
+        except ScanCancelledError as e:
+            self.error = e
+            self.state = self.TIMEOUT if self._timed_out else self.CANCELLED
+        except Exception as e:
+            self.error = e
+            self.state = self.FAILED
+        finally:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._finished.set()
+
+    def cancel(self) -> None:
+        """Pede o cancelamento; a varredura para no próximo ponto de verificação."""
+        self.token.cancel()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Aguarda o término; retorna False se ainda estiver em execução."""
+        return self._finished.wait(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self.state == self.RUNNING
+
+    def expect(self, roots: Iterable[str], index) -> None:
+        """Usa os totais indexados das raízes como tamanho esperado da varredura."""
+        if index is None:
+            return
+        expected = {'files': 0, 'bytes': 0, 'directories': 0}
+        for root in minimal_roots(roots):
+            totals = index.subtree_totals(root)
+            expected['files'] += totals['files']
+            expected['bytes'] += totals['size']
+            expected['directories'] += totals['directories']
+        self.expected = expected if expected['directories'] else None
+
+    def snapshot(self) -> Dict:
+        """Estado atual: contadores, vazão, fração concluída e ETA (None sem índice prévio)."""
+        data = self.progress.snapshot()
+        data['state'] = self.state
+        data['fraction'] = None
+        data['eta_seconds'] = None
+        if data['phase'] == 'hash':
+            # Confirmação de duplicados: fração e ETA pelos bytes a ler por hash
+            fraction = min(data['hashed_bytes'] / data['hash_bytes'], 0.99) if data['hash_bytes'] else 0.0
+            if self.state == self.DONE:
+                fraction = 1.0
+            data['fraction'] = fraction
+            if 0 < fraction < 1:
+                data['eta_seconds'] = data['hash_elapsed'] * (1 - fraction) / fraction
+        elif self.expected:
+            # Diretórios e arquivos têm custo parecido por entrada; bytes não (metadados apenas)
+            done = data['files'] + data['directories']
+            total = self.expected['files'] + self.expected['directories']
+            fraction = min(done / total, 0.99) if total else 0.0
+            if self.state == self.DONE:
+                fraction = 1.0
+            data['fraction'] = fraction
+            if 0 < fraction < 1:
+                data['eta_seconds'] = data['elapsed'] * (1 - fraction) / fraction
+        data['expected'] = self.expected
+        return data
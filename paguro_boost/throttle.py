@@ -0,0 +1,172 @@
+"""
+Execução em segundo plano com baixa prioridade e limite de I/O para o Paguro Boost
+
+Para não prejudicar a latência de um host ocupado (ex.: banco de dados),
+varreduras, hashes e remoções podem rodar em modo "background":
+
+- cada thread de trabalho recebe classe de I/O idle (ioprio_set via
+  syscall) e nice 19 ou SCHED_IDLE — só as threads de trabalho, nunca a
+  thread da interface;
+- baldes de fichas (token bucket) limitam bytes/s e operações/s;
+- o trabalho pausa enquanto a carga por CPU ou a pressão de I/O (PSI) do
+  host, lidas pelo SystemMetrics, estiverem acima dos limites.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import platform
+import threading
+import time
+from typing import Dict, Optional
+
+# ioprio_set(2): números de syscall por arquitetura
+_IOPRIO_SET_SYSCALL = {
+    'x86_64': 251, 'amd64': 251, 'i386': 289, 'i686': 289,
+    'aarch64': 30, 'arm64': 30, 'riscv64': 30, 'armv7l': 314,
+    'ppc64le': 273, 'ppc64': 273, 's390x': 282,
+}
+IOPRIO_WHO_PROCESS = 1
+IOPRIO_CLASS_SHIFT = 13
+IOPRIO_CLASS_IDLE = 3
+
+_libc = None
+if platform.system() == 'Linux':
+    try:
+        _libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        _libc.syscall.restype = ctypes.c_long
+    except (OSError, AttributeError):
+        _libc = None
+
+
+def _thread_id() -> int:
+    return threading.get_native_id() if hasattr(threading, 'get_native_id') else 0
+
+
+def set_idle_io_priority(tid: int = 0) -> bool:
+    """Coloca a thread (tid 0 = atual) na classe de I/O idle."""
+    number = _IOPRIO_SET_SYSCALL.get(platform.machine().lower())
+    if _libc is None or number is None:
+        return False
+    ioprio = IOPRIO_CLASS_IDLE << IOPRIO_CLASS_SHIFT
+    return _libc.syscall(number, IOPRIO_WHO_PROCESS, tid, ioprio) == 0
+
+
+def set_idle_cpu_priority(sched_idle: bool = False) -> Optional[str]:
+    """
+    Baixa a prioridade de CPU da thread atual.
+
+    No Linux setpriority/sched_setscheduler com o tid afetam apenas a thread.
+    Retorna 'sched_idle', 'nice' ou None se nada pôde ser aplicado.
+    """
+    tid = _thread_id()
+    if sched_idle and hasattr(os, 'SCHED_IDLE') and tid:
+        try:
+            os.sched_setscheduler(tid, os.SCHED_IDLE, os.sched_param(0))
+            return 'sched_idle'
+        except OSError:
+            pass
+    if hasattr(os, 'setpriority') and tid and platform.system() == 'Linux':
+        try:
+            os.setpriority(os.PRIO_PROCESS, tid, 19)
+            return 'nice'
+        except OSError:
+            pass
+    return None
+
+
+def enter_background(sched_idle: bool = False) -> Dict[str, object]:
+    """Aplica prioridade idle de I/O e de CPU à thread atual (initializer de pools)."""
+    return {
+        'io': set_idle_io_priority(_thread_id()),
+        'cpu': set_idle_cpu_priority(sched_idle),
+    }
+
+
+class TokenBucket:
+    """
+    Balde de fichas com débito: consume() sempre aceita a quantidade e dorme
+    o tempo necessário para que a taxa média não passe de rate por segundo.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Debita amount e retorna quantos segundos esperar antes de prosseguir."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= amount
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def consume(self, amount: float) -> None:
+        delay = self.reserve(amount)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class Throttle:
+    """Modo background: prioridade idle nas threads, limites de taxa e pausa sob carga."""
+
+    def __init__(self, bytes_per_second: Optional[float] = None,
+                 ops_per_second: Optional[float] = None, metrics=None,
+                 max_load_per_cpu: Optional[float] = 1.5, max_io_pressure: Optional[float] = 20.0,
+                 check_interval: float = 2.0, sched_idle: bool = False, token=None):
+        self.bytes = TokenBucket(bytes_per_second) if bytes_per_second else None
+        self.ops = TokenBucket(ops_per_second) if ops_per_second else None
+        self.metrics = metrics
+        self.max_load_per_cpu = max_load_per_cpu
+        self.max_io_pressure = max_io_pressure
+        self.check_interval = check_interval
+        self.sched_idle = sched_idle
+        self.token = token
+        self.paused_seconds = 0.0
+        self._checked = 0.0
+        self._busy = False
+        self._lock = threading.Lock()
+
+    def worker_init(self) -> None:
+        """Initializer das threads de trabalho."""
+        enter_background(self.sched_idle)
+
+    def host_busy(self) -> bool:
+        """Carga por CPU ou pressão de I/O (PSI some avg10) acima dos limites."""
+        if self.max_load_per_cpu is not None and hasattr(os, 'getloadavg'):
+            try:
+                if os.getloadavg()[0] / (os.cpu_count() or 1) > self.max_load_per_cpu:
+                    return True
+            except OSError:
+                pass
+        if self.max_io_pressure is not None and self.metrics is not None:
+            io = self.metrics.get_pressure('throttle').get('io', {}).get('some', {})
+            if io.get('avg10', 0.0) > self.max_io_pressure:
+                return True
+        return False
+
+    def _busy_now(self) -> bool:
+        # A verificação é compartilhada entre threads e refeita a cada check_interval
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked >= self.check_interval:
+                self._checked = now
+                self._busy = self.host_busy()
+            return self._busy
+
+    def wait(self, ops: int = 0, nbytes: int = 0) -> None:
+        """Ponto de controle antes de uma operação: pausa sob carga e respeita as taxas."""
+        while self._busy_now():
+            if self.token is not None:
+                self.token.raise_if_cancelled()
+            time.sleep(self.check_interval)
+            with self._lock:
+                self.paused_seconds += self.check_interval
+        if self.ops is not None and ops:
+            self.ops.consume(ops)
+        if self.bytes is not None and nbytes:
+            self.bytes.consume(nbytes)
@@ -4,16 +4,45 @@ Unit tests for Paguro Boost
 
 import unittest
 import tempfile
+import gzip
+import json
 import os
+import sys
 import shutil
+import stat
+import threading
+import time
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 
 # Import modules to test
 from paguro_boost.app import SystemOptimizer
-from paguro_boost.metrics import SystemMetrics
+from paguro_boost.metrics import SystemMetrics, parse_pressure
 from paguro_boost.config import CONFIG
 from paguro_boost.logger import get_logger
+from paguro_boost.processes import group_processes, snapshot_processes
+from paguro_boost.measurement import median_delta, measure_operation
+from paguro_boost.cgroups import sweep_cgroups, reclaim, resolve_cgroup
+from paguro_boost.pagecache import PageCacheAnalyzer, file_residency, evict_file, pagecache_supported
+from paguro_boost.disk_scanner import (DiskScanner, DirectorySizeStage, FileTypeStage,
+                                       OldFilesStage, DuplicateCandidateStage, minimal_roots,
+                                       LargestFilesStage, LargestLeafDirectoriesStage, AgeHistogramStage,
+                                       CancellationToken, ScanProgress)
+from paguro_boost.scan_index import ScanIndex
+from paguro_boost.disk_sampler import DiskSampler, z_score
+from paguro_boost.scan_job import ScanJob
+from paguro_boost.cleanup import CleanupEngine, CleanupPlan, CleanupRule, PlanItem
+from paguro_boost.cache_catalog import CacheCatalog, known_caches
+from paguro_boost.log_analyzer import (LogAnalyzer, classify_log, vacuum_size_target,
+                                       vacuum_candidates, open_files)
+from paguro_boost.quarantine import Quarantine, QUARANTINE_DIRNAME
+from paguro_boost.throttle import Throttle, TokenBucket, enter_background
+from paguro_boost.exceptions import ScanCancelledError
+from paguro_boost.disk_watcher import DiskWatcher, inotify_supported
+from paguro_boost.duplicates import DuplicateFinder, deduplicate, link_duplicate, full_digest
+from paguro_boost.fileio import BulkFile
+from paguro_boost.hash_cache import HashCache
+from paguro_boost.mounts import MountTable, PathTrie, parse_mountinfo
 
 
 class TestSystemOptimizer(unittest.TestCase):
@@ -82,6 +111,40 @@ class TestSystemOptimizer(unittest.TestCase):
             self.assertIn('espaco_total_gb', analysis)
             self.assertIn('percentual_uso', analysis)
     
+    def test_disk_analysis_top_files_cover_path(self):
+        """Test the largest-files ranking scans the whole given path, not only the fixed scopes."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        path = os.path.join(temp_dir, 'srv', 'data', 'big.bin')
+        os.makedirs(os.path.dirname(path))
+        with open(path, 'wb') as f:
+            f.write(b'x' * 65536)
+        with patch.object(self.optimizer, '_obter_indice_disco', return_value=None):
+            analysis = self.optimizer.analisar_uso_disco_detalhado(temp_dir)
+        self.assertIn(path, [a['arquivo'] for a in analysis['maiores_arquivos']])
+        self.assertIn(os.path.dirname(path), [d['caminho'] for d in analysis['maiores_diretorios_folha']])
+    
+    def test_temp_cleanup_failure_still_prunes_caches(self):
+        """Test cache pruning runs even when the temp cleanup step fails."""
+        with patch.object(self.optimizer, '_limpar_por_regras', return_value=False), \
+                patch.object(self.optimizer, '_limpar_caches', return_value=True) as caches:
+            self.assertFalse(self.optimizer._limpar_temporarios_linux())
+        caches.assert_called_once_with()
+    
+    def test_plan_run_keeps_system_steps(self):
+        """Test running a saved plan still runs the steps the plan does not cover."""
+        passos = ['_limpar_por_plano', '_remover_pacotes_orfaos', '_limpar_cache_windows_update',
+                  '_otimizar_caches_sistema', '_otimizar_indices_sistema', 'otimizar_memoria_sob_pressao',
+                  'atualizar_pacotes', 'verificar_integridade', 'verificar_virus']
+        mocks = {nome: MagicMock(return_value=True) for nome in passos}
+        with patch.multiple(self.optimizer, verificar_gerenciador_pacotes=MagicMock(return_value=True),
+                            medir_efeito_operacao=lambda operacao, nome: (operacao(), {'effects': {}})[1],
+                            **mocks):
+            self.optimizer.executar_otimizacao_completa(plano=CleanupPlan())
+        orfaos = '_limpar_cache_windows_update' if self.optimizer.is_windows else '_remover_pacotes_orfaos'
+        for nome in ('_limpar_por_plano', orfaos, '_otimizar_caches_sistema', '_otimizar_indices_sistema'):
+            self.assertTrue(mocks[nome].called, nome)
+    
     def test_boot_time_measurement(self):
         """Test boot time measurement."""
         boot_info = self.optimizer.medir_tempo_boot()
@@ -154,6 +217,1414 @@ class TestSystemMetrics(unittest.TestCase):
             self.assertIn('stability', report)
 
 
+class TestPressureMetrics(unittest.TestCase):
+    """Test PSI collection and pressure triggers."""
+    
+    def setUp(self):
+        """Set up fake /proc/pressure files."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_file = os.path.join(self.temp_dir, 'metrics.json')
+        self.metrics = SystemMetrics(self.temp_file)
+        self._write_memory(0)
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+    
+    def _write_memory(self, total):
+        for resource in ('cpu', 'memory', 'io'):
+            with open(os.path.join(self.temp_dir, resource), 'w') as f:
+                f.write(f"some avg10=50.00 avg60=1.00 avg300=0.50 total={total}\n"
+                        f"full avg10=0.00 avg60=0.00 avg300=0.00 total=0\n")
+    
+    def test_parse_pressure(self):
+        """Test parsing of PSI lines."""
+        data = parse_pressure("some avg10=1.50 avg60=0.20 avg300=0.00 total=1234\n")
+        self.assertEqual(data['some']['total'], 1234)
+        self.assertAlmostEqual(data['some']['avg10'], 1.5)
+    
+    def test_total_converted_to_rate(self):
+        """Test stall totals are turned into rates between reads."""
+        with patch('paguro_boost.metrics.PRESSURE_DIR', self.temp_dir):
+            first = self.metrics.get_pressure('test')
+            self.assertIsNone(first['memory']['some']['rate'])
+            self._write_memory(10 ** 9)  # stall maior que o tempo decorrido
+            second = self.metrics.get_pressure('test')
+        self.assertEqual(second['memory']['some']['rate'], 100.0)
+    
+    def test_trigger_fires_once_within_cooldown(self):
+        """Test pressure triggers respect threshold and cooldown."""
+        calls = []
+        self.metrics.register_pressure_trigger('memory', 10.0, calls.append, cooldown=60)
+        with patch('paguro_boost.metrics.PRESSURE_DIR', self.temp_dir):
+            self.metrics.check_pressure_triggers()
+            self.metrics.check_pressure_triggers()
+        self.assertEqual(len(calls), 1)
+
+
+class TestMeasurement(unittest.TestCase):
+    """Test before/after measurement harness."""
+    
+    def test_median_delta_significant(self):
+        """A clear shift yields a confidence interval excluding zero."""
+        effect = median_delta([100, 101, 99, 100, 102], [80, 79, 81, 80, 78])
+        self.assertEqual(effect['delta'], -20)
+        self.assertTrue(effect['significant'])
+        self.assertLessEqual(effect['ci_low'], effect['delta'])
+        self.assertGreaterEqual(effect['ci_high'], effect['delta'])
+    
+    def test_median_delta_noise(self):
+        """Overlapping samples are not reported as a significant effect."""
+        effect = median_delta([100, 90, 110, 95, 105], [105, 95, 100, 110, 90])
+        self.assertFalse(effect['significant'])
+    
+    def test_measure_operation(self):
+        """Test the operation runs between two sample series."""
+        state = {'value': 10.0}
+        
+        def operation():
+            state['value'] = 5.0
+            return True
+        
+        result = measure_operation(operation, lambda: {'value': state['value']},
+                                   samples=3, interval=0)
+        self.assertTrue(result['result'])
+        self.assertEqual(result['effects']['value']['delta'], -5.0)
+    
+    def test_events_stored_apart_from_samples(self):
+        """Test annotated events do not count as metric samples."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            metrics = SystemMetrics(os.path.join(temp_dir, 'metrics.json'))
+            metrics.add_event('optimization', 'RAM', {'effects': {}})
+            self.assertEqual(len(metrics.get_events(1, 'optimization')), 1)
+            self.assertEqual(metrics.get_metrics_in_range(1), [])
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+class TestProcessGroups(unittest.TestCase):
+    """Test process aggregation by application."""
+    
+    def _proc(self, pid, ppid, name, exe, pss_mb, cgroup=None):
+        return {
+            'pid': pid, 'ppid': ppid, 'name': name, 'exe': exe,
+            'rss': pss_mb * 1024 * 1024, 'pss': pss_mb * 1024 * 1024,
+            'memory_percent': 0.0, 'cpu_percent': 1.0, 'cpu_time': 0.0,
+            'cgroup': cgroup
+        }
+    
+    def test_tree_grouping(self):
+        """Children with the parent's executable join the parent's group."""
+        snapshot = [
+            self._proc(1, 0, 'init', '/sbin/init', 10),
+            self._proc(10, 1, 'chrome', '/opt/chrome', 200),
+            self._proc(11, 10, 'chrome', '/opt/chrome', 300),
+            self._proc(12, 11, 'chrome', '/opt/chrome', 100),
+            self._proc(20, 1, 'python3', '/usr/bin/python3', 50),
+        ]
+        groups = group_processes(snapshot, total_memory=1024 ** 3)
+        
+        self.assertEqual(len(groups), 3)
+        self.assertEqual(groups[0]['name'], 'chrome')
+        self.assertEqual(groups[0]['pid'], 10)
+        self.assertEqual(groups[0]['processos'], 3)
+        self.assertEqual(groups[0]['memory_mb'], 600)
+        self.assertAlmostEqual(groups[0]['cpu_percent'], 3.0)
+    
+    def test_cgroup_grouping(self):
+        """Processes in the same application scope are grouped."""
+        snapshot = [
+            self._proc(1, 0, 'init', '/sbin/init', 10),
+            self._proc(30, 1, 'code', '/usr/share/code/code', 100, 'app-code-1.scope'),
+            self._proc(31, 1, 'node', '/usr/bin/node', 100, 'app-code-1.scope'),
+        ]
+        groups = group_processes(snapshot, total_memory=1024 ** 3)
+        
+        self.assertEqual(len(groups), 2)
+        self.assertEqual(groups[0]['cgroup'], 'app-code-1.scope')
+        self.assertEqual(groups[0]['processos'], 2)
+    
+    def test_snapshot_measures_cpu(self):
+        """Test the first snapshot reports CPU usage measured over the interval."""
+        stop = time.monotonic() + 1.0
+        
+        def burn():
+            while time.monotonic() < stop:
+                pass
+        worker = threading.Thread(target=burn)
+        worker.start()
+        try:
+            snapshot = snapshot_processes(interval=0.3)
+        finally:
+            worker.join()
+        own = [p for p in snapshot if p['pid'] == os.getpid()]
+        self.assertEqual(len(own), 1)
+        self.assertGreater(own[0]['cpu_percent'], 0.0)
+
+
+@unittest.skipUnless(pagecache_supported(), "mincore/posix_fadvise not available")
+class TestPageCache(unittest.TestCase):
+    """Test targeted page-cache analysis and eviction."""
+    
+    def setUp(self):
+        """Create a file that is resident in the page cache."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'data.bin')
+        with open(self.path, 'wb') as f:
+            f.write(os.urandom(4 * 1024 * 1024))
+            f.flush()
+            os.fsync(f.fileno())
+        with open(self.path, 'rb') as f:
+            f.read()
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_residency(self):
+        """Test residency of a file is measured in bytes."""
+        size, cached = file_residency(self.path)
+        self.assertEqual(size, 4 * 1024 * 1024)
+        self.assertGreaterEqual(cached, 0)
+        self.assertLessEqual(cached, size)
+    
+    def test_evict_reports_reclaimed_bytes(self):
+        """Test eviction reports the bytes dropped from cache."""
+        result = evict_file(self.path)
+        self.assertIsNotNone(result)
+        self.assertEqual(result['reclaimed'], result['cached_before'] - result['cached_after'])
+    
+    def test_selection(self):
+        """Test only cold or large files are selected."""
+        analyzer = PageCacheAnalyzer(cold_seconds=3600, large_bytes=100)
+        selected = analyzer.select([
+            {'path': 'hot-small', 'cached': 10, 'idle_seconds': 5},
+            {'path': 'cold', 'cached': 10, 'idle_seconds': 7200},
+            {'path': 'large', 'cached': 500, 'idle_seconds': 5},
+        ])
+        self.assertEqual([f['path'] for f in selected], ['cold', 'large'])
+
+
+class TestCGroups(unittest.TestCase):
+    """Test cgroup v2 memory accounting on a fake hierarchy."""
+    
+    def setUp(self):
+        """Build a fake cgroup v2 tree."""
+        self.root = tempfile.mkdtemp()
+        self._cgroup('', 3000)
+        self._cgroup('system.slice', 2000)
+        self._cgroup('system.slice/db.service', 1500)
+        os.makedirs(os.path.join(self.root, 'no-memory-controller'))
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.root)
+    
+    def _cgroup(self, name, current):
+        path = os.path.join(self.root, name)
+        os.makedirs(path, exist_ok=True)
+        files = {
+            'memory.current': f"{current}\n",
+            'memory.max': "max\n",
+            'memory.stat': f"anon {current // 2}\nfile {current // 4}\nslab 10\n",
+            'memory.pressure': "some avg10=1.00 avg60=0.00 avg300=0.00 total=5\n"
+                               "full avg10=0.00 avg60=0.00 avg300=0.00 total=0\n",
+            'memory.reclaim': "",
+        }
+        for filename, content in files.items():
+            with open(os.path.join(path, filename), 'w') as f:
+                f.write(content)
+    
+    def test_sweep(self):
+        """Test per-cgroup memory.current/stat/pressure are reported."""
+        cgroups = sweep_cgroups(self.root)
+        names = [cg['name'] for cg in cgroups]
+        
+        self.assertEqual(names, ['/', 'system.slice', 'system.slice/db.service'])
+        service = cgroups[2]
+        self.assertEqual(service['anon'], 750)
+        self.assertEqual(service['file'], 375)
+        self.assertAlmostEqual(service['pressure']['some']['avg10'], 1.0)
+    
+    def test_reclaim_targets_cgroup(self):
+        """Test memory.reclaim receives the byte goal."""
+        result = reclaim('system.slice/db.service', 4096, root=self.root)
+        with open(os.path.join(self.root, 'system.slice/db.service/memory.reclaim')) as f:
+            self.assertEqual(f.read(), '4096')
+        self.assertTrue(result['complete'])
+    
+    def test_resolve_rejects_escape(self):
+        """Test cgroup names cannot escape the hierarchy."""
+        self.assertIsNone(resolve_cgroup('../../etc', root=self.root))
+
+
+class TestDiskScanner(unittest.TestCase):
+    """Test the single-pass disk scanner and its analysis stages."""
+    
+    def setUp(self):
+        """Build a small directory tree."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.docs = os.path.join(self.temp_dir, 'docs')
+        self.old = os.path.join(self.temp_dir, 'old')
+        os.makedirs(os.path.join(self.docs, 'sub'))
+        os.makedirs(self.old)
+        self._write(os.path.join(self.docs, 'a.txt'), b'x' * 2000)
+        self._write(os.path.join(self.docs, 'sub', 'b.txt'), b'x' * 2000)
+        self._write(os.path.join(self.docs, 'c.PDF'), b'y' * 3000)
+        self._write(os.path.join(self.old, 'stale.log'), b'z' * 500)
+        os.utime(os.path.join(self.old, 'stale.log'), (1000, 1000))
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+    
+    def _write(self, path, data):
+        with open(path, 'wb') as f:
+            f.write(data)
+    
+    def test_minimal_roots(self):
+        """Test nested roots are traversed only once."""
+        roots = minimal_roots([self.temp_dir, self.docs, self.temp_dir + os.sep])
+        self.assertEqual(roots, [self.temp_dir])
+    
+    def test_scan_emits_every_entry_once(self):
+        """Test the scanner yields each file and directory exactly once."""
+        paths = [e.path for e in DiskScanner(max_workers=3).scan([self.temp_dir, self.docs])]
+        self.assertEqual(len(paths), len(set(paths)))
+        self.assertIn(os.path.join(self.docs, 'sub', 'b.txt'), paths)
+    
+    @unittest.skipUnless(hasattr(os, 'link') and hasattr(os.stat_result, 'st_blocks'),
+                         "hardlinks/st_blocks not supported")
+    def test_allocated_size(self):
+        """Test hardlinks count once and sparse files count allocated blocks."""
+        os.link(os.path.join(self.docs, 'a.txt'), os.path.join(self.docs, 'a-link.txt'))
+        sparse = os.path.join(self.old, 'sparse.img')
+        with open(sparse, 'wb') as f:
+            f.truncate(64 * 1024 * 1024)
+        sizes = DirectorySizeStage([self.docs, self.old])
+        DiskScanner().run(sizes.roots, [sizes])
+        result = sizes.result()
+        
+        self.assertEqual(result[self.docs]['apparent'], 7000)
+        self.assertEqual(result[self.old]['apparent'], 500 + 64 * 1024 * 1024)
+        self.assertLess(result[self.old]['allocated'], 1024 * 1024)
+    
+    def test_top_n_stages(self):
+        """Test bounded top-N files and leaf directories."""
+        files = LargestFilesStage(limit=2)
+        leaves = LargestLeafDirectoriesStage(limit=2)
+        DiskScanner(max_workers=3).run([self.temp_dir], [files, leaves])
+        
+        names = [os.path.basename(f['path']) for f in files.result()]
+        self.assertEqual(names[0], 'c.PDF')
+        self.assertIn(names[1], ('a.txt', 'b.txt'))
+        # docs tem subdiretório: não é folha
+        self.assertEqual(sorted(d['path'] for d in leaves.result()),
+                         sorted([os.path.join(self.docs, 'sub'), self.old]))
+    
+    def test_age_histogram(self):
+        """Test every file lands in one mtime and one atime bucket."""
+        now = time.time()
+        os.utime(os.path.join(self.docs, 'c.PDF'), (now - 40 * 86400, now - 40 * 86400))
+        ages = AgeHistogramStage([self.docs, self.old], now)
+        DiskScanner().run(ages.roots, [ages])
+        result = ages.result()
+        
+        docs = result[self.docs]['mtime']
+        self.assertEqual(docs['7d'], {'count': 2, 'size': 4000})
+        self.assertEqual(docs['90d'], {'count': 1, 'size': 3000})
+        self.assertEqual(result[self.old]['mtime']['>365d'], {'count': 1, 'size': 500})
+        self.assertEqual(sum(b['count'] for b in result[self.docs]['atime'].values()), 3)
+    
+    def test_stages_share_one_scan(self):
+        """Test all analysis stages are fed by a single traversal."""
+        sizes = DirectorySizeStage([self.docs, self.old])
+        types = FileTypeStage([self.docs])
+        old = OldFilesStage(cutoff=2000, scope=[self.old])
+        dups = DuplicateCandidateStage([self.docs])
+        DiskScanner().run(sizes.roots + types.roots, [sizes, types, old, dups])
+        
+        self.assertEqual({d: t['apparent'] for d, t in sizes.result().items()}, {self.docs: 7000, self.old: 500})
+        self.assertEqual(types.result()['.txt'], {'count': 2, 'size': 4000})
+        self.assertEqual(types.result()['.pdf'], {'count': 1, 'size': 3000})
+        self.assertEqual(old.result()['count'], 1)
+        self.assertEqual(old.result()['sample'][0]['path'], os.path.join(self.old, 'stale.log'))
+        self.assertEqual(list(dups.result()), [2000])
+
+
+class TestScanIndex(unittest.TestCase):
+    """Test the persistent incremental scan index."""
+    
+    def setUp(self):
+        """Build a small tree and an index file outside of it."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.tree = os.path.join(self.temp_dir, 'tree')
+        os.makedirs(os.path.join(self.tree, 'a', 'deep'))
+        os.makedirs(os.path.join(self.tree, 'b'))
+        for name, size in (('a/one.txt', 100), ('a/deep/two.log', 200), ('b/three.txt', 300)):
+            with open(os.path.join(self.tree, name), 'wb') as f:
+                f.write(b'x' * size)
+        self.index = ScanIndex(os.path.join(self.temp_dir, 'index.db'))
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        self.index.close()
+        shutil.rmtree(self.temp_dir)
+    
+    def _scan(self):
+        scanner = DiskScanner(max_workers=2, index=self.index)
+        stage = DirectorySizeStage([self.tree])
+        scanner.run([self.tree], [stage])
+        return scanner, stage.result()[self.tree]['apparent']
+    
+    def test_unchanged_directories_are_reused(self):
+        """Test a repeat scan reads every directory from the index."""
+        first, size = self._scan()
+        self.assertEqual(first.stats['cached'], 0)
+        second, size_again = self._scan()
+        self.assertEqual(second.stats['cached'], second.stats['directories'])
+        self.assertEqual(size, size_again)
+        self.assertEqual(size, 600)
+    
+    def test_changed_directory_is_rescanned(self):
+        """Test new files and removed subtrees are picked up."""
+        self._scan()
+        with open(os.path.join(self.tree, 'b', 'four.txt'), 'wb') as f:
+            f.write(b'x' * 50)
+        shutil.rmtree(os.path.join(self.tree, 'a', 'deep'))
+        os.utime(os.path.join(self.tree, 'a'), ns=(1, 1))
+        os.utime(os.path.join(self.tree, 'b'), ns=(2, 2))
+        
+        scanner, size = self._scan()
+        self.assertEqual(size, 450)
+        self.assertIsNone(self.index.directory(os.path.join(self.tree, 'a', 'deep')))
+    
+    def test_aggregates(self):
+        """Test per-directory histogram and subtree totals."""
+        self._scan()
+        info = self.index.directory(os.path.join(self.tree, 'a'))
+        self.assertEqual(info['files'], 1)
+        self.assertEqual(info['extensions']['.txt'], {'count': 1, 'size': 100})
+        totals = self.index.subtree_totals(self.tree)
+        self.assertEqual((totals['size'], totals['files'], totals['directories']), (600, 3, 4))
+        self.assertEqual(self.index.directory(self.tree)['tree_allocated'], totals['allocated'])
+    
+    def test_bytes_older_than(self):
+        """Test age queries against indexed entries under a prefix."""
+        os.utime(os.path.join(self.tree, 'a', 'deep', 'two.log'), (1000, 1000))
+        self._scan()
+        self.assertEqual(self.index.bytes_older_than(self.tree, 30), {'size': 200, 'files': 1})
+        self.assertEqual(self.index.bytes_older_than(os.path.join(self.tree, 'b'), 30)['files'], 0)
+        self.assertEqual(self.index.bytes_older_than(self.tree, 30, 'atime')['size'], 200)
+        with self.assertRaises(ValueError):
+            self.index.bytes_older_than(self.tree, 30, 'ctime')
+
+
+@unittest.skipUnless(inotify_supported(), "inotify not available")
+class TestDiskWatcher(unittest.TestCase):
+    """Test inotify-driven index updates."""
+    
+    def setUp(self):
+        """Index a small tree."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.tree = os.path.join(self.temp_dir, 'tree')
+        os.makedirs(os.path.join(self.tree, 'sub'))
+        with open(os.path.join(self.tree, 'sub', 'a.bin'), 'wb') as f:
+            f.write(b'x' * 100)
+        self.index = ScanIndex(os.path.join(self.temp_dir, 'index.db'))
+        for _ in DiskScanner(index=self.index).scan([self.tree]):
+            pass
+        self.updated = threading.Event()
+        self.watcher = DiskWatcher(self.index, debounce=0.1, on_update=lambda dirs: self.updated.set())
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        self.watcher.stop()
+        self.index.close()
+        shutil.rmtree(self.temp_dir)
+    
+    def test_deltas_propagate_to_ancestors(self):
+        """Test a new file updates subtree totals up the tree."""
+        self.assertTrue(self.watcher.start())
+        self.assertEqual(self.watcher.watch_count, 2)
+        
+        os.makedirs(os.path.join(self.tree, 'sub', 'new'))
+        with open(os.path.join(self.tree, 'sub', 'new', 'b.bin'), 'wb') as f:
+            f.write(b'x' * 50)
+        self.assertTrue(self.updated.wait(10))
+        
+        deadline = time.time() + 10
+        while self.index.directory(self.tree)['tree_size'] != 150 and time.time() < deadline:
+            time.sleep(0.1)
+        self.assertEqual(self.index.directory(self.tree)['tree_size'], 150)
+        self.assertEqual(self.index.directory(self.tree)['tree_files'], 2)
+    
+    def test_overflow_refreshes_files_changed_in_place(self):
+        """Test a queue overflow re-lists directories whose mtime did not change."""
+        path = os.path.join(self.tree, 'sub', 'a.bin')
+        with open(path, 'ab') as f:
+            f.write(b'x' * 20)
+        self.watcher._overflow = True
+        self.assertIn(os.path.join(self.tree, 'sub'), self.watcher.flush())
+        self.assertEqual(self.index.directory(self.tree)['tree_size'], 120)
+    
+    def test_watch_budget(self):
+        """Test the number of watches stays within the configured limit."""
+        watcher = DiskWatcher(self.index, max_watches=1)
+        try:
+            self.assertTrue(watcher.start())
+            self.assertEqual(watcher.watch_count, 1)
+            self.assertEqual(watcher.unwatched, 1)
+        finally:
+            watcher.stop()
+
+
+class TestBulkFile(unittest.TestCase):
+    """Test the page-cache friendly bulk reader."""
+    
+    def setUp(self):
+        """Create a file that spans several reads."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'data.bin')
+        self.data = os.urandom(3 * 65536 + 123)
+        with open(self.path, 'wb') as f:
+            f.write(self.data)
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_unaligned_ranges(self):
+        """Test ranges starting off a page boundary return exactly the requested bytes."""
+        with BulkFile(self.path, buffer_size=65536) as f:
+            self.assertEqual(b''.join(bytes(c) for c in f.chunks()), self.data)
+            self.assertEqual(b''.join(bytes(c) for c in f.chunks(70001, 65536)), self.data[70001:135537])
+            self.assertEqual(b''.join(bytes(c) for c in f.chunks(len(self.data) - 10, 100)), self.data[-10:])
+    
+    def test_direct_io_matches_buffered(self):
+        """Test O_DIRECT (or its buffered fallback) hashes the same content."""
+        self.assertEqual(full_digest(self.path, direct=True), full_digest(self.path))
+        with BulkFile(self.path, direct=True, direct_min_size=0) as f:
+            self.assertEqual(b''.join(bytes(c) for c in f.chunks()), self.data)
+    
+    @unittest.skipUnless(pagecache_supported(), "mincore/posix_fadvise not available")
+    def test_cold_file_leaves_no_cache(self):
+        """Test a cold file is dropped after reading while a hot one stays cached."""
+        os.sync()
+        evict_file(self.path)
+        if file_residency(self.path)[1]:
+            self.skipTest("page cache eviction not effective here")
+        full_digest(self.path)
+        self.assertEqual(file_residency(self.path)[1], 0)
+        
+        with open(self.path, 'rb') as f:
+            f.read()
+        full_digest(self.path)
+        self.assertEqual(file_residency(self.path)[1], len(self.data))
+
+
+class TestDuplicateFinder(unittest.TestCase):
+    """Test the multi-stage duplicate finder."""
+    
+    def setUp(self):
+        """Create files that share size, headers and tails."""
+        self.temp_dir = tempfile.mkdtemp()
+        block = 4096
+        head, middle, tail = os.urandom(block), os.urandom(3 * block), os.urandom(block)
+        self.files = {
+            'copy1': head + middle + tail,
+            'copy2': head + middle + tail,
+            'same_ends': head + os.urandom(3 * block) + tail,
+            'same_head': head + middle + os.urandom(block),
+            'small1': b'abc' * 2000,
+            'small2': b'abc' * 2000,
+        }
+        for name, data in self.files.items():
+            with open(os.path.join(self.temp_dir, name), 'wb') as f:
+                f.write(data)
+        self.finder = DuplicateFinder(max_workers=2, block_size=block)
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+    
+    def _by_size(self):
+        stage = DuplicateCandidateStage([self.temp_dir])
+        DiskScanner().run(stage.roots, [stage])
+        return stage.result()
+    
+    def test_no_false_positives(self):
+        """Test only byte-identical files are grouped."""
+        groups = self.finder.find(self._by_size())
+        names = sorted([os.path.basename(p) for p in g['files']] for g in groups)
+        self.assertEqual(names, [['copy1', 'copy2'], ['small1', 'small2']])
+        # Arquivos com cabeçalho diferente no final são descartados antes do hash completo
+        self.assertEqual(self.finder.stats['full_hashed'], 3)
+    
+    @unittest.skipUnless(hasattr(os, 'link'), "hardlinks not supported")
+    def test_hardlinks_are_not_duplicates(self):
+        """Test links to the same inode are considered once."""
+        os.remove(os.path.join(self.temp_dir, 'copy2'))
+        os.link(os.path.join(self.temp_dir, 'copy1'), os.path.join(self.temp_dir, 'copy2'))
+        groups = self.finder.find(self._by_size())
+        self.assertNotIn(os.path.join(self.temp_dir, 'copy1'), [p for g in groups for p in g['files']])
+    
+    def test_hash_phase_progress_and_cancel(self):
+        """Test hashing reports its own phase and stops on a cancelled token."""
+        by_size = self._by_size()
+        progress = ScanProgress()
+        DuplicateFinder(max_workers=2, block_size=4096, progress=progress).find(by_size)
+        info = progress.snapshot()
+        self.assertEqual(info['phase'], 'hash')
+        self.assertGreater(info['hash_bytes'], 0)
+        self.assertEqual(info['hashed_bytes'], info['hash_bytes'])
+        
+        token = CancellationToken()
+        token.cancel()
+        finder = DuplicateFinder(max_workers=2, block_size=4096, token=token)
+        with self.assertRaises(ScanCancelledError):
+            finder.find(by_size)
+        self.assertEqual(finder.stats['full_hashed'], 0)
+
+
+class TestHashCache(unittest.TestCase):
+    """Test the persistent content-hash cache."""
+    
+    def setUp(self):
+        """Create duplicate files and an empty cache."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.tree = os.path.join(self.temp_dir, 'tree')
+        os.makedirs(self.tree)
+        data = os.urandom(64 * 1024)
+        for name in ('a.bin', 'b.bin'):
+            with open(os.path.join(self.tree, name), 'wb') as f:
+                f.write(data)
+        self.cache = HashCache(os.path.join(self.temp_dir, 'index.db'), max_entries=3)
+        self.by_size = {len(data): [os.path.join(self.tree, 'a.bin'), os.path.join(self.tree, 'b.bin')]}
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        self.cache.close()
+        shutil.rmtree(self.temp_dir)
+    
+    def test_unchanged_files_are_not_read_again(self):
+        """Test a second run resolves every digest from the cache."""
+        finder = DuplicateFinder(block_size=4096, cache=self.cache)
+        first = finder.find(self.by_size)
+        self.assertEqual(finder.stats['full_hashed'], 2)
+        
+        second = finder.find(self.by_size)
+        self.assertEqual(first, second)
+        self.assertEqual(finder.stats['partial_hashed'] + finder.stats['full_hashed'], 0)
+        self.assertEqual(finder.stats['cache_hits'], 4)
+    
+    def test_modified_file_is_rehashed(self):
+        """Test a changed mtime invalidates the cached digest."""
+        finder = DuplicateFinder(block_size=4096, cache=self.cache)
+        finder.find(self.by_size)
+        os.utime(self.by_size[64 * 1024][0], ns=(10**9, 10**9))
+        finder.find(self.by_size)
+        self.assertEqual(finder.stats['full_hashed'], 1)
+    
+    def test_lru_eviction(self):
+        """Test the cache never grows beyond max_entries."""
+        digests = {(1, ino, 10, 0): {'partial': b'p', 'full': b'f'} for ino in range(5)}
+        self.cache.store_many(digests, 4096)
+        self.assertEqual(len(self.cache), 3)
+        self.assertEqual(len(self.cache.lookup_many(digests, 4096)), 3)
+    
+    def test_store_merges_digests(self):
+        """Test storing one digest keeps the other already cached for the key."""
+        key = (1, 1, 10, 0)
+        self.cache.store_many({key: {'partial': b'p', 'full': None}}, 4096)
+        self.cache.store_many({key: {'partial': None, 'full': b'f'}}, 8192)
+        self.assertEqual(self.cache.lookup_many([key], 4096)[key], {'partial': b'p', 'full': b'f'})
+        self.cache.store_many({key: {'partial': b'q', 'full': None}}, 8192)
+        self.assertEqual(self.cache.lookup_many([key], 8192)[key], {'partial': b'q', 'full': b'f'})
+        self.assertEqual(len(self.cache), 1)
+
+
+@unittest.skipUnless(hasattr(os, 'link'), "hardlinks not supported")
+class TestDeduplication(unittest.TestCase):
+    """Test hardlink/reflink deduplication."""
+    
+    def setUp(self):
+        """Create identical and different files."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.data = os.urandom(32 * 1024)
+        self.paths = [os.path.join(self.temp_dir, name) for name in ('a', 'b', 'c')]
+        for path, data in zip(self.paths, (self.data, self.data, os.urandom(32 * 1024))):
+            with open(path, 'wb') as f:
+                f.write(data)
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_hardlink_dedup(self):
+        """Test a verified duplicate becomes a hardlink and space is reported."""
+        result = deduplicate([{'size': len(self.data), 'files': self.paths[:2]}], 'hardlink')
+        self.assertEqual(result['linked'], 1)
+        self.assertGreater(result['reclaimed'], 0)
+        self.assertEqual(os.stat(self.paths[0]).st_ino, os.stat(self.paths[1]).st_ino)
+        with open(self.paths[1], 'rb') as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertEqual(sorted(os.listdir(self.temp_dir)), ['a', 'b', 'c'])
+    
+    def test_content_is_verified(self):
+        """Test files that differ are never linked."""
+        self.assertIsNone(link_duplicate(self.paths[0], self.paths[2], 'hardlink'))
+        self.assertNotEqual(os.stat(self.paths[0]).st_ino, os.stat(self.paths[2]).st_ino)
+    
+    def test_hardlink_requires_same_metadata(self):
+        """Test hardlinks are not used when permissions differ."""
+        os.chmod(self.paths[1], 0o600)
+        os.chmod(self.paths[0], 0o644)
+        self.assertIsNone(link_duplicate(self.paths[0], self.paths[1], 'hardlink'))
+
+
+class TestMounts(unittest.TestCase):
+    """Test mount-aware scanning and the exclusion trie."""
+    
+    MOUNTINFO = (
+        "22 1 8:1 / / rw,relatime shared:1 - ext4 /dev/sda1 rw\n"
+        "23 22 0:5 / /proc rw,nosuid - proc proc rw\n"
+        "24 22 0:40 / /mnt/nas rw - nfs4 server:/export rw\n"
+        "25 22 8:1 /srv/data /mnt/data\\040copy rw - ext4 /dev/sda1 rw\n"
+        "26 22 8:17 / /home rw - ext4 /dev/sdb1 rw\n"
+    )
+    
+    @unittest.skipUnless(hasattr(os, 'makedev'), "mountinfo is Linux-only")
+    def test_parse_mountinfo(self):
+        """Test mountinfo fields and octal escapes are decoded."""
+        mounts = parse_mountinfo(self.MOUNTINFO)
+        self.assertEqual(len(mounts), 5)
+        self.assertEqual(mounts[3].mount_point, '/mnt/data copy')
+        self.assertEqual(mounts[2].fstype, 'nfs4')
+    
+    @unittest.skipUnless(hasattr(os, 'makedev'), "mountinfo is Linux-only")
+    def test_skipped_mount_points(self):
+        """Test pseudo, network and bind mounts are skipped, local disks are not."""
+        table = MountTable(parse_mountinfo(self.MOUNTINFO))
+        self.assertEqual(table.skipped_mount_points(), {'/proc', '/mnt/nas', '/mnt/data copy'})
+        self.assertEqual(table.skipped_mount_points(skip_network=False), {'/proc', '/mnt/data copy'})
+        self.assertEqual(table.mount_for('/home/user/file').mount_point, '/home')
+    
+    def test_path_trie(self):
+        """Test exclusions match whole path components."""
+        trie = PathTrie(['/usr/bin', '/etc', 'C:\\Windows\\System32'])
+        self.assertTrue(trie.contains('/usr/bin'))
+        self.assertTrue(trie.contains('/usr/bin/python3'))
+        self.assertFalse(trie.contains('/usr/binaries'))
+        self.assertFalse(trie.contains('/usr'))
+    
+    def test_scanner_respects_exclusions(self):
+        """Test excluded directories are neither yielded nor traversed."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(temp_dir, 'keep'))
+            os.makedirs(os.path.join(temp_dir, 'skip', 'deep'))
+            scanner = DiskScanner(exclusions=PathTrie([os.path.join(temp_dir, 'skip')]))
+            paths = [e.path for e in scanner.scan([temp_dir])]
+            self.assertIn(os.path.join(temp_dir, 'keep'), paths)
+            self.assertFalse([p for p in paths if 'skip' in p])
+            self.assertEqual(scanner.stats['excluded'], 1)
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+class TestDiskSampler(unittest.TestCase):
+    """Test the sampled disk usage estimator."""
+    
+    def setUp(self):
+        """Build a tree with uneven fan-out."""
+        self.temp_dir = tempfile.mkdtemp()
+        for i in range(4):
+            os.makedirs(os.path.join(self.temp_dir, f'd{i}', 'sub'))
+            with open(os.path.join(self.temp_dir, f'd{i}', 'sub', 'data.bin'), 'wb') as f:
+                f.write(b'x' * 1000 * (i + 1))
+        with open(os.path.join(self.temp_dir, 'top.txt'), 'wb') as f:
+            f.write(b'y' * 500)
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_estimate_converges_to_total(self):
+        """Test the weighted descent is unbiased and reports an interval."""
+        result = DiskSampler(time_budget=0.3, seed=1).estimate([self.temp_dir])
+        total = result['total']
+        self.assertGreater(result['probes'], 10)
+        self.assertLessEqual(total['low'], 10500)
+        self.assertGreaterEqual(total['high'], 10500)
+        self.assertAlmostEqual(total['size'], 10500, delta=1500)
+        self.assertEqual(result['extensions']['.txt']['size'], 500)
+        self.assertIn(os.path.join(self.temp_dir, 'd3'), result['directories'])
+    
+    def test_excluded_directories_are_not_sampled(self):
+        """Test the scanner's exclusions apply to sampling."""
+        scanner = DiskScanner(exclusions=PathTrie([os.path.join(self.temp_dir, f'd{i}') for i in range(4)]))
+        result = DiskSampler(scanner, time_budget=0.05, seed=1).estimate([self.temp_dir])
+        self.assertEqual(result['total']['size'], 500)
+        self.assertEqual(list(result['extensions']), ['.txt'])
+    
+    def test_z_score(self):
+        """Test the two-sided normal quantile without statistics.NormalDist."""
+        self.assertAlmostEqual(z_score(0.95), 1.959964, places=5)
+        self.assertAlmostEqual(z_score(0.99), 2.575829, places=5)
+        self.assertRaises(ValueError, z_score, 1.0)
+
+
+class TestScanJob(unittest.TestCase):
+    """Test cancellable scan jobs with progress."""
+    
+    def setUp(self):
+        """Build a small tree and index it once."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.tree = os.path.join(self.temp_dir, 'tree')
+        for i in range(3):
+            os.makedirs(os.path.join(self.tree, f'd{i}'))
+            with open(os.path.join(self.tree, f'd{i}', 'f.bin'), 'wb') as f:
+                f.write(b'x' * 100)
+        self.index = ScanIndex(os.path.join(self.temp_dir, 'index.db'))
+        for _ in DiskScanner(index=self.index).scan([self.tree]):
+            pass
+    
+    def tearDown(self):
+        """Clean up test environment."""
+        self.index.close()
+        shutil.rmtree(self.temp_dir)
+    
+    def _scan(self, job):
+        scanner = DiskScanner(index=self.index, token=job.token, progress=job.progress)
+        job.expect([self.tree], self.index)
+        return [e.path for e in scanner.scan([self.tree])]
+    
+    def test_progress_and_eta_base(self):
+        """Test counters and the expected totals taken from the index."""
+        job = ScanJob(self._scan).start()
+        self.assertTrue(job.wait(10))
+        info = job.snapshot()
+        self.assertEqual(info['state'], ScanJob.DONE)
+        self.assertEqual((info['files'], info['bytes']), (3, 300))
+        self.assertEqual(info['expected']['files'], 3)
+        self.assertEqual(info['fraction'], 1.0)
+        self.assertEqual(len(job.result), 7)
+    
+    def test_cancelled_token_stops_scanner(self):
+        """Test the scanner raises once the token is cancelled."""
+        token = CancellationToken()
+        token.cancel()
+        with self.assertRaises(ScanCancelledError):
+            list(DiskScanner(token=token).scan([self.tree]))
+    
+    def test_cancel_and_timeout(self):
+        """Test cancellation and timeout end the job with distinct states."""
+        def wait_for_cancel(job):
+            while True:
+                job.token.raise_if_cancelled()
+                time.sleep(0.01)
+        
+        job = ScanJob(wait_for_cancel).start()
+        job.cancel()
+        self.assertTrue(job.wait(5))
+        self.assertEqual(job.state, ScanJob.CANCELLED)
+        
+        job = ScanJob(wait_for_cancel, timeout=0.1).start()
+        self.assertTrue(job.wait(5))
+        self.assertEqual(job.state, ScanJob.TIMEOUT)
+
+
+class TestThrottle(unittest.TestCase):
+    """Test background mode priorities, rate limits and pausing."""
+    
+    def test_token_bucket_rate(self):
+        """Test the bucket allows a burst and then delays by the debt."""
+        bucket = TokenBucket(1000)
+        self.assertEqual(bucket.reserve(1000), 0.0)
+        self.assertAlmostEqual(bucket.reserve(500), 0.5, delta=0.05)
+    
+    @unittest.skipUnless(sys.platform.startswith('linux'), "per-thread priorities are Linux-only")
+    def test_worker_thread_priority(self):
+        """Test idle priority applies to the worker thread only."""
+        result = {}
+        def worker():
+            result.update(enter_background())
+            result['nice'] = os.getpriority(os.PRIO_PROCESS, threading.get_native_id())
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+        self.assertEqual(result['cpu'], 'nice')
+        self.assertEqual(result['nice'], 19)
+        self.assertNotEqual(os.getpriority(os.PRIO_PROCESS, threading.get_native_id()), 19)
+    
+    def test_pauses_under_io_pressure(self):
+        """Test a busy host pauses work until the job is cancelled."""
+        metrics = MagicMock()
+        metrics.get_pressure.return_value = {'io': {'some': {'avg10': 80.0}}}
+        token = CancellationToken()
+        throttle = Throttle(metrics=metrics, max_load_per_cpu=None,
+                            check_interval=0.01, token=token)
+        self.assertTrue(throttle.host_busy())
+        threading.Timer(0.1, token.cancel).start()
+        with self.assertRaises(ScanCancelledError):
+            throttle.wait(ops=1)
+        self.assertGreater(throttle.paused_seconds, 0)
+    
+    def test_throttled_scan(self):
+        """Test a throttled scan still sees every entry."""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            os.makedirs(os.path.join(temp_dir, 'a', 'b'))
+            throttle = Throttle(ops_per_second=10000, max_load_per_cpu=None)
+            paths = [e.path for e in DiskScanner(throttle=throttle).scan([temp_dir])]
+            self.assertEqual(len(paths), 3)
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+class TestCleanupEngine(unittest.TestCase):
+    """Test the native rule-based cleanup engine."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _create(self, relative, size=10, age_days=0):
+        path = os.path.join(self.temp_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        if age_days:
+            old = time.time() - age_days * 86400
+            os.utime(path, (old, old))
+        return path
+    
+    def test_rule_filters(self):
+        """Test patterns, minimum age and size range select the files removed."""
+        old_tmp = self._create('a/old.tmp', age_days=10)
+        new_tmp = self._create('a/new.tmp')
+        old_log = self._create('b/old.log', age_days=10)
+        big_tmp = self._create('b/big.tmp', size=5000, age_days=10)
+        rule = CleanupRule('tmp', self.temp_dir, patterns=('*.tmp',), min_age_days=7, max_size=1000)
+        report = CleanupEngine(max_workers=2).run([rule])[0]
+        self.assertEqual(report['files'], 1)
+        self.assertEqual(report['bytes'], 10)
+        self.assertFalse(os.path.exists(old_tmp))
+        for kept in (new_tmp, old_log, big_tmp):
+            self.assertTrue(os.path.exists(kept))
+    
+    def test_safety_limits(self):
+        """Test exclusions, the maximum file size and symlinks are respected."""
+        outside = tempfile.mkdtemp()
+        try:
+            target = os.path.join(outside, 'keep.txt')
+            with open(target, 'w') as f:
+                f.write('keep')
+            os.symlink(outside, os.path.join(self.temp_dir, 'link'))
+            excluded = self._create('excluded/file.txt')
+            large = self._create('large.bin', size=4096)
+            removed = self._create('nested/dir/file.txt')
+            engine = CleanupEngine(exclusions=PathTrie([os.path.join(self.temp_dir, 'excluded')]),
+                                   max_file_size=1024)
+            report = engine.run([CleanupRule('all', self.temp_dir, remove_empty_dirs=True)])[0]
+            self.assertTrue(os.path.exists(target))
+            self.assertTrue(os.path.exists(excluded))
+            self.assertTrue(os.path.exists(large))
+            self.assertFalse(os.path.exists(removed))
+            self.assertFalse(os.path.exists(os.path.join(self.temp_dir, 'nested')))
+            self.assertEqual(report['skipped'], 1)
+            self.assertEqual(report['failures'], 0)
+        finally:
+            shutil.rmtree(outside)
+    
+    @unittest.skipUnless(os.path.isdir('/proc/self/fd'), "needs /proc/self/fd")
+    def test_wide_tree_under_fd_limit(self):
+        """Test open directory handles do not grow with the width of the tree."""
+        import resource
+        for i in range(400):
+            self._create(f'wide/d{i}/sub/file.txt')
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (len(os.listdir('/proc/self/fd')) + 48, hard))
+        try:
+            report = CleanupEngine(max_workers=4).run([CleanupRule('all', self.temp_dir)])[0]
+        finally:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+        self.assertEqual(report['failures'], 0)
+        self.assertEqual(report['files'], 400)
+    
+    def test_dry_run(self):
+        """Test a dry run reports the files without removing them."""
+        path = self._create('a/file.txt', size=100)
+        report = CleanupEngine(dry_run=True).run([CleanupRule('all', self.temp_dir)])[0]
+        self.assertEqual(report['files'], 1)
+        self.assertEqual(report['bytes'], 100)
+        self.assertTrue(os.path.exists(path))
+    
+    def test_missing_root(self):
+        """Test a rule whose directory does not exist is a no-op."""
+        rule = CleanupRule('missing', os.path.join(self.temp_dir, 'missing'))
+        report = CleanupEngine().run([rule])[0]
+        self.assertEqual((report['files'], report['failures']), (0, 0))
+    
+    def _index(self):
+        index = ScanIndex(os.path.join(tempfile.mkdtemp(dir=self.temp_dir), 'index.db'))
+        list(DiskScanner(index=index).scan([os.path.join(self.temp_dir, 'data')]))
+        return index
+    
+    def test_plan_from_index(self):
+        """Test a plan selects files from the index without removing them."""
+        first = self._create('data/a/one.tmp')
+        self._create('data/a/b/two.tmp', size=20)
+        self._create('data/keep.txt')
+        index = self._index()
+        rule = CleanupRule('tmp', os.path.join(self.temp_dir, 'data'), patterns=('*.tmp',))
+        plan = CleanupEngine().plan([rule, rule], index)
+        summary = plan.summary()
+        self.assertEqual(summary['files'], 2)
+        self.assertEqual(summary['bytes'], 30)
+        self.assertEqual(summary['items'][1]['files'], 0)
+        self.assertGreater(summary['estimated_seconds'], 0)
+        self.assertTrue(os.path.exists(first))
+        index.close()
+    
+    def test_execute_plan_skips_modified(self):
+        """Test a saved plan removes only files unchanged since planning."""
+        unchanged = self._create('data/a/one.tmp')
+        modified = self._create('data/a/two.tmp')
+        later = self._create('data/a/b/three.tmp')
+        index = self._index()
+        rule = CleanupRule('tmp', os.path.join(self.temp_dir, 'data'), patterns=('*.tmp',),
+                           remove_empty_dirs=True)
+        path = os.path.join(self.temp_dir, 'plan.json')
+        CleanupEngine().plan([rule], index).save(path)
+        index.close()
+        
+        future = time.time() + 60
+        os.utime(modified, (future, future))
+        os.remove(later)
+        report = CleanupEngine().execute(CleanupPlan.load(path))[0]
+        self.assertEqual(report['files'], 1)
+        self.assertEqual(report['changed'], 2)
+        self.assertFalse(os.path.exists(unchanged))
+        self.assertTrue(os.path.exists(modified))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, 'data', 'a', 'b')))
+    
+    def test_execute_tampered_plan(self):
+        """Test a saved plan cannot remove excluded, oversized or outside files."""
+        data = os.path.join(self.temp_dir, 'data')
+        keep = self._create('data/keep/a.tmp')
+        big = self._create('data/big.tmp', size=5000)
+        outside = self._create('outside/b.tmp')
+        ok = self._create('data/ok.tmp')
+        rule = CleanupRule('tmp', data, patterns=('*.tmp',))
+        
+        def planned(path):
+            st = os.stat(path)
+            return [path, st.st_size, st.st_blocks * 512, st.st_mtime, st.st_nlink, st.st_atime]
+        plan_path = os.path.join(self.temp_dir, 'plan.json')
+        CleanupPlan([PlanItem(rule, [])]).save(plan_path)
+        with open(plan_path) as f:
+            saved = json.load(f)
+        saved['items'][0]['files'] = [planned(keep), planned(big), planned(ok),
+                                      [os.path.join(data, '..', 'outside', 'b.tmp')] + planned(outside)[1:],
+                                      [os.path.join(data, 'keep', '..', '..', 'outside', 'b.tmp')] +
+                                      planned(outside)[1:]]
+        with open(plan_path, 'w') as f:
+            json.dump(saved, f)
+        
+        engine = CleanupEngine(exclusions=PathTrie([os.path.join(data, 'keep')]), max_file_size=1000)
+        report = engine.execute(CleanupPlan.load(plan_path))[0]
+        self.assertEqual((report['files'], report['skipped'], report['failures']), (1, 2, 2))
+        self.assertFalse(os.path.exists(ok))
+        for path in (keep, big, outside):
+            self.assertTrue(os.path.exists(path))
+    
+    def test_plan_rechecks_atime(self):
+        """Test files read since indexing or planning are kept by atime rules."""
+        path = self._create('data/a/old.tmp', age_days=10)
+        index = self._index()
+        rule = CleanupRule('tmp', os.path.join(self.temp_dir, 'data'), min_age_days=7, age_field='atime')
+        plan = CleanupEngine().plan([rule], index)
+        self.assertEqual(plan.summary()['files'], 1)
+        
+        # Lido depois do plano: o mtime não muda, mas a regra não o seleciona mais
+        mtime = os.stat(path).st_mtime
+        os.utime(path, (time.time(), mtime))
+        report = CleanupEngine().execute(plan)[0]
+        self.assertEqual((report['files'], report['changed']), (0, 1))
+        self.assertTrue(os.path.exists(path))
+        # O índice guarda o atime antigo; o plano usa o atual
+        self.assertEqual(CleanupEngine().plan([rule], index).summary()['files'], 0)
+        index.close()
+    
+    def test_goal_plan_prefers_cheap_candidates(self):
+        """Test a goal plan takes the cheapest units first and stops at the goal."""
+        for i in range(4):
+            self._create(f'data/tmp/old-{i}.bin', size=64 * 1024, age_days=60)
+        self._create('data/cache/pkg/recent.bin', size=256 * 1024)
+        self._create('data/user/report.pdf', size=256 * 1024, age_days=60)
+        index = self._index()
+        data = os.path.join(self.temp_dir, 'data')
+        rules = [
+            CleanupRule('user', os.path.join(data, 'user'), risk='user'),
+            CleanupRule('cache', os.path.join(data, 'cache')),
+            CleanupRule('tmp', os.path.join(data, 'tmp'), risk='temporary', regeneration_cost=0),
+        ]
+        plan = CleanupEngine().plan_goal(rules, index, 100 * 1024)
+        self.assertEqual([item.rule.name for item in plan.items], ['tmp'])
+        self.assertEqual(len(plan.items[0].files), 2)
+        self.assertEqual(plan.shortfall, 0)
+        
+        plan = CleanupEngine().plan_goal(rules, index, 10 * 1024**2)
+        self.assertEqual([item.rule.name for item in plan.items], ['user', 'cache', 'tmp'])
+        self.assertGreater(plan.shortfall, 0)
+        index.close()
+
+
+class TestQuarantine(unittest.TestCase):
+    """Test reversible cleanup through the quarantine."""
+    
+    def setUp(self):
+        # Restores never follow symlinks, so the temp path must not contain one (e.g. /tmp on macOS)
+        self.temp_dir = os.path.realpath(tempfile.mkdtemp())
+        self.data = os.path.join(self.temp_dir, 'data')
+        for name in ('tree/a/one', 'tree/b/two', 'loose.tmp'):
+            path = os.path.join(self.data, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                f.write('content')
+        self.db = os.path.join(self.temp_dir, 'index.db')
+        self.index = ScanIndex(self.db)
+        list(DiskScanner(index=self.index).scan([self.data]))
+        patcher = patch('paguro_boost.quarantine.quarantine_anchor', return_value=self.temp_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.quarantine = Quarantine(self.db, grace_seconds=3600)
+    
+    def tearDown(self):
+        self.quarantine.close()
+        self.index.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _run(self, exclusions=()):
+        engine = CleanupEngine(exclusions=PathTrie(exclusions), quarantine=self.quarantine, index=self.index)
+        return engine.run([CleanupRule('all', self.data)])[0]
+    
+    def test_quarantine_and_restore(self):
+        """Test whole directories are moved at once and a batch can be restored."""
+        report = self._run()
+        self.assertEqual(report['files'], 3)
+        self.assertEqual(os.listdir(self.data), [])
+        batch = self.quarantine.batches()[0]
+        self.assertEqual(batch['items'], 2)
+        
+        restored = self.quarantine.restore()
+        self.assertEqual(restored['restored'], 2)
+        self.assertTrue(os.path.exists(os.path.join(self.data, 'tree', 'b', 'two')))
+        self.assertTrue(os.path.exists(os.path.join(self.data, 'loose.tmp')))
+        self.assertEqual(self.quarantine.batches(), [])
+    
+    def test_exclusion_below_directory(self):
+        """Test a directory holding an excluded path is cleaned file by file."""
+        keep = os.path.join(self.data, 'tree', 'a')
+        report = self._run(exclusions=[keep])
+        self.assertEqual(report['files'], 2)
+        self.assertTrue(os.path.exists(os.path.join(keep, 'one')))
+        self.assertEqual(self.quarantine.batches()[0]['items'], 2)
+    
+    @unittest.skipUnless(hasattr(os, 'geteuid'), "POSIX ownership checks")
+    def test_area_must_be_private(self):
+        """Test a shared quarantine directory is refused and a swapped batch is not followed."""
+        root = os.path.join(self.temp_dir, QUARANTINE_DIRNAME)
+        os.mkdir(root)
+        os.chmod(root, 0o777)
+        report = self._run()
+        self.assertEqual((report['files'], report['failures']), (0, 1))
+        os.chmod(root, 0o755)
+        
+        self._run()
+        self.assertEqual(stat.S_IMODE(os.stat(root).st_mode), 0o700)
+        outside = os.path.join(self.temp_dir, 'outside')
+        os.mkdir(outside)
+        batch = os.path.join(root, self.quarantine.batches()[0]['batch'])
+        for name in os.listdir(batch):
+            os.rename(os.path.join(batch, name), os.path.join(outside, name))
+        os.rmdir(batch)
+        os.symlink(outside, batch)
+        report = self.quarantine.purge(now=time.time() + 7200)
+        self.assertEqual((report['items'], report['failures']), (0, 2))
+        self.assertEqual(len(os.listdir(outside)), 2)
+    
+    @unittest.skipUnless(hasattr(os, 'mkfifo'), "FIFOs not supported")
+    def test_whole_tree_checked_on_disk(self):
+        """Test nested changes and special files keep a directory from moving whole."""
+        fifo = os.path.join(self.data, 'tree', 'b', 'pipe')
+        os.mkfifo(fifo)
+        list(DiskScanner(index=self.index).scan([self.data]))
+        # Subdiretório novo: muda o mtime de tree/a, não o de tree
+        big = os.path.join(self.data, 'tree', 'a', 'new', 'big.bin')
+        os.makedirs(os.path.dirname(big))
+        with open(big, 'wb') as f:
+            f.write(b'x' * 4096)
+        engine = CleanupEngine(max_file_size=1024, quarantine=self.quarantine, index=self.index)
+        report = engine.run([CleanupRule('all', self.data)])[0]
+        self.assertEqual((report['files'], report['skipped']), (3, 1))
+        self.assertTrue(os.path.exists(fifo))
+        self.assertTrue(os.path.exists(big))
+        self.assertFalse(os.path.exists(os.path.join(self.data, 'tree', 'a', 'one')))
+    
+    @unittest.skipUnless(hasattr(os, 'symlink'), "symlinks not supported")
+    def test_restore_refuses_symlinked_parent(self):
+        """Test a parent directory swapped for a symlink does not redirect a restore."""
+        self._run()
+        outside = os.path.join(self.temp_dir, 'outside')
+        os.mkdir(outside)
+        os.rmdir(self.data)
+        os.symlink(outside, self.data)
+        report = self.quarantine.restore()
+        self.assertEqual((report['restored'], report['failures']), (0, 2))
+        self.assertEqual(os.listdir(outside), [])
+        self.assertEqual(self.quarantine.batches()[0]['items'], 2)
+    
+    def test_purge_deep_tree(self):
+        """Test a tree deeper than the recursion limit is purged."""
+        area = self.quarantine.area_for(self.data)
+        deep = os.path.join(self.temp_dir, 'deep')
+        os.mkdir(deep)
+        fd = os.open(deep, os.O_RDONLY)
+        for _ in range(sys.getrecursionlimit() + 50):
+            os.mkdir('d', dir_fd=fd)
+            child = os.open('d', os.O_RDONLY, dir_fd=fd)
+            os.close(fd)
+            fd = child
+        os.close(fd)
+        self.quarantine.move(self.temp_dir, 'deep', deep, area, 0, 0)
+        report = self.quarantine.purge(now=time.time() + 7200)
+        self.assertEqual((report['items'], report['failures']), (1, 0))
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, QUARANTINE_DIRNAME)))
+    
+    def test_purge_after_grace(self):
+        """Test items are only purged after the grace period."""
+        self._run()
+        self.assertEqual(self.quarantine.purge()['items'], 0)
+        report = self.quarantine.purge(now=time.time() + 7200)
+        self.assertEqual(report['items'], 2)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, QUARANTINE_DIRNAME)))
+
+
+class TestCacheCatalog(unittest.TestCase):
+    """Test the cache catalog sizing and LRU pruning."""
+    
+    def setUp(self):
+        self.home = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.home, ignore_errors=True)
+    
+    def _create(self, relative, size=4096, used_days_ago=0):
+        path = os.path.join(self.home, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'x' * size)
+        used = time.time() - used_days_ago * 86400
+        os.utime(path, (used, used))
+        return path
+    
+    def test_known_caches(self):
+        """Test known caches are found and XDG leftovers are cataloged separately."""
+        self._create('.cache/pip/http/a')
+        self._create('.cache/mozilla/firefox/abc.default/cache2/entry')
+        self._create('.cache/someapp/data')
+        locations = {loc.name: loc for loc in known_caches(self.home, environ={}, windows=False)}
+        self.assertEqual(locations['pip'].kind, 'pip')
+        self.assertEqual(locations['firefox:abc.default'].kind, 'browser')
+        self.assertEqual(locations['xdg:someapp'].kind, 'xdg')
+        self.assertNotIn('xdg:mozilla', locations)
+        self.assertNotIn('xdg:pip', locations)
+    
+    def test_lru_prune_to_cap(self):
+        """Test pruning removes least recently used entries until under the cap."""
+        oldest = self._create('.cache/pip/old', used_days_ago=30)
+        older = self._create('.cache/pip/older', used_days_ago=10)
+        recent = self._create('.cache/pip/recent')
+        index = ScanIndex(os.path.join(self.home, 'index.db'))
+        list(DiskScanner(index=index).scan([os.path.join(self.home, '.cache')]))
+        
+        catalog = CacheCatalog(index, known_caches(self.home, environ={}, windows=False), caps={'pip': 6000})
+        pip = [c for c in catalog.sizes() if c['name'] == 'pip'][0]
+        self.assertEqual(pip['files'], 3)
+        self.assertGreater(pip['excess'], 0)
+        
+        items = catalog.prune_items(CleanupEngine())
+        self.assertEqual(len(items), 1)
+        self.assertEqual([f.path for f in items[0].files], sorted([oldest, older]))
+        report = CleanupEngine().execute(CleanupPlan(items))[0]
+        self.assertEqual(report['files'], 2)
+        self.assertTrue(os.path.exists(recent))
+        index.close()
+    
+    def test_prune_ranks_by_live_use(self):
+        """Test entries read after indexing or planning are treated as warm."""
+        read_again = self._create('.cache/pip/old', used_days_ago=30)
+        older = self._create('.cache/pip/older', used_days_ago=10)
+        day_old = self._create('.cache/pip/day', used_days_ago=1)
+        index = ScanIndex(os.path.join(self.home, 'index.db'))
+        list(DiskScanner(index=index).scan([os.path.join(self.home, '.cache')]))
+        # O índice ainda guarda o atime antigo
+        os.utime(read_again, (time.time(), os.stat(read_again).st_mtime))
+        
+        catalog = CacheCatalog(index, known_caches(self.home, environ={}, windows=False), caps={'pip': 6000})
+        items = catalog.prune_items(CleanupEngine())
+        self.assertEqual([f.path for f in items[0].files], sorted([older, day_old]))
+        
+        os.utime(day_old, (time.time(), os.stat(day_old).st_mtime))
+        report = CleanupEngine().execute(CleanupPlan(items))[0]
+        self.assertEqual((report['files'], report['changed']), (1, 1))
+        self.assertTrue(os.path.exists(day_old))
+        self.assertTrue(os.path.exists(read_again))
+        index.close()
+
+
+class TestLogAnalyzer(unittest.TestCase):
+    """Test log sizing, in-place compression and journal vacuum targets."""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def _create(self, relative, content):
+        path = os.path.join(self.temp_dir, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+    
+    def test_classify_log(self):
+        """Test active, rotated, compressed and journal files are told apart."""
+        self.assertEqual(classify_log('syslog'), 'active')
+        self.assertEqual(classify_log('syslog.1'), 'rotated')
+        self.assertEqual(classify_log('app.log.2'), 'rotated')
+        self.assertEqual(classify_log('messages-20240101'), 'rotated')
+        self.assertEqual(classify_log('syslog.2.gz'), 'compressed')
+        self.assertEqual(classify_log('system@0001-0002.journal'), 'journal')
+    
+    def test_compress_rotated_logs(self):
+        """Test rotated logs are compressed in place with times preserved."""
+        rotated = self._create('syslog.1', 'repeated log line\n' * 20000)
+        self._create('syslog', 'current')
+        self._create('old.log.2.gz', 'x')
+        old = time.time() - 86400
+        os.utime(rotated, (old, old))
+        analysis = LogAnalyzer(log_dir=self.temp_dir, journal_dirs=[]).analyze()
+        paths = [e.path for e in analysis['rotated_uncompressed']]
+        self.assertEqual(paths, [rotated])
+        
+        report = LogAnalyzer.compress(paths, 'gzip', max_workers=2)
+        self.assertEqual(report['files'], 1)
+        self.assertGreater(report['saved'], 0)
+        self.assertFalse(os.path.exists(rotated))
+        with gzip.open(rotated + '.gz', 'rt') as f:
+            self.assertEqual(f.read(), 'repeated log line\n' * 20000)
+        self.assertAlmostEqual(os.path.getmtime(rotated + '.gz'), old, delta=1)
+    
+    def test_compress_keeps_mode_under_umask(self):
+        """Test the compressed copy keeps the original mode despite the umask."""
+        rotated = self._create('app.log.2', 'line\n' * 100)
+        os.chmod(rotated, 0o644)
+        previous = os.umask(0o077)
+        try:
+            report = LogAnalyzer.compress([rotated], 'gzip', max_workers=1)
+        finally:
+            os.umask(previous)
+        self.assertEqual(report['files'], 1)
+        self.assertEqual(stat.S_IMODE(os.stat(rotated + '.gz').st_mode), 0o644)
+    
+    @unittest.skipUnless(hasattr(os, 'O_NOFOLLOW'), "requires O_NOFOLLOW")
+    def test_compress_refuses_swapped_symlink(self):
+        """Test a log swapped for a symlink after the check is not followed."""
+        from paguro_boost import log_analyzer
+        secret = self._create('secret', 'secret\n')
+        rotated = self._create('logs/app.log.1', 'line\n' * 100)
+        real = log_analyzer.BulkFile
+        
+        def swap(*args, **kwargs):
+            os.remove(rotated)
+            os.symlink(secret, rotated)
+            return real(*args, **kwargs)
+        with patch('paguro_boost.log_analyzer.BulkFile', side_effect=swap):
+            report = LogAnalyzer.compress([rotated], 'gzip', max_workers=1)
+        self.assertEqual((report['files'], report['failures']), (0, 1))
+        self.assertTrue(os.path.islink(rotated))
+        self.assertEqual(os.listdir(os.path.dirname(rotated)), ['app.log.1'])
+    
+    def test_compress_refuses_swapped_file(self):
+        """Test a log replaced by another file with the same size and mtime is not compressed."""
+        from paguro_boost import log_analyzer
+        rotated = self._create('logs/app.log.1', 'a' * 1000)
+        other = self._create('other', 'b' * 1000)
+        st = os.stat(rotated)
+        os.utime(other, ns=(st.st_atime_ns, st.st_mtime_ns))
+        real = log_analyzer.BulkFile
+        
+        def swap(*args, **kwargs):
+            os.rename(other, rotated)
+            return real(*args, **kwargs)
+        with patch('paguro_boost.log_analyzer.BulkFile', side_effect=swap):
+            report = LogAnalyzer.compress([rotated], 'gzip', max_workers=1)
+        self.assertEqual((report['files'], report['failures']), (0, 1))
+        self.assertEqual(os.listdir(os.path.dirname(rotated)), ['app.log.1'])
+    
+    @unittest.skipUnless(os.path.isdir('/proc/self/fd'), "requires /proc")
+    def test_compress_skips_open_logs(self):
+        """Test logs still held open by a process are not compressed."""
+        rotated = self._create('daemon.log.1', 'line\n' * 100)
+        with open(rotated, 'a') as handle:
+            held, _ = open_files()
+            st = os.stat(rotated)
+            self.assertIn((st.st_dev, st.st_ino), held)
+            with patch('paguro_boost.log_analyzer.open_files', return_value=(held, True)):
+                report = LogAnalyzer.compress([rotated], 'gzip', max_workers=1)
+            handle.write('late line\n')
+        self.assertEqual(report['files'], 0)
+        self.assertEqual(report['busy'], 1)
+        self.assertTrue(os.path.exists(rotated))
+        self.assertFalse(os.path.exists(rotated + '.gz'))
+    
+    def test_compress_keeps_newest_rotation_without_proc(self):
+        """Test the newest rotation is kept when open files cannot be listed."""
+        newest = self._create('daemon.log.1', 'new\n' * 100)
+        older = self._create('daemon.log.2', 'old\n' * 100)
+        os.utime(older, (1000, 1000))
+        with patch('paguro_boost.log_analyzer.open_files', return_value=(set(), False)):
+            report = LogAnalyzer.compress([newest, older], 'gzip', max_workers=1)
+        self.assertEqual(report['files'], 1)
+        self.assertEqual(report['busy'], 1)
+        self.assertTrue(os.path.exists(newest))
+        self.assertTrue(os.path.exists(older + '.gz'))
+    
+    def test_vacuum_target(self):
+        """Test the vacuum size follows the free-space goal."""
+        gb = 1024**3
+        self.assertIsNone(vacuum_size_target(2 * gb, 30 * gb, 100 * gb, 15))
+        self.assertEqual(vacuum_size_target(4 * gb, 14 * gb, 100 * gb, 15), 3 * gb)
+        self.assertEqual(vacuum_size_target(4 * gb, 5 * gb, 100 * gb, 15, min_bytes=gb // 2), gb // 2)
+        
+        journal = self.temp_dir
+        for i, name in enumerate(['system@a-1.journal', 'system@a-2.journal', 'system.journal']):
+            path = self._create(os.path.join('journal', name), 'j' * 8192)
+            os.utime(path, (1000 + i, 1000 + i))
+        entries = [e for e in DiskScanner().scan([journal]) if not e.is_dir]
+        total = sum(e.allocated for e in entries)
+        removed = vacuum_candidates(entries, total - 1)
+        self.assertEqual([e.name for e in removed], ['system@a-1.journal'])
+
+
 class TestConfiguration(unittest.TestCase):
     """Test configuration management."""
     
@@ -204,6 +1675,26 @@ def run_tests():
     # Add test cases
     test_suite.addTest(unittest.makeSuite(TestSystemOptimizer))
     test_suite.addTest(unittest.makeSuite(TestSystemMetrics))
+    test_suite.addTest(unittest.makeSuite(TestPressureMetrics))
+    test_suite.addTest(unittest.makeSuite(TestMeasurement))
+    test_suite.addTest(unittest.makeSuite(TestProcessGroups))
+    test_suite.addTest(unittest.makeSuite(TestPageCache))
+    test_suite.addTest(unittest.makeSuite(TestCGroups))
+    test_suite.addTest(unittest.makeSuite(TestDiskScanner))
+    test_suite.addTest(unittest.makeSuite(TestScanIndex))
+    test_suite.addTest(unittest.makeSuite(TestDiskWatcher))
+    test_suite.addTest(unittest.makeSuite(TestBulkFile))
+    test_suite.addTest(unittest.makeSuite(TestDuplicateFinder))
+    test_suite.addTest(unittest.makeSuite(TestHashCache))
+    test_suite.addTest(unittest.makeSuite(TestDeduplication))
+    test_suite.addTest(unittest.makeSuite(TestMounts))
+    test_suite.addTest(unittest.makeSuite(TestDiskSampler))
+    test_suite.addTest(unittest.makeSuite(TestScanJob))
+    test_suite.addTest(unittest.makeSuite(TestThrottle))
+    test_suite.addTest(unittest.makeSuite(TestCleanupEngine))
+    test_suite.addTest(unittest.makeSuite(TestQuarantine))
+    test_suite.addTest(unittest.makeSuite(TestCacheCatalog))
+    test_suite.addTest(unittest.makeSuite(TestLogAnalyzer))
     test_suite.addTest(unittest.makeSuite(TestConfiguration))
     test_suite.addTest(unittest.makeSuite(TestLogger))
     